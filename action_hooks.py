@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Actions run when a SANS Timer countdown crosses a threshold
+
+Hooks are listed per event in a JSON file given with --hooks:
+
+    {
+      "caution":  [{"command": "paplay /usr/share/sounds/freedesktop/stereo/bell.oga"}],
+      "warning":  [{"webhook": "http://127.0.0.1:9000/cue", "timeout": 2}],
+      "end":      [{"command": ["./start_next_lab.sh"], "timeout": 30}],
+      "overtime": [{"webhook": "http://127.0.0.1:9000/overtime"}]
+    }
+
+"overtime" fires every full minute past the deadline until the countdown is
+stopped, reset or restarted. When a countdown starts, the time of every event
+is worked out and the actions are prepared (payloads encoded, commands split)
+ahead of the deadline. A timing thread wakes at each one and hands its actions
+to a bounded worker pool, so neither the GUI thread nor a slow or hung action
+can delay another. Commands and webhooks are cut off after their timeout, and
+the delay from each deadline to the start of its action is recorded.
+
+Commands get the event in SANS_TIMER_EVENT, SANS_TIMER_LABEL and
+SANS_TIMER_OVERTIME_MINUTES; webhooks are POSTed the same fields as JSON.
+This module has no Qt dependency; to try a hooks file against a local
+stand-in for a room controller:
+
+    python action_hooks.py --receiver 9000
+    python action_hooks.py --hooks hooks.json --seconds 20 --warning 10
+"""
+
+import argparse
+import heapq
+import itertools
+import json
+import os
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+HOOK_EVENTS = ("caution", "warning", "end", "overtime")
+
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_WORKERS = 4
+
+# Actions waiting for a worker beyond this are dropped rather than queued forever
+MAX_PENDING = 32
+
+
+class HookError(ValueError):
+    """Raised for hook files that cannot be understood"""
+
+
+class Action:
+    """One command or webhook, prepared ahead of its deadline"""
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            raise HookError(f"Hook must be an object, not {spec!r}")
+        try:
+            self.timeout = float(spec.get("timeout", DEFAULT_TIMEOUT))
+        except (TypeError, ValueError):
+            raise HookError(f"Invalid timeout in {spec!r}")
+        if "command" in spec:
+            command = spec["command"]
+            self.kind = "command"
+            self.target = shlex.split(command) if isinstance(command, str) else [str(arg) for arg in command]
+            if not self.target:
+                raise HookError("Empty command")
+        elif "webhook" in spec:
+            self.kind = "webhook"
+            self.target = str(spec["webhook"])
+            if not self.target.startswith(("http://", "https://")):
+                raise HookError(f"Webhook must be an http(s) URL: {self.target!r}")
+        else:
+            raise HookError(f"Hook needs a command or a webhook: {spec!r}")
+
+    def __repr__(self):
+        return f"{self.kind} {self.target}"
+
+    def prepare(self, fields):
+        """Return a callable that runs the action for one occurrence of its event"""
+        if self.kind == "command":
+            env = dict(os.environ)
+            env.update({f"SANS_TIMER_{key.upper()}": str(value) for key, value in fields.items()})
+            return lambda: subprocess.run(self.target, env=env, timeout=self.timeout,
+                                          stdin=subprocess.DEVNULL, check=True)
+        import urllib.request
+        request = urllib.request.Request(self.target, data=json.dumps(fields).encode(), method="POST",
+                                         headers={"Content-Type": "application/json"})
+
+        def post():
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        return post
+
+
+def load_hooks(path):
+    """Read a hooks file into {event: [Action, ...]}"""
+    try:
+        with open(path, encoding="utf-8") as hooks_file:
+            config = json.load(hooks_file)
+    except (OSError, ValueError) as e:
+        raise HookError(f"Could not read hooks from {path}: {e}")
+    if not isinstance(config, dict):
+        raise HookError(f"{path} must contain an object of events")
+    hooks = {}
+    for event, specs in config.items():
+        if event not in HOOK_EVENTS:
+            raise HookError(f"Unknown hook event {event!r} (expected one of {', '.join(HOOK_EVENTS)})")
+        if isinstance(specs, dict):
+            specs = [specs]
+        hooks[event] = [Action(spec) for spec in specs]
+    return hooks
+
+
+class HookRunner:
+    """Fires the hooks of one timer engine at its deadlines, off the GUI thread"""
+
+    def __init__(self, hooks, workers=DEFAULT_WORKERS, metrics=None, max_pending=MAX_PENDING):
+        self.hooks = hooks
+        self.metrics = metrics
+        self.max_pending = max_pending
+        self.pending = 0
+        self.fired = []  # (event, latency) of recent firings, for the headless run
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="hook")
+        self._heap = []  # (fire at, sequence, event, fields, prepared actions)
+        self._counter = itertools.count()
+        self._generation = 0  # Bumped on every arm and disarm to forget stale entries
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="hook-timer", daemon=True)
+        self._thread.start()
+
+    def attach(self, engine):
+        """Arm and disarm with the engine's countdown"""
+        engine.add_listener(self.on_engine_event)
+        if engine.running:
+            self.arm(engine)
+
+    def on_engine_event(self, event, engine):
+        if event == "start":
+            self.arm(engine)
+        elif event in ("stop", "reset"):
+            self.disarm()
+
+    def arm(self, engine):
+        """Schedule every hook of the engine's new countdown that is still ahead"""
+        from timer_engine import STAGE_NAMES, STAGE_ENDED
+        now = time.time()
+        deadline = engine.end_time.timestamp()
+        label = engine.label
+        entries = []
+        for at, stage in engine.stage_times():
+            event = "end" if stage == STAGE_ENDED else STAGE_NAMES[stage]
+            at = at.timestamp()
+            if event in self.hooks and at >= now:
+                entries.append(self._entry(at, event, label, 0))
+        if "overtime" in self.hooks:
+            minutes = max(1, int((now - deadline) // 60) + 1)
+            entries.append(self._entry(deadline + minutes * 60, "overtime", label, minutes))
+        with self._condition:
+            self._generation += 1
+            self._heap = [entry[:1] + (self._generation,) + entry[1:] for entry in entries]
+            heapq.heapify(self._heap)
+            self._condition.notify()
+
+    def disarm(self):
+        """Forget every scheduled hook"""
+        with self._condition:
+            self._generation += 1
+            self._heap = []
+            self._condition.notify()
+
+    def _entry(self, at, event, label, minutes):
+        """Return a heap entry with the actions for one occurrence prepared"""
+        fields = {"event": event, "label": label, "deadline": at, "overtime_minutes": minutes}
+        prepared = [(action, action.prepare(fields)) for action in self.hooks[event]]
+        return (at, next(self._counter), event, fields, prepared)
+
+    def stop(self):
+        """Stop the timing thread; actions already running finish on their own"""
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        self._thread.join(timeout=2)
+        self._executor.shutdown(wait=False)
+
+    def _run(self):
+        with self._condition:
+            while self._running:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                at, generation, _, event, fields, prepared = heapq.heappop(self._heap)
+                if generation != self._generation:
+                    continue
+                if event == "overtime":
+                    # Keep going every minute until stopped
+                    minutes = fields["overtime_minutes"] + 1
+                    entry = self._entry(at + 60, event, fields["label"], minutes)
+                    heapq.heappush(self._heap, entry[:1] + (generation,) + entry[1:])
+                for action, run in prepared:
+                    self._submit(at, event, action, run)
+
+    def _submit(self, deadline, event, action, run):
+        if self.pending >= self.max_pending:
+            print(f"Warning: Dropping {event} hook {action}: {self.pending} hooks still waiting")
+            self._count("hook_failures")
+            return
+        self.pending += 1
+        self._executor.submit(self._execute, deadline, event, action, run)
+
+    def _execute(self, deadline, event, action, run):
+        latency = time.time() - deadline
+        self._observe(event, latency)
+        try:
+            run()
+        except subprocess.TimeoutExpired:
+            print(f"Warning: {event} hook {action} timed out after {action.timeout:g} s")
+            self._count("hook_timeouts")
+        except Exception as e:
+            print(f"Warning: {event} hook {action} failed: {e}")
+            self._count("hook_failures")
+        finally:
+            with self._condition:
+                self.pending -= 1
+
+    def _observe(self, event, latency):
+        with self._condition:
+            self.fired.append((event, latency))
+            del self.fired[:-100]
+            if self.metrics is not None:
+                self.metrics.hook_latency.observe(latency)
+
+    def _count(self, name):
+        if self.metrics is not None:
+            with self._condition:
+                getattr(self.metrics, name).inc()
+
+
+def run_receiver(port):
+    """Print every cue POSTed to localhost:port and how long after its deadline it arrived"""
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    class CueHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received = time.time()
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            try:
+                cue = json.loads(body)
+                late = f"{(received - cue['deadline']) * 1000:.1f} ms after its deadline"
+            except (ValueError, KeyError, TypeError):
+                cue, late = body.decode("utf-8", "replace"), "with no deadline"
+            print(f"{self.path}: {cue} arrived {late}", flush=True)
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", port), CueHandler)
+    print(f"Receiving cues on http://127.0.0.1:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Try SANS Timer action hooks without the GUI")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--hooks", metavar="FILE", help="hooks file to fire during a headless countdown")
+    group.add_argument("--receiver", type=int, metavar="PORT",
+                       help="stand in for a room controller: print cues POSTed to this port")
+    parser.add_argument("--seconds", type=int, default=15, help="countdown length")
+    parser.add_argument("--warning", type=int, default=5, help="warning threshold in seconds")
+    parser.add_argument("--overtime-minutes", type=int, default=0,
+                        help="keep running this many minutes past the deadline")
+    args = parser.parse_args()
+
+    if args.receiver is not None:
+        run_receiver(args.receiver)
+        return
+
+    from timer_engine import TimerEngine
+    try:
+        runner = HookRunner(load_hooks(args.hooks))
+    except HookError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+    engine = TimerEngine(warning_seconds=args.warning, caution_seconds=2 * args.warning)
+    runner.attach(engine)
+    engine.start_for(seconds=args.seconds)
+    try:
+        time.sleep(args.seconds + args.overtime_minutes * 60 + 1)
+    except KeyboardInterrupt:
+        pass
+    runner.stop()
+    for event, latency in runner.fired:
+        print(f"{event}: started {latency * 1000:.2f} ms after its deadline")
+
+
+if __name__ == "__main__":
+    main()
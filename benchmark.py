@@ -0,0 +1,806 @@
+#!/usr/bin/env python3
+"""
+Benchmark and footprint suite for SANS Timer
+
+Runs headless under QT_QPA_PLATFORM=offscreen and writes the results to a JSON
+file so they can be compared between releases:
+
+    python benchmark.py --output benchmark_results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Must be set before Qt is imported anywhere
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+MAIN_TIMER = "main"  # sans_timer.MAIN_TIMER, without importing Qt up front
+
+FONT_SIZES = (24, 48, 96, 200)
+WINDOW_SIZES = ((400, 120), (1920, 1080), (3840, 2160))
+
+
+class FakeClock:
+    """Clock for the timer engine that only moves when told to"""
+
+    def __init__(self, start=None):
+        self.now = start or datetime(2024, 1, 1, 9, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+def current_rss_kb():
+    """Return the resident set size of this process in KiB, if it can be read"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss // 1024
+    except ImportError:
+        pass
+    try:
+        import resource
+        # Peak rather than current, but better than nothing
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == "darwin" else peak
+    except ImportError:
+        return None
+
+
+def summarize(samples):
+    """Return mean, median, p99 and max of a list of durations in microseconds"""
+    ordered = sorted(samples)
+    count = len(ordered)
+    if not count:
+        return {}
+    return {
+        "count": count,
+        "mean_us": round(sum(ordered) / count, 2),
+        "median_us": round(ordered[count // 2], 2),
+        "p99_us": round(ordered[min(count - 1, int(count * 0.99))], 2),
+        "max_us": round(ordered[-1], 2),
+    }
+
+
+def startup_child(target):
+    """Run the full app or the kiosk until its first frame, then report timings and idle RSS"""
+    imported_at = time.time()
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject, QEvent, QTimer
+    import sans_timer
+    if target == "kiosk":
+        import kiosk
+        entry_point, first_window = kiosk.main, sans_timer.TimerDisplay
+    else:
+        entry_point, first_window = sans_timer.main, sans_timer.ControlPanel
+
+    quiet_offscreen_warnings()
+    app = QApplication(sys.argv[:1])
+    started_at = time.time()
+    marks = {"imported_at": imported_at, "main_started_at": started_at}
+
+    def report_idle():
+        # Settled after a second of ticking with nothing else to do
+        marks["idle_rss_kb"] = current_rss_kb()
+        marks["widgets"] = len(app.allWidgets())
+        print(json.dumps(marks), flush=True)
+        app.quit()
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and isinstance(obj, first_window):
+                marks["first_paint_at"] = time.time()
+                app.removeEventFilter(self)
+                QTimer.singleShot(1000, report_idle)
+            return False
+
+    paint_filter = FirstPaintFilter()
+    app.installEventFilter(paint_filter)
+    # Both count down, so idle includes the once-a-second tick
+    with tempfile.TemporaryDirectory() as state_dir:
+        if target == "kiosk":
+            sys.argv = [sys.argv[0], "start", "for", "30m"]
+        else:
+            # Keep the user's saved timer state out of the measurement
+            sys.argv = [sys.argv[0], "--state", os.path.join(state_dir, "state.json")]
+        try:
+            entry_point()
+        except SystemExit:
+            pass
+
+
+def bench_startup(runs, target="full"):
+    """Measure cold start to the first painted frame of the full app or the kiosk"""
+    samples = []
+    for _ in range(runs):
+        launched_at = time.time()
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--startup-child", target],
+            capture_output=True, text=True, timeout=60,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout
+        for line in output.splitlines():
+            if line.startswith("{"):
+                marks = json.loads(line)
+                samples.append({
+                    "interpreter_and_imports_ms": round((marks["main_started_at"] - launched_at) * 1000, 2),
+                    "main_to_first_paint_ms": round((marks["first_paint_at"] - marks["main_started_at"]) * 1000, 2),
+                    "total_ms": round((marks["first_paint_at"] - launched_at) * 1000, 2),
+                    "idle_rss_kb": marks["idle_rss_kb"],
+                    "widgets": marks["widgets"],
+                })
+    totals = sorted(sample["total_ms"] for sample in samples)
+    rss = sorted(sample["idle_rss_kb"] or 0 for sample in samples)
+    return {
+        "runs": samples,
+        "median_total_ms": totals[len(totals) // 2] if totals else None,
+        "median_idle_rss_kb": rss[len(rss) // 2] if rss else None,
+    }
+
+
+def quiet_offscreen_warnings():
+    """Drop the offscreen platform's "does not support" warnings from the output"""
+    from PyQt5.QtCore import qInstallMessageHandler
+
+    def handler(mode, context, message):
+        if "This plugin does not support" not in message:
+            sys.stderr.write(message + "\n")
+
+    qInstallMessageHandler(handler)
+
+
+def release_deleted(app):
+    """Delete objects scheduled with deleteLater() without running an event loop"""
+    from PyQt5.QtCore import QEvent
+    app.sendPostedEvents(None, QEvent.DeferredDelete)
+    app.processEvents()
+
+
+def bench_timer_queue(timer_counts, simulated_seconds):
+    """Measure wakeups and CPU per simulated second as the number of timers grows"""
+    import random
+    from timer_engine import TimerEngine, TimerQueue
+
+    window = timedelta(milliseconds=15)  # Same coalescing window as the GUI scheduler
+    results = []
+    for count in timer_counts:
+        clock = FakeClock()
+        queue = TimerQueue()
+        engines = {}
+        rng = random.Random(count)
+        for index in range(count):
+            # Timers started at random sub-second phases
+            clock.advance(rng.random())
+            engine = TimerEngine(clock=clock)
+            engine.start_for(hours=2)
+            engines[index] = engine
+            queue.schedule(index, clock.now + timedelta(seconds=engine.until_next_tick()))
+
+        end = clock.now + timedelta(seconds=simulated_seconds)
+        wakeups = 0
+        cpu_start = time.process_time()
+        while queue.peek() < end:
+            batch = queue.take_batch(window)
+            clock.now = max(due for due, _ in batch)
+            wakeups += 1
+            for _, index in batch:
+                engine = engines[index]
+                engine.state()
+                queue.schedule(index, clock.now + timedelta(seconds=engine.until_next_tick()))
+        cpu = time.process_time() - cpu_start
+        results.append({
+            "timers": count,
+            "wakeups_per_second": round(wakeups / simulated_seconds, 2),
+            "cpu_us_per_second": round(cpu * 1e6 / simulated_seconds, 2),
+            "cpu_us_per_timer_second": round(cpu * 1e6 / simulated_seconds / count, 2),
+        })
+    return results
+
+
+def bench_broadcast(client_count):
+    """Measure how long one state change takes to reach every connected viewer"""
+    import socket
+    from broadcast import BroadcastServer, engine_publisher
+    from timer_engine import TimerEngine
+
+    server = BroadcastServer(port=0)
+    server.start()
+    engine = TimerEngine()
+    engine.add_listener(engine_publisher(server))
+    viewers = []
+    try:
+        for _ in range(client_count):
+            viewer = socket.create_connection(("127.0.0.1", server.port))
+            viewer.sendall(b"GET /events HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            viewers.append(viewer)
+        for viewer in viewers:
+            viewer.recv(65536)  # Headers and the initial state
+
+        started = time.perf_counter()
+        engine.start_for(minutes=30)
+        for viewer in viewers:
+            viewer.recv(65536)
+        fan_out = time.perf_counter() - started
+        return {
+            "clients": len(viewers),
+            "fan_out_ms": round(fan_out * 1000, 2),
+        }
+    except OSError as e:
+        # Usually the open file limit
+        return {"clients": len(viewers), "error": str(e)}
+    finally:
+        for viewer in viewers:
+            viewer.close()
+        server.stop()
+
+
+def bench_sync(follower_count, settle_seconds=1.5):
+    """Measure how closely followers on loopback agree with the leader's deadline"""
+    from lan_sync import SyncLeader, SyncFollower, leader_publisher
+    from timer_engine import TimerEngine
+
+    leader = SyncLeader("127.0.0.1", 0)
+    leader.start()
+    engine = TimerEngine()
+    engine.add_listener(leader_publisher(leader))
+    received = {}
+    followers = []
+    try:
+        for index in range(follower_count):
+            follower = SyncFollower("127.0.0.1", leader.port)
+            follower.on_state = lambda state, index=index: received.__setitem__(
+                index, (time.perf_counter(), state))
+            follower.start()
+            followers.append(follower)
+        time.sleep(settle_seconds)  # Let every follower register and fill its clock filter
+
+        received.clear()
+        started = time.perf_counter()
+        engine.start_for(minutes=30)
+        while len(received) < follower_count and time.perf_counter() - started < 2:
+            time.sleep(0.001)
+        # On loopback every clock is the same, so any deadline difference is estimation error
+        errors = [abs(state["end_time"] - engine.end_time.timestamp()) * 1000
+                  for _, state in received.values()]
+        return {
+            "followers": follower_count,
+            "reached": len(received),
+            "propagation_ms": round((max(at for at, _ in received.values()) - started) * 1000, 3)
+            if received else None,
+            "max_deadline_error_ms": round(max(errors), 3) if errors else None,
+            "max_delay_ms": round(max(f.delay for f in followers if f.delay is not None) * 1000, 3),
+        }
+    finally:
+        for follower in followers:
+            follower.stop()
+        leader.stop()
+
+
+def bench_hooks(countdown_seconds=3):
+    """Fire hooks at a localhost stand-in receiver next to a hung command
+
+    Every event has a webhook; the warning also runs a command that hangs past
+    its timeout, which must not hold up the webhooks that follow it.
+    """
+    import threading
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from action_hooks import HookRunner, Action
+    from metrics import TimerMetrics
+    from timer_engine import TimerEngine
+
+    received = []
+
+    class CueHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            cue = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            received.append((cue["event"], time.time() - cue["deadline"]))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    receiver = HTTPServer(("127.0.0.1", 0), CueHandler)
+    threading.Thread(target=receiver.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{receiver.server_port}/cue"
+    hooks = {event: [Action({"webhook": url, "timeout": 1})] for event in ("caution", "warning", "end")}
+    hooks["warning"].insert(0, Action({"command": [sys.executable, "-c", "import time; time.sleep(30)"],
+                                       "timeout": 0.5}))
+    metrics = TimerMetrics()
+    runner = HookRunner(hooks, metrics=metrics)
+    engine = TimerEngine(warning_seconds=countdown_seconds - 1, caution_seconds=countdown_seconds)
+    runner.attach(engine)
+    try:
+        engine.start_for(seconds=countdown_seconds)
+        time.sleep(countdown_seconds + 1)
+        return {
+            "received": len(received),
+            "max_delivery_ms": round(max(late for _, late in received) * 1000, 3) if received else None,
+            "max_start_ms": round(max(latency for _, latency in runner.fired) * 1000, 3),
+            "start_p99_ms": metrics.hook_latency.quantile(0.99) * 1000,
+            "timeouts": metrics.hook_timeouts.value,
+        }
+    finally:
+        runner.stop()
+        receiver.shutdown()
+
+
+def bench_history(session_count):
+    """Measure the GUI-thread cost of logging a session and a report over many sessions"""
+    import random
+    from session_history import SessionHistory, connect, report
+    from timer_engine import TimerEngine
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        # Weeks of history: a session every ten minutes of a teaching day
+        connection = connect(path)
+        modes = ["15 minutes Timer", "1 hour Timer", "Until 1:30 PM", "Until 10:50 AM", "Until Lab 3 (Tue 13:30)"]
+        started = time.time() - session_count * 600
+        rows = []
+        for index in range(session_count):
+            at = started + index * 600
+            overrun = random.gauss(60, 120)
+            rows.append((at, at + 900, at + 900 if overrun > 0 else None, at + 900 + overrun,
+                         random.choice(modes), "Timer", overrun))
+        with connection:
+            connection.executemany("INSERT INTO sessions (started_at, planned_end, ended_at, stopped_at, "
+                                   "mode, label, overrun) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        connection.close()
+
+        history = SessionHistory(path)
+        engine = TimerEngine()
+        history.attach(engine)
+        calls = 200
+        cost = 0.0
+        for _ in range(calls // 2):
+            before = time.perf_counter()
+            engine.start_for(minutes=15)
+            engine.stop()
+            cost += time.perf_counter() - before
+        history.flush()
+        history.close()
+
+        timings = {}
+        for weeks in (4, 52):
+            before = time.perf_counter()
+            report(path, weeks)
+            timings[f"report_{weeks}_weeks_ms"] = round((time.perf_counter() - before) * 1000, 3)
+        return dict({
+            "sessions": session_count,
+            "start_stop_us": round(cost / (calls // 2) * 1e6, 2),
+            "write_batches": history.batches,
+            "statements_written": history.writes,
+        }, **timings)
+
+
+def make_windows(clock):
+    """Create a timer display and control panel driven by the given clock"""
+    import sans_timer
+    from timer_engine import TimerEngine
+
+    timer_display = sans_timer.TimerDisplay()
+    control_panel = sans_timer.ControlPanel(timer_display, TimerEngine(clock=clock))
+    return timer_display, control_panel
+
+
+def discard_windows(app, timer_display, control_panel):
+    """Delete windows made by make_windows without quitting the application
+
+    Closing the control panel quits, which would end every later event loop early.
+    """
+    control_panel.stop_timer()
+    timer_display.hide()
+    control_panel.hide()
+    timer_display.deleteLater()
+    control_panel.deleteLater()
+    release_deleted(app)
+
+
+def run_ticks(app, control_panel, clock, ticks):
+    """Advance the clock a second at a time and time each tick plus its repaint"""
+    wall_samples = []
+    cpu_samples = []
+    for _ in range(ticks):
+        clock.advance(1)
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        control_panel.update_timer()
+        app.processEvents()  # Deliver the pending paint events
+        cpu_samples.append((time.process_time() - cpu_start) * 1e6)
+        wall_samples.append((time.perf_counter() - wall_start) * 1e6)
+    return wall_samples, cpu_samples
+
+
+def bench_ticks(app, ticks):
+    """Measure per-tick cost at several font and window sizes"""
+    from PyQt5.QtGui import QFont
+
+    results = []
+    for font_size in FONT_SIZES:
+        for width, height in WINDOW_SIZES:
+            clock = FakeClock()
+            timer_display, control_panel = make_windows(clock)
+            timer_display.timer_label.setFont(QFont('Arial', font_size, QFont.Bold))
+            timer_display.show()
+            timer_display.resize(width, height)
+            control_panel.radio_custom_duration.setChecked(True)
+            control_panel.hours_spin.setValue(10)
+            control_panel.start_timer()
+            control_panel.scheduler.remove(MAIN_TIMER)  # The benchmark drives the ticks itself
+            app.processEvents()
+
+            wall, cpu = run_ticks(app, control_panel, clock, ticks)
+            results.append({
+                "font_size": font_size,
+                "window": [width, height],
+                "wall": summarize(wall),
+                "cpu": summarize(cpu),
+            })
+            discard_windows(app, timer_display, control_panel)
+    return results
+
+
+def bench_long_run(app, ticks):
+    """Measure RSS before and after a long simulated countdown"""
+    clock = FakeClock()
+    timer_display, control_panel = make_windows(clock)
+    timer_display.show()
+    control_panel.radio_custom_duration.setChecked(True)
+    control_panel.hours_spin.setValue(23)
+    control_panel.start_timer()
+    control_panel.scheduler.remove(MAIN_TIMER)
+    app.processEvents()
+
+    rss_before = current_rss_kb()
+    started = time.perf_counter()
+    run_ticks(app, control_panel, clock, ticks)
+    elapsed = time.perf_counter() - started
+    rss_after = current_rss_kb()
+
+    discard_windows(app, timer_display, control_panel)
+    return {
+        "simulated_ticks": ticks,
+        "elapsed_s": round(elapsed, 3),
+        "rss_before_kb": rss_before,
+        "rss_after_kb": rss_after,
+        "rss_growth_kb": (rss_after - rss_before) if rss_before and rss_after else None,
+    }
+
+
+def bench_frame_output(app, frames):
+    """Compare a shared-memory frame per second with grabbing the timer window"""
+    from frame_output import SharedFrameOutput, FrameReader
+    from timer_engine import format_time
+    import sans_timer
+
+    timer_display = sans_timer.TimerDisplay()
+    timer_display.show()
+    app.processEvents()
+    with tempfile.TemporaryDirectory() as directory:
+        output = SharedFrameOutput(os.path.join(directory, "frame"), transparent=True)
+        timer_display.add_output(output)
+        reader = FrameReader(output.path)
+        samples = []
+        for second in range(frames):
+            started = time.process_time()
+            output.update_display(format_time(3600 - second))
+            samples.append((time.process_time() - started) * 1e6)
+        header, _ = reader.read()
+        reader.close()
+        output.close()
+    grab_samples = []
+    for _ in range(frames):
+        started = time.process_time()
+        timer_display.grab().toImage()
+        grab_samples.append((time.process_time() - started) * 1e6)
+    timer_display.close()
+    timer_display.deleteLater()
+    release_deleted(app)
+    return {
+        "frames": frames,
+        "frame_size": [header["width"], header["height"]],
+        "shared_frame_cpu": summarize(samples),
+        "window_grab_cpu": summarize(grab_samples),
+    }
+
+
+def bench_fit(app, passes=5):
+    """Time fitting the font and resizing a fit-mode window between window and projector sizes
+
+    Resizes include repainting the whole window, which dominates at 4K.
+    """
+    import glyph_display
+    import sans_timer
+
+    timer_display = sans_timer.TimerDisplay()
+    timer_display.set_fit(True)
+    timer_display.mouseDoubleClickEvent(None)  # A plain resizable window
+    timer_display.show()
+    app.processEvents()
+    glyph_display._fit_cache.clear()
+    cold = []
+    warm = []
+    for index in range(passes):
+        for width, height in WINDOW_SIZES:
+            started = time.perf_counter()
+            timer_display.resize(width, height)
+            app.processEvents()
+            (cold if index == 0 else warm).append((time.perf_counter() - started) * 1e6)
+    font = timer_display.timer_label._fit_font
+    dpi = timer_display.logicalDpiY()
+    glyph_display._fit_cache.clear()
+    search = []
+    lookup = []
+    for samples in (search, lookup):
+        for width, height in WINDOW_SIZES:
+            started = time.perf_counter()
+            glyph_display.fitted_font(font, width, height, dpi)
+            samples.append((time.perf_counter() - started) * 1e6)
+    timer_display.close()
+    timer_display.deleteLater()
+    release_deleted(app)
+    return {
+        "font_search": summarize(search),
+        "font_lookup": summarize(lookup),
+        "first_resize": summarize(cold),
+        "repeat_resize": summarize(warm),
+    }
+
+
+def bench_tray(app, minutes=45):
+    """Count the wakeups of a countdown run from the tray and time the icon updates"""
+    from tray_icon import TimerTray, render_icon
+
+    clock = FakeClock()
+    timer_display, control_panel = make_windows(clock)
+    control_panel.attach_tray(TimerTray(control_panel))
+    control_panel.radio_custom_duration.setChecked(True)
+    control_panel.hours_spin.setValue(0)
+    control_panel.minutes_spin.setValue(minutes)
+    control_panel.seconds_spin.setValue(0)
+    control_panel.start_timer()
+    scheduler = control_panel.scheduler
+    scheduler.set_visible(False, True)  # As if both windows were hidden
+    render_icon.cache_clear()
+
+    def run_countdown():
+        """Follow the scheduler's wakeups to the deadline; return them and the CPU spent"""
+        wakeups = 0
+        cpu = 0.0
+        while control_panel.engine.remaining() > 0:
+            due = scheduler.next_due(control_panel.engine, clock())
+            clock.now = due + timedelta(milliseconds=2)
+            started = time.process_time()
+            control_panel.update_timer()
+            cpu += time.process_time() - started
+            wakeups += 1
+        return wakeups, cpu
+
+    wakeups, cold_cpu = run_countdown()
+    misses = render_icon.cache_info().misses
+    control_panel.start_timer()
+    scheduler.set_visible(False, True)
+    _, warm_cpu = run_countdown()
+    control_panel.stop_timer()
+    control_panel.hide()
+    timer_display.deleteLater()
+    control_panel.deleteLater()
+    release_deleted(app)
+    return {
+        "countdown_minutes": minutes,
+        "wakeups": wakeups,
+        "wakeups_with_a_window_shown": minutes * 60,
+        "icons_rendered": misses,
+        "cold_cache_cpu_us_per_wakeup": round(cold_cpu / wakeups * 1e6, 2),
+        "warm_cache_cpu_us_per_wakeup": round(warm_cpu / wakeups * 1e6, 2),
+    }
+
+
+def bench_precision(app, window_seconds):
+    """Run real countdowns into a sub-second final window and measure frames and CPU
+
+    The countdown lasts twice the window, so the first half shows the cost of
+    the once-a-second ticks and the second half the cost of the final window.
+    """
+    import sans_timer
+    from PyQt5.QtCore import QEventLoop, QTimer
+    from timer_engine import TimerEngine
+
+    def run_for(seconds):
+        loop = QEventLoop()
+        QTimer.singleShot(int(seconds * 1000), loop.quit)
+        started = time.process_time()
+        loop.exec_()
+        return time.process_time() - started
+
+    results = []
+    for digits in (1, 2):
+        engine = TimerEngine(precision_seconds=window_seconds, precision_digits=digits)
+        timer_display = sans_timer.TimerDisplay()
+        control_panel = sans_timer.ControlPanel(timer_display, engine)
+        timer_display.show()
+        control_panel.radio_custom_duration.setChecked(True)
+        control_panel.seconds_spin.setValue(2 * window_seconds)
+        control_panel.start_timer()
+        metrics = control_panel.metrics
+
+        before_cpu = run_for(window_seconds)
+        before_wakeups = metrics.wakeups.value
+        window_cpu = run_for(window_seconds)
+        results.append({
+            "digits": digits,
+            "target_fps": 10 ** digits,
+            "achieved_fps": round(metrics.precision_fps.value, 2),
+            "frames": metrics.precision_frames.value,
+            "dropped_frames": metrics.dropped_frames.value,
+            "wakeups_per_second_before_window": round(before_wakeups / window_seconds, 2),
+            "cpu_ms_per_second_before_window": round(before_cpu * 1000 / window_seconds, 3),
+            "cpu_ms_per_second_in_window": round(window_cpu * 1000 / window_seconds, 3),
+            "tick_lateness_p99_ms": metrics.tick_lateness.quantile(0.99) * 1000,
+        })
+        discard_windows(app, timer_display, control_panel)
+    return results
+
+
+def count_objects(app, control_panel):
+    """Count live widgets and control panel children"""
+    from PyQt5.QtCore import QObject
+    return {
+        "widgets": len(app.allWidgets()),
+        "control_panel_children": len(control_panel.findChildren(QObject)),
+    }
+
+
+def bench_dialogs(app, repeats):
+    """Count Qt objects after repeatedly opening the help and color dialogs"""
+    from PyQt5.QtCore import QTimer
+
+    def close_modal():
+        dialog = app.activeModalWidget()
+        if dialog is not None:
+            dialog.reject()
+        else:
+            QTimer.singleShot(10, close_modal)
+
+    def open_modal(action):
+        QTimer.singleShot(0, close_modal)
+        action()
+        app.processEvents()
+
+    clock = FakeClock()
+    timer_display, control_panel = make_windows(clock)
+    control_panel.show()
+    control_panel.build_color_settings()  # Normally deferred until the first paint
+    app.processEvents()
+
+    results = {"repeats": repeats, "baseline": count_objects(app, control_panel)}
+    for name, action in (
+            ("help_dialog", control_panel.show_help),
+            ("normal_color_dialog", control_panel.choose_normal_color),
+            ("caution_color_dialog", control_panel.choose_caution_color),
+            ("warning_color_dialog", control_panel.choose_warning_color),
+            ("background_color_dialog", control_panel.choose_background_color)):
+        for _ in range(repeats):
+            open_modal(action)
+        results[name] = count_objects(app, control_panel)
+
+    discard_windows(app, timer_display, control_panel)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SANS Timer")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="JSON file to write the results to")
+    parser.add_argument("--ticks", type=int, default=300,
+                        help="ticks per font/window size combination")
+    parser.add_argument("--long-run-ticks", type=int, default=20000,
+                        help="ticks for the long simulated run")
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="number of cold starts to measure")
+    parser.add_argument("--dialog-repeats", type=int, default=20,
+                        help="times to open each dialog")
+    parser.add_argument("--broadcast-clients", type=int, default=1000,
+                        help="viewers to connect to the broadcast server")
+    parser.add_argument("--sync-followers", type=int, default=8,
+                        help="followers to synchronize on loopback")
+    parser.add_argument("--precision-window", type=int, default=3,
+                        help="seconds of sub-second final countdown to measure (at most 29)")
+    parser.add_argument("--history-sessions", type=int, default=100000,
+                        help="sessions in the history database to report on")
+    parser.add_argument("--startup-child", choices=("full", "kiosk"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.startup_child:
+        startup_child(args.startup_child)
+        return
+
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "qt": QT_VERSION_STR,
+        "pyqt": PYQT_VERSION_STR,
+        "qpa_platform": os.environ.get("QT_QPA_PLATFORM"),
+    }
+
+    print("Measuring the multi-timer queue...")
+    results["timer_queue"] = bench_timer_queue((1, 10, 100, 1000), 600)
+
+    print("Measuring broadcast fan-out...")
+    results["broadcast"] = bench_broadcast(args.broadcast_clients)
+
+    print("Measuring leader/follower sync...")
+    results["sync"] = bench_sync(args.sync_followers)
+
+    print("Measuring action hooks...")
+    results["hooks"] = bench_hooks()
+    print(f"  {results['hooks']['received']} cues, delivered at most "
+          f"{results['hooks']['max_delivery_ms']} ms after their deadlines")
+
+    print("Measuring session history...")
+    results["history"] = bench_history(args.history_sessions)
+    print(f"  4-week report over {args.history_sessions} sessions: "
+          f"{results['history']['report_4_weeks_ms']} ms")
+
+    print("Measuring cold start...")
+    results["startup"] = bench_startup(args.startup_runs)
+    print("Measuring kiosk cold start...")
+    results["kiosk_startup"] = bench_startup(args.startup_runs, "kiosk")
+    for key in ("median_total_ms", "median_idle_rss_kb"):
+        full, kiosk = results["startup"][key], results["kiosk_startup"][key]
+        print(f"  {key}: full app {full}, kiosk {kiosk}")
+
+    quiet_offscreen_warnings()
+    app = QApplication(sys.argv[:1])
+    print("Measuring per-tick cost...")
+    results["ticks"] = bench_ticks(app, args.ticks)
+    print("Measuring memory over a long run...")
+    results["long_run"] = bench_long_run(app, args.long_run_ticks)
+    print("Counting objects after opening dialogs...")
+    results["dialogs"] = bench_dialogs(app, args.dialog_repeats)
+    print("Measuring fit-to-window resizes...")
+    results["fit"] = bench_fit(app)
+    print(f"  font size: search {results['fit']['font_search']['median_us']} us, "
+          f"cached {results['fit']['font_lookup']['median_us']} us")
+    print("Measuring the tray icon...")
+    results["tray"] = bench_tray(app)
+    print(f"  {results['tray']['wakeups']} wakeups for a {results['tray']['countdown_minutes']} minute countdown, "
+          f"{results['tray']['icons_rendered']} icons rendered")
+    print("Measuring shared-memory frame output...")
+    results["frame_output"] = bench_frame_output(app, args.ticks)
+    print(f"  per frame: shared memory {results['frame_output']['shared_frame_cpu']['median_us']} us, "
+          f"window grab {results['frame_output']['window_grab_cpu']['median_us']} us")
+    print("Measuring the sub-second final countdown...")
+    results["precision"] = bench_precision(app, args.precision_window)
+    for run in results["precision"]:
+        print(f"  {run['target_fps']} fps target: {run['achieved_fps']} fps, "
+              f"{run['dropped_frames']} dropped")
+
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Local HTTP broadcast of the SANS Timer countdown
+
+Serves a static page that counts down in the browser plus a Server-Sent Events
+stream that only carries state changes (start, stop, reset, stage, end), so
+hundreds of viewers cost nothing between changes. The server runs its own
+asyncio event loop on a background thread and never touches Qt.
+
+    python broadcast.py --port 8765 --minutes 30
+
+runs a headless countdown for testing against localhost.
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+
+# Drop viewers whose unsent data grows beyond this many bytes
+MAX_CLIENT_BUFFER = 64 * 1024
+
+# Largest request body accepted by POST routes
+MAX_REQUEST_BODY = 64 * 1024
+
+# Header every POST must carry: a web page on another origin cannot add it without a
+# CORS preflight, which is never answered, so a browser cannot be used to send commands
+POST_HEADER = "X-SANS-Timer"
+
+# Comment line sent periodically so proxies keep idle streams open
+KEEPALIVE_SECONDS = 30
+
+VIEWER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>SANS Timer</title>
+<style>
+  html, body { height: 100%; margin: 0; background: #000; color: #fff;
+               font-family: Arial, sans-serif; }
+  body { display: flex; flex-direction: column; align-items: center; justify-content: center; }
+  #time { font-size: 20vw; font-weight: bold; font-variant-numeric: tabular-nums; }
+  #mode { font-size: 4vw; }
+  .caution { color: #ffbf00; }
+  .warning { color: #f00; }
+  .ended { color: #f00; animation: flash 2s step-end infinite; }
+  @keyframes flash { 50% { color: #000; background: #f00; } }
+</style>
+</head>
+<body>
+<div id="time">00:00:00</div>
+<div id="mode">Timer not started</div>
+<script>
+var state = null, offset = 0;
+function pad(n) { return (n < 10 ? "0" : "") + n; }
+function render() {
+  var time = document.getElementById("time");
+  var remaining = 0, over = 0;
+  var counting = state && state.end_time !== null && (state.running || state.overdue);
+  if (counting) {
+    var left = (state.end_time * 1000 - (Date.now() + offset)) / 1000;
+    remaining = Math.max(0, Math.ceil(left));
+    if (state.overtime) {
+      // Count up past the deadline like the desktop display
+      over = Math.max(0, Math.floor(-left));
+    }
+  } else if (state && state.end_time !== null) {
+    remaining = state.remaining;
+  }
+  var shown = over || remaining;
+  var h = Math.floor(shown / 3600), m = Math.floor(shown / 60) % 60, s = shown % 60;
+  time.textContent = (over ? "-" : "") + pad(h) + ":" + pad(m) + ":" + pad(s);
+  var stage = "";
+  if (state && state.end_time !== null) {
+    if (remaining === 0) {
+      stage = "ended";
+    } else if (remaining < state.warning_seconds) {
+      stage = "warning";
+    } else if (remaining < state.caution_seconds) {
+      stage = "caution";
+    }
+  }
+  time.className = stage;
+  // Wake again just after the next whole second of the deadline
+  var delay = 1000;
+  if (counting) {
+    delay = ((state.end_time * 1000 - (Date.now() + offset)) % 1000 + 1000) % 1000 + 5;
+  }
+  setTimeout(render, delay);
+}
+var source = new EventSource("events");
+source.onmessage = function (event) {
+  state = JSON.parse(event.data);
+  // Correct for the difference between this clock and the server's
+  offset = state.server_time * 1000 - Date.now();
+  document.getElementById("mode").textContent = state.label;
+};
+render();
+</script>
+</body>
+</html>
+"""
+
+
+class BroadcastServer:
+    """Publishes timer state to browsers over HTTP and Server-Sent Events"""
+
+    def __init__(self, host="127.0.0.1", port=8765):
+        self.host = host
+        self.port = port
+        self.state = {"mode": "Not started", "label": "Timer not started",
+                      "end_time": None, "running": False, "warning": False,
+                      "stage": "normal", "warning_seconds": 0, "caution_seconds": 0,
+                      "remaining": 0, "overtime": False, "overdue": False}
+        self.clients = set()
+        self._handlers = set()
+        self.routes = {
+            "/": self._serve_page,
+            "/index.html": self._serve_page,
+            "/state": self._serve_state,
+            "/events": self._serve_events,
+        }
+        self.post_routes = {}
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def add_route(self, path, handler):
+        """Serve path with handler(reader, writer), a coroutine that writes the response"""
+        self.routes[path] = handler
+
+    def add_text_route(self, path, content_type, render):
+        """Serve path with the text returned by render(), which runs on the server thread"""
+        async def serve_text(reader, writer):
+            await self._respond(writer, "200 OK", content_type, render().encode())
+        self.add_route(path, serve_text)
+
+    def add_post_route(self, path, handler):
+        """Accept POSTs to path with handler(body), returning (status, content_type, body)
+
+        The handler runs on the server thread and must not block. Requests
+        without the POST_HEADER header or from another origin are refused.
+        """
+        self.post_routes[path] = handler
+
+    def start(self):
+        """Start serving on a background thread"""
+        self._thread = threading.Thread(target=self._run, name="broadcast", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._server is None:
+            raise OSError(f"Could not listen on {self.host}:{self.port}")
+
+    def stop(self):
+        """Stop serving and disconnect every viewer"""
+        if self._loop is not None and self._server is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            self._thread.join(timeout=5)
+
+    def publish(self, state):
+        """Send a new state to every viewer; safe to call from any thread"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._fan_out, dict(state))
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        try:
+            self._server = self._loop.run_until_complete(asyncio.start_server(
+                self._handle, self.host, self.port, backlog=2048))
+            # Report the real port when asked for an ephemeral one
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            print(f"Error starting broadcast server: {e}")
+            self._server = None
+        self._ready.set()
+        if self._server is not None:
+            self._loop.create_task(self._keepalive())
+            self._loop.run_forever()
+            # Cancel whatever is left (the keepalive) before closing the loop
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self._loop.close()
+
+    async def _shutdown(self):
+        self._server.close()
+        for writer in list(self.clients):
+            writer.close()
+        self.clients.clear()
+        # Closing the viewers' connections lets their handlers finish on their own
+        if self._handlers:
+            await asyncio.wait(self._handlers, timeout=1)
+        self._loop.stop()
+
+    def _event_payload(self):
+        state = dict(self.state, server_time=time.time())
+        return f"data: {json.dumps(state)}\n\n".encode()
+
+    def _fan_out(self, state):
+        self.state = state
+        # Encode once, then hand the same bytes to every viewer
+        payload = self._event_payload()
+        for writer in list(self.clients):
+            self._send(writer, payload)
+
+    def _send(self, writer, payload):
+        if writer.transport.is_closing() or \
+                writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            # Closed or too slow to keep up; let it reconnect
+            self.clients.discard(writer)
+            writer.close()
+            return
+        writer.write(payload)
+
+    async def _keepalive(self):
+        while True:
+            await asyncio.sleep(KEEPALIVE_SECONDS)
+            for writer in list(self.clients):
+                self._send(writer, b": keepalive\n\n")
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            request_line = await reader.readline()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if not line or line in (b"\r\n", b"\n"):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+            content_length = headers.get("content-length", "0")
+            content_length = int(content_length) if content_length.isdigit() else 0
+            parts = request_line.decode("latin-1").split()
+            path = parts[1].split("?", 1)[0] if len(parts) >= 2 else None
+            if len(parts) >= 2 and parts[0] == "POST" and path in self.post_routes:
+                refusal = self._refuse_post(headers)
+                if refusal is not None:
+                    await self._respond(writer, "403 Forbidden", "text/plain; charset=utf-8",
+                                        (refusal + "\n").encode())
+                    return
+                if content_length > MAX_REQUEST_BODY:
+                    await self._respond(writer, "413 Payload Too Large", "text/plain", b"")
+                    return
+                body = await reader.readexactly(content_length)
+                await self._respond(writer, *self.post_routes[path](body))
+                return
+            if len(parts) < 2 or parts[0] not in ("GET", "HEAD"):
+                await self._respond(writer, "405 Method Not Allowed", "text/plain", b"")
+                return
+            if parts[0] == "HEAD":
+                writer = _HeadWriter(writer)
+            handler = self.routes.get(path)
+            if handler is None:
+                await self._respond(writer, "404 Not Found", "text/plain", b"Not found\n")
+                return
+            await handler(reader, writer)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+        finally:
+            self._handlers.discard(task)
+
+    def _refuse_post(self, headers):
+        """Return why a POST with these headers is refused, or None to accept it"""
+        origin = headers.get("origin")
+        # Browsers send Origin with every cross-origin POST; other clients leave it out
+        if origin is not None and origin != f"http://{headers.get('host')}":
+            return f"error cross-origin requests from {origin} are not accepted"
+        if POST_HEADER.lower() not in headers:
+            return f"error missing {POST_HEADER} header"
+        return None
+
+    async def _respond(self, writer, status, content_type, body):
+        writer.write((f"HTTP/1.1 {status}\r\n"
+                      f"Content-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n"
+                      "Cache-Control: no-cache\r\n"
+                      "Connection: close\r\n\r\n").encode() + body)
+        await writer.drain()
+        writer.close()
+
+    async def _serve_page(self, reader, writer):
+        await self._respond(writer, "200 OK", "text/html; charset=utf-8", VIEWER_PAGE.encode())
+
+    async def _serve_state(self, reader, writer):
+        body = json.dumps(dict(self.state, server_time=time.time())).encode()
+        await self._respond(writer, "200 OK", "application/json", body)
+
+    async def _serve_events(self, reader, writer):
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n"
+                     b"Connection: keep-alive\r\n\r\n" + self._event_payload())
+        self.clients.add(writer)
+        try:
+            # Viewers never send anything else, so EOF means they went away
+            await reader.read()
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+
+class _HeadWriter:
+    """Stream writer for HEAD requests: passes on a response's headers, then closes"""
+
+    def __init__(self, writer):
+        self._writer = writer
+
+    def write(self, data):
+        if self._writer.is_closing():
+            return
+        end = data.find(b"\r\n\r\n")
+        # Every route writes its headers in one piece
+        self._writer.write(data if end < 0 else data[:end + 4])
+        if end >= 0:
+            self._writer.close()
+
+    def __getattr__(self, name):
+        return getattr(self._writer, name)
+
+
+def engine_publisher(server):
+    """Return a timer engine listener that publishes every state change"""
+    def publish(event, engine):
+        server.publish(engine.snapshot())
+    return publish
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a headless SANS Timer countdown")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8765, help="port to listen on")
+    parser.add_argument("--minutes", type=int, default=30, help="countdown length")
+    args = parser.parse_args()
+
+    from timer_engine import TimerEngine
+
+    server = BroadcastServer(args.host, args.port)
+    server.start()
+    engine = TimerEngine()
+    engine.add_listener(engine_publisher(server))
+    engine.start_for(minutes=args.minutes)
+    print(f"Serving on http://{args.host}:{server.port}/")
+    try:
+        while engine.running:
+            engine.state()  # Fires the warning and end events
+            time.sleep(engine.until_next_tick())
+    except KeyboardInterrupt:
+        pass
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Local control protocol for SANS Timer
+
+Other programs (AV control systems, stream decks, scripts) drive a running
+timer started with --control by sending one command per line over a local
+socket (a Unix domain socket, or a named pipe on Windows), or by POSTing the
+same command to /control when --control-http is used. Each command gets one
+reply line: "ok", "ok <json>" or "error <message>".
+
+    state                   ok {"mode": ..., "end_time": ..., "running": ...}
+    start [MODE]            select MODE (optional), then start
+    mode MODE               select MODE without starting
+    stop | reset | show | hide | ping
+
+MODE is "until HH:MM", "for DURATION" (45m, 1h30m, 90s or H:MM:SS) or
+"schedule". This module has no Qt dependency; run it as a client:
+
+    python control_api.py start for 45m
+    python control_api.py --http 127.0.0.1:8767 state
+"""
+
+import argparse
+import os
+import re
+import socket
+import sys
+import tempfile
+import time
+
+from timer_engine import format_clock
+
+
+DEFAULT_NAME = "sans_timer"
+
+# The custom duration spin boxes go up to 23:59:59
+MAX_DURATION_SECONDS = 24 * 3600 - 1
+
+SIMPLE_COMMANDS = ("state", "stop", "reset", "show", "hide", "ping")
+
+DURATION_UNITS = re.compile(r"^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s)?$")
+
+
+class CommandError(ValueError):
+    """Raised for commands that cannot be understood"""
+
+
+def control_address(name=DEFAULT_NAME):
+    """Return the local socket path (or pipe name on Windows) for a control channel"""
+    if sys.platform == "win32":
+        return name
+    # A full path lets clients without Qt connect; include the user so users don't collide
+    return os.path.join(tempfile.gettempdir(), f"{name}-{os.getuid()}.sock")
+
+
+def parse_duration(text):
+    """Parse 45m, 1h30m, 90s, 45 (minutes) or H:MM:SS into (hours, minutes, seconds)"""
+    if ":" in text:
+        parts = text.split(":")
+        if len(parts) > 3 or not all(part.isdigit() for part in parts):
+            raise CommandError(f"Invalid duration {text!r}")
+        parts = [0] * (3 - len(parts)) + [int(part) for part in parts]
+        total = parts[0] * 3600 + parts[1] * 60 + parts[2]
+    elif text.isdigit():
+        total = int(text) * 60
+    else:
+        match = DURATION_UNITS.match(text)
+        if not text or match is None:
+            raise CommandError(f"Invalid duration {text!r}")
+        hours, minutes, seconds = (int(group or 0) for group in match.groups())
+        total = hours * 3600 + minutes * 60 + seconds
+    if not 0 < total <= MAX_DURATION_SECONDS:
+        raise CommandError("Duration must be between 1 second and 23:59:59")
+    hours, remainder = divmod(total, 3600)
+    return (hours,) + divmod(remainder, 60)
+
+
+def parse_mode(words):
+    """Parse the words of a MODE into ("until", h, m), ("for", h, m, s) or ("schedule",)"""
+    if words == ["schedule"]:
+        return ("schedule",)
+    if len(words) == 2 and words[0] == "until":
+        match = re.match(r"^(\d{1,2}):(\d{2})$", words[1])
+        if match is None or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+            raise CommandError(f"Invalid time {words[1]!r}")
+        return ("until", int(match.group(1)), int(match.group(2)))
+    if len(words) == 2 and words[0] == "for":
+        return ("for",) + parse_duration(words[1])
+    raise CommandError(f"Unknown mode {' '.join(words)!r}")
+
+
+def parse_command(line):
+    """Parse one command line into (verb, mode), where mode may be None"""
+    words = line.lower().split()
+    if not words:
+        raise CommandError("Empty command")
+    verb, rest = words[0], words[1:]
+    if verb in SIMPLE_COMMANDS:
+        if rest:
+            raise CommandError(f"{verb} takes no arguments")
+        return verb, None
+    if verb == "start":
+        return verb, parse_mode(rest) if rest else None
+    if verb == "mode":
+        if not rest:
+            raise CommandError("mode needs a MODE")
+        return verb, parse_mode(rest)
+    raise CommandError(f"Unknown command {verb!r}")
+
+
+def start_mode(engine, mode, schedule=None):
+    """Start engine in a parsed MODE; return False if a schedule has no events left"""
+    kind = mode[0]
+    if kind == "schedule":
+        event = schedule.next_event(engine.clock()) if schedule is not None else None
+        if event is None:
+            return False
+        end_time, name = event
+        engine.start_at(end_time, f"{name} ({end_time:%a} {format_clock(end_time.hour, end_time.minute)})")
+    elif kind == "until":
+        engine.start_until(*mode[1:])
+    else:
+        engine.start_for(*mode[1:])
+    return True
+
+
+def send_command(line, name=DEFAULT_NAME, timeout=2.0):
+    """Send one command to a running timer and return its reply line"""
+    address = control_address(name)
+    if sys.platform == "win32":
+        with open(rf"\\.\pipe\{address}", "r+b", buffering=0) as pipe:
+            pipe.write(line.encode() + b"\n")
+            return pipe.readline().decode().strip()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(address)
+        connection.sendall(line.encode() + b"\n")
+        reply = b""
+        while not reply.endswith(b"\n"):
+            chunk = connection.recv(4096)
+            if not chunk:
+                break
+            reply += chunk
+    return reply.decode().strip()
+
+
+def send_http(line, address, timeout=2.0):
+    """POST one command to a timer's /control endpoint and return its reply line"""
+    import urllib.error
+    import urllib.request
+    from broadcast import POST_HEADER
+    request = urllib.request.Request(f"http://{address}/control", data=line.encode(), method="POST",
+                                     headers={POST_HEADER: "1", "Content-Type": "text/plain; charset=utf-8"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read().decode().strip()
+    except urllib.error.HTTPError as e:
+        # Rejected commands still carry the reply line
+        return e.read().decode().strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Control a running SANS Timer")
+    parser.add_argument("command", nargs="+", help="command, e.g. start for 45m")
+    parser.add_argument("--name", default=DEFAULT_NAME, help="control channel name (--control NAME)")
+    parser.add_argument("--http", metavar="HOST:PORT", help="use the HTTP endpoint instead")
+    parser.add_argument("--latency", action="store_true", help="print the round-trip time")
+    args = parser.parse_args()
+
+    line = " ".join(args.command)
+    try:
+        parse_command(line)  # Catch typos before connecting
+        started = time.perf_counter()
+        if args.http:
+            reply = send_http(line, args.http)
+        else:
+            reply = send_command(line, args.name)
+        elapsed = time.perf_counter() - started
+    except CommandError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+    except OSError as e:
+        print(f"Error: Could not reach the timer: {e}")
+        sys.exit(1)
+    print(reply)
+    if args.latency:
+        print(f"Round trip: {elapsed * 1000:.3f} ms")
+    if not reply.startswith("ok"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
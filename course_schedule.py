@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Course schedules for SANS Timer
+
+A schedule is a JSON file listing the sessions, breaks, lunches and labs of a
+course. Repeating events use iCalendar recurrence rules:
+
+    {
+        "start": "2024-06-03",
+        "events": [
+            {"name": "Class starts", "time": "09:00", "rrule": "FREQ=DAILY;COUNT=6"},
+            {"name": "Lunch ends", "time": "13:30", "rrule": "FREQ=DAILY;COUNT=6"},
+            {"name": "CTF begins", "time": "10:00", "date": "2024-06-08"}
+        ]
+    }
+
+Every occurrence is expanded once, when the file is loaded, into a sorted
+array of timestamps, so finding the next event is a binary search.
+"""
+
+import json
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from dateutil.rrule import rrulestr
+
+
+# Recurrences without COUNT or UNTIL are expanded this far past the start
+DEFAULT_HORIZON_DAYS = 366
+
+
+class ScheduleError(ValueError):
+    """Raised when a schedule file cannot be understood"""
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD date"""
+    return datetime.strptime(value, "%Y-%m-%d")
+
+
+def parse_time(value):
+    """Parse an HH:MM time of day into (hour, minute)"""
+    parsed = datetime.strptime(value, "%H:%M")
+    return parsed.hour, parsed.minute
+
+
+class CourseSchedule:
+    """Sorted occurrences of every event in a course"""
+
+    def __init__(self, occurrences):
+        occurrences = sorted(occurrences)
+        # Parallel compact arrays: POSIX timestamps and indexes into self.names
+        self.names = []
+        name_index = {}
+        self.times = array('d')
+        self.name_ids = array('I')
+        for when, name in occurrences:
+            if name not in name_index:
+                name_index[name] = len(self.names)
+                self.names.append(name)
+            self.times.append(when.timestamp())
+            self.name_ids.append(name_index[name])
+
+    def __len__(self):
+        return len(self.times)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a schedule from the parsed contents of a schedule file"""
+        if not isinstance(data, dict):
+            raise ScheduleError("Invalid schedule: expected an object with the events")
+        try:
+            start = parse_date(data["start"]) if "start" in data else None
+            horizon = data.get("horizon_days", DEFAULT_HORIZON_DAYS)
+            occurrences = []
+            for event in data["events"]:
+                if not isinstance(event, dict):
+                    raise ScheduleError(f"Invalid schedule: event {event!r} is not an object")
+                name = event["name"]
+                hour, minute = parse_time(event["time"])
+                first_day = parse_date(event["date"]) if "date" in event else start
+                if first_day is None:
+                    raise ScheduleError(f"Event {name!r} needs a date or a schedule start")
+                dtstart = first_day.replace(hour=hour, minute=minute)
+
+                if "rrule" not in event:
+                    occurrences.append((dtstart, name))
+                    continue
+                rule = rrulestr(event["rrule"], dtstart=dtstart)
+                if getattr(rule, "_count", None) or getattr(rule, "_until", None):
+                    occurrences.extend((when, name) for when in rule)
+                else:
+                    # Only rules that would otherwise repeat forever stop at the horizon
+                    end = dtstart + timedelta(days=horizon)
+                    occurrences.extend((when, name) for when in rule.between(dtstart, end, inc=True))
+        except ScheduleError:
+            raise
+        except (KeyError, TypeError, ValueError) as e:
+            raise ScheduleError(f"Invalid schedule: {e}") from e
+        return cls(occurrences)
+
+    @classmethod
+    def load(cls, path):
+        """Load a schedule from a JSON file"""
+        try:
+            with open(path, encoding="utf-8") as schedule_file:
+                data = json.load(schedule_file)
+        except (OSError, ValueError) as e:
+            raise ScheduleError(f"Could not read schedule {path}: {e}") from e
+        return cls.from_dict(data)
+
+    def next_event(self, now):
+        """Return (time, name) of the first event after now, or None when the course is over"""
+        index = bisect_right(self.times, now.timestamp())
+        if index == len(self.times):
+            return None
+        return (datetime.fromtimestamp(self.times[index]),
+                self.names[self.name_ids[index]])
+
+    def events(self):
+        """Yield (time, name) for every event in order"""
+        for when, name_id in zip(self.times, self.name_ids):
+            yield datetime.fromtimestamp(when), self.names[name_id]
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: course_schedule.py SCHEDULE.json")
+        sys.exit(2)
+    started = time.perf_counter()
+    try:
+        schedule = CourseSchedule.load(sys.argv[1])
+    except ScheduleError as e:
+        print(e)
+        sys.exit(1)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"Loaded {len(schedule)} events in {elapsed:.2f} ms")
+    for when, name in schedule.events():
+        print(f"  {when:%a %Y-%m-%d %H:%M}  {name}")
+
+
+if __name__ == "__main__":
+    main()
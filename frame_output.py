@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Shared-memory frame output of the SANS Timer countdown
+
+Instead of screen-capturing the timer window, a streaming or recording setup
+can read the countdown straight from a memory-mapped file that the timer
+renders into with --frame-output. A frame is written only when a digit or the
+colors change, and only the changed cells are copied into the mapping.
+
+The file starts with a 64 byte little-endian header, followed by the pixels:
+
+    offset  size  field
+    0       8     magic b"SANSFRM1"
+    8       4     version (1)
+    12      4     header size (64); pixels start here
+    16      8     sequence: odd while a frame is being written, even when complete
+    24      4     width in pixels
+    28      4     height in pixels
+    32      4     stride: bytes per row (width * 4)
+    36      4     pixel format (1: 32-bit premultiplied ARGB words, BGRA bytes on
+                  little-endian machines)
+    40      8     capacity: pixel bytes available after the header
+    48      8     time the frame was completed (Unix seconds, double)
+    56      8     reserved (0)
+
+A reader reads the sequence, skips the frame if it is odd, reads the pixels in
+place (e.g. uploads them as a texture) and reads the sequence again: equal
+values mean the frame is whole. When the countdown grows wider than the
+capacity, the file is enlarged, so a reader remaps when the capacity exceeds
+what it mapped. The background can be transparent for overlays.
+
+The reader needs no Qt; to watch a running timer's frames:
+
+    python frame_output.py --watch
+    python frame_output.py --ppm frame.ppm
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+from timer_engine import STAGE_NORMAL, STAGE_WARNING, stage_colors
+
+
+MAGIC = b"SANSFRM1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQIIIIQdQ")
+HEADER_SIZE = HEADER.size  # 64
+SEQUENCE = struct.Struct("<Q")
+SEQUENCE_OFFSET = 16
+FORMAT_ARGB32_PREMULTIPLIED = 1
+
+
+def default_frame_path():
+    """Return where frames are shared: RAM-backed /dev/shm where it exists"""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(directory, f"sans_timer_frame-{user}")
+
+
+class SharedFrameOutput:
+    """Renders the countdown into a memory-mapped frame, following a timer display
+
+    Stands in for a TimerDisplay in its outputs list: it gets the same
+    update_display and set_colors calls and draws them on its own GlyphFrame.
+    """
+
+    def __init__(self, path=None, font=None, transparent=False):
+        from PyQt5.QtGui import QColor, QFont
+        from glyph_display import GlyphFrame
+        self.path = path or default_frame_path()
+        self.transparent = transparent
+        self.frames = 0
+        self.sequence = 0
+        self.current_time_str = "00:00:00"
+        self.style_key = None
+        self.stage_styles = {}
+        self._file = open(self.path, "w+b")
+        self._map = None
+        self._image = None
+        self._pixels = None  # ctypes view keeping the mapping's address for the image
+        self._transparent = QColor(0, 0, 0, 0)
+        self.frame = GlyphFrame(self.current_time_str, font or QFont('Arial', 48, QFont.Bold))
+        self.frame.changed.connect(self.on_frame_changed)
+        self.on_frame_changed(None)
+
+    def set_colors(self, normal_color, warning_color, background_color, caution_color):
+        """Take the colors of the display this output follows (add_output passes all four)"""
+        background = self._transparent if self.transparent else background_color
+        self.stage_styles = stage_colors(normal_color, caution_color, warning_color, background)
+        if self.style_key is not None:
+            self.frame.set_colors(*self.stage_styles[self.style_key])
+
+    def update_display(self, time_str, is_warning=False, stage=None, blink=False):
+        if time_str != self.current_time_str:
+            self.current_time_str = time_str
+            self.frame.setText(time_str)
+        if stage is None:
+            stage = STAGE_WARNING if is_warning else STAGE_NORMAL
+        if (stage, blink) != self.style_key:
+            self.style_key = (stage, blink)
+            self.frame.set_colors(*self.stage_styles[self.style_key])
+
+    def on_frame_changed(self, rect):
+        """Copy the changed part of the frame into the mapping"""
+        from PyQt5.QtCore import QRect
+        from PyQt5.QtGui import QPainter
+        pixmap = self.frame.pixmap
+        width, height = pixmap.width(), pixmap.height()
+        if self._image is None or (self._image.width(), self._image.height()) != (width, height):
+            self._resize(width, height)
+            rect = None
+        if rect is None:
+            rect = QRect(0, 0, width, height)
+        # The frame is rendered at pixel ratio 1, so logical and device pixels agree
+        self._begin()
+        painter = QPainter(self._image)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.drawPixmap(rect, pixmap, rect)
+        painter.end()
+        self._end(width, height)
+
+    def _resize(self, width, height):
+        """Point the image at a mapping large enough for width x height pixels"""
+        import ctypes
+        from PyQt5 import sip
+        from PyQt5.QtGui import QImage
+        needed = width * height * 4
+        capacity = self._map.size() - HEADER_SIZE if self._map is not None else 0
+        if needed > capacity:
+            self._image = self._pixels = None
+            if self._map is not None:
+                self._map.close()
+            # Leave room for the countdown to grow (overtime, fractions) without another remap
+            capacity = needed * 2
+            self._file.truncate(HEADER_SIZE + capacity)
+            self._map = mmap.mmap(self._file.fileno(), HEADER_SIZE + capacity)
+        self._pixels = ctypes.c_char.from_buffer(self._map, HEADER_SIZE)
+        self._image = QImage(sip.voidptr(ctypes.addressof(self._pixels)), width, height, width * 4,
+                             QImage.Format_ARGB32_Premultiplied)
+
+    def _begin(self):
+        self.sequence += 1
+        SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self.sequence)
+
+    def _end(self, width, height):
+        self.sequence += 1
+        HEADER.pack_into(self._map, 0, MAGIC, VERSION, HEADER_SIZE, self.sequence, width, height, width * 4,
+                         FORMAT_ARGB32_PREMULTIPLIED, self._map.size() - HEADER_SIZE, time.time(), 0)
+        self.frames += 1
+
+    def close(self):
+        """Unmap and remove the frame file"""
+        self._image = self._pixels = None
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+
+class FrameReader:
+    """Reads whole frames from a shared frame file without Qt"""
+
+    def __init__(self, path=None):
+        self.path = path or default_frame_path()
+        self._file = open(self.path, "rb")
+        self._map = None
+        self._remap()
+
+    def _remap(self):
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def header(self):
+        """Return the header fields as a dict"""
+        fields = HEADER.unpack_from(self._map, 0)
+        if fields[0] != MAGIC or fields[1] != VERSION:
+            raise ValueError(f"{self.path} is not a version {VERSION} SANS Timer frame")
+        names = ("magic", "version", "header_size", "sequence", "width", "height", "stride",
+                 "format", "capacity", "timestamp", "reserved")
+        return dict(zip(names, fields))
+
+    def sequence(self):
+        return SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+
+    def read(self, attempts=100):
+        """Return (header, pixels) of a complete frame, retrying while one is being written"""
+        for _ in range(attempts):
+            header = self.header()
+            if header["sequence"] % 2:
+                time.sleep(0.0005)
+                continue
+            if header["header_size"] + header["capacity"] > len(self._map):
+                self._remap()
+                continue
+            start = header["header_size"]
+            pixels = self._map[start:start + header["stride"] * header["height"]]
+            if self.sequence() == header["sequence"]:
+                return header, pixels
+        raise TimeoutError(f"No complete frame in {self.path}")
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+def write_ppm(path, header, pixels, background=(0, 0, 0)):
+    """Save a frame as a binary PPM, composited over a background color"""
+    out = bytearray()
+    for offset in range(0, len(pixels), 4):
+        b, g, r, a = pixels[offset:offset + 4]
+        # Premultiplied, so compositing only adds the background's share
+        out += bytes(min(255, c + bg * (255 - a) // 255) for c, bg in zip((r, g, b), background))
+    with open(path, "wb") as ppm:
+        ppm.write(b"P6 %d %d 255\n" % (header["width"], header["height"]) + out)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read SANS Timer shared-memory frames")
+    parser.add_argument("path", nargs="?", default=None, help="frame file (default: the per-user one)")
+    parser.add_argument("--watch", action="store_true", help="print every new frame as it arrives")
+    parser.add_argument("--ppm", metavar="FILE", help="save the current frame as an image")
+    args = parser.parse_args()
+
+    try:
+        reader = FrameReader(args.path)
+        header, pixels = reader.read()
+    except (OSError, ValueError, TimeoutError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if args.ppm:
+        write_ppm(args.ppm, header, pixels)
+    print(f"Frame {header['sequence'] // 2}: {header['width']}x{header['height']}, "
+          f"{sum(1 for alpha in pixels[3::4] if alpha)} opaque pixels")
+    last = header["sequence"]
+    try:
+        while args.watch:
+            time.sleep(0.005)
+            if reader.sequence() != last:
+                header, pixels = reader.read()
+                last = header["sequence"]
+                delay = (time.time() - header["timestamp"]) * 1000
+                print(f"Frame {last // 2}: {header['width']}x{header['height']}, read {delay:.2f} ms after it "
+                      f"was written")
+    except KeyboardInterrupt:
+        pass
+    reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Glyph atlas rendering for the SANS Timer countdown
+"""
+
+import re
+import time
+
+from PyQt5.QtWidgets import QWidget, QSizePolicy
+from PyQt5.QtCore import Qt, QObject, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QFont, QFontMetrics, QPainter, QPixmap, QColor
+
+
+# Every character the countdown can show; "-" marks overtime, "." a fraction of a second
+GLYPHS = "0123456789:-."
+
+# Atlases are shared between widgets; keep only a handful of font/color combinations
+ATLAS_CACHE_LIMIT = 32
+_atlas_cache = {}
+
+# Fitted font sizes per (box, DPI, font); a resize or screen change is then one lookup
+FIT_CACHE_LIMIT = 256
+_fit_cache = {}
+
+# Widest countdown layout; digits share one cell width, so 8 stands in for all of them
+FIT_SAMPLE = "88:88:88"
+
+
+class GlyphAtlas:
+    """A strip of pre-rendered glyphs for one font, color and pixel ratio"""
+
+    def __init__(self, font, color, pixel_ratio=1.0):
+        metrics = QFontMetrics(font)
+        self.height = metrics.height()
+        digit_width = max(metrics.horizontalAdvance(c) for c in "0123456789")
+
+        # Digits share one cell width so changing a digit never moves its neighbours
+        self.widths = {}
+        self.offsets = {}
+        x = 0
+        for char in GLYPHS:
+            width = digit_width if char.isdigit() else metrics.horizontalAdvance(char)
+            self.widths[char] = width
+            self.offsets[char] = x
+            x += width
+
+        self.strip_width = x
+        self.font = QFont(font)
+        self.color = QColor(color)
+        self.pixel_ratio = pixel_ratio
+        # Rasterized on the first draw, so hidden windows never pay for it
+        self.pixmap = None
+
+    def render(self):
+        """Rasterize every glyph once onto a transparent strip"""
+        ratio = self.pixel_ratio
+        self.pixmap = QPixmap(int(self.strip_width * ratio), int(self.height * ratio))
+        self.pixmap.setDevicePixelRatio(ratio)
+        self.pixmap.fill(Qt.transparent)
+        painter = QPainter(self.pixmap)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.setFont(self.font)
+        painter.setPen(self.color)
+        for char in GLYPHS:
+            painter.drawText(QRect(self.offsets[char], 0, self.widths[char], self.height),
+                             Qt.AlignCenter, char)
+        painter.end()
+
+    def text_width(self, text):
+        """Return the width of the given text in logical pixels"""
+        return sum(self.widths.get(char, 0) for char in text)
+
+    def draw(self, painter, x, y, char):
+        """Blit a single glyph with its top-left corner at (x, y)"""
+        if char not in self.offsets:
+            return
+        if self.pixmap is None:
+            self.render()
+        width = self.widths[char]
+        ratio = self.pixel_ratio
+        source = QRect(int(self.offsets[char] * ratio), 0,
+                       int(width * ratio), int(self.height * ratio))
+        painter.drawPixmap(QRect(x, y, width, self.height), self.pixmap, source)
+
+
+def get_atlas(font, color, pixel_ratio=1.0):
+    """Return a cached atlas for the font and color, rendering it on first use"""
+    key = (font.key(), QColor(color).rgba(), pixel_ratio)
+    atlas = _atlas_cache.get(key)
+    if atlas is None:
+        if len(_atlas_cache) >= ATLAS_CACHE_LIMIT:
+            _atlas_cache.clear()
+        atlas = GlyphAtlas(font, color, pixel_ratio)
+        _atlas_cache[key] = atlas
+    return atlas
+
+
+def fit_sample(text):
+    """Return the layout of text with every digit replaced by 8, for fitted_font"""
+    return re.sub(r"\d", "8", text)
+
+
+def text_box(font, sample):
+    """Return the (width, height) in pixels of sample laid out in atlas cells"""
+    metrics = QFontMetrics(font)
+    digit_width = max(metrics.horizontalAdvance(c) for c in "0123456789")
+    width = sum(digit_width if char.isdigit() else metrics.horizontalAdvance(char) for char in sample)
+    return width, metrics.height()
+
+
+def fitted_font(font, width, height, dpi, sample=FIT_SAMPLE):
+    """Return font at the largest point size whose sample box fits width x height
+
+    Point sizes are binary searched and converted to pixels at dpi, so the
+    result does not depend on the screen the metrics happen to use.
+    """
+    key = (font.family(), font.weight(), font.italic(), width, height, dpi, sample)
+    pixel_size = _fit_cache.get(key)
+    if pixel_size is None:
+        candidate = QFont(font)
+
+        def fits(points):
+            candidate.setPixelSize(max(1, round(points * dpi / 72)))
+            box_width, box_height = text_box(candidate, sample)
+            return box_width <= width and box_height <= height
+
+        low, high = 1, max(2, int(height * 72 / dpi) + 1)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if fits(middle):
+                low = middle
+            else:
+                high = middle - 1
+        pixel_size = max(1, round(low * dpi / 72))
+        if len(_fit_cache) >= FIT_CACHE_LIMIT:
+            _fit_cache.clear()
+        _fit_cache[key] = pixel_size
+    fitted = QFont(font)
+    fitted.setPixelSize(pixel_size)
+    return fitted
+
+
+class GlyphTimerWidget(QWidget):
+    """Countdown widget that paints from a glyph atlas and repaints only changed digits"""
+
+    def __init__(self, text="00:00:00", font=None, parent=None):
+        super().__init__(parent)
+        self._text = text
+        self._font = font or QFont('Arial', 48, QFont.Bold)
+        self._color = QColor(255, 255, 255)
+        self._background = QColor(0, 0, 0)
+        self._atlas = None
+        self._cells = []
+        self._fit_font = None  # Font to scale to the widget's size, in fit mode
+        # Optional callable given the seconds each paint took
+        self.paint_observer = None
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
+        self._relayout()
+
+    def atlas(self):
+        """Return the atlas for the current font, color and screen pixel ratio"""
+        if self._atlas is None:
+            self._atlas = get_atlas(self._font, self._color, self.devicePixelRatioF())
+        return self._atlas
+
+    def text(self):
+        """Return the text currently displayed"""
+        return self._text
+
+    def setText(self, text):
+        """Display new text, invalidating only the cells whose glyph changed"""
+        if text == self._text:
+            return
+        old_text = self._text
+        self._text = text
+
+        if len(text) != len(old_text) or any(
+                a != b and not (a.isdigit() and b.isdigit()) for a, b in zip(text, old_text)):
+            # The cell layout itself changed
+            if self._fit_font is not None:
+                self._fit()
+            self._relayout()
+            self.updateGeometry()
+            self.update()
+            return
+
+        for index, (new_char, old_char) in enumerate(zip(text, old_text)):
+            if new_char != old_char:
+                self.update(self._cells[index])
+
+    def font(self):
+        """Return the countdown font"""
+        return self._font
+
+    def setFont(self, font):
+        """Change the countdown font"""
+        self._font = QFont(font)
+        self._atlas = None
+        if self._fit_font is not None:
+            self._fit_font = QFont(font)
+            self._fit()
+        self._relayout()
+        self.updateGeometry()
+        self.update()
+
+    def set_fit(self, fit):
+        """Scale the font to the largest size that fits the widget, or go back to the set size"""
+        if fit == (self._fit_font is not None):
+            return
+        if fit:
+            self._fit_font = QFont(self._font)
+            self.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Ignored)
+            self._fit()
+        else:
+            self._font = self._fit_font
+            self._fit_font = None
+            self._atlas = None
+            self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
+        self._relayout()
+        self.updateGeometry()
+        self.update()
+
+    def _fit(self):
+        """Pick the fitted font for the current size, usually from the cache"""
+        font = fitted_font(self._fit_font, self.width(), self.height(), self.logicalDpiY(),
+                           fit_sample(self._text))
+        if font != self._font:
+            self._font = font
+            self._atlas = None
+
+    def set_text_color(self, color):
+        """Change the glyph color"""
+        if QColor(color) == self._color:
+            return
+        self._color = QColor(color)
+        self._atlas = None
+        self.update()
+
+    def set_background_color(self, color):
+        """Change the background color painted behind the glyphs"""
+        if QColor(color) == self._background:
+            return
+        self._background = QColor(color)
+        self.update()
+
+    def sizeHint(self):
+        atlas = self.atlas()
+        return QSize(atlas.text_width(self._text), atlas.height)
+
+    def minimumSizeHint(self):
+        return self.sizeHint()
+
+    def _relayout(self):
+        """Compute the rectangle of every character cell, centered in the widget"""
+        atlas = self.atlas()
+        x = (self.width() - atlas.text_width(self._text)) // 2
+        y = (self.height() - atlas.height) // 2
+        self._cells = []
+        for char in self._text:
+            width = atlas.widths.get(char, 0)
+            self._cells.append(QRect(x, y, width, atlas.height))
+            x += width
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self._fit_font is not None:
+            self._fit()
+        self._relayout()
+
+    def paintEvent(self, event):
+        started = time.perf_counter()
+        # Moving to a screen with a different pixel ratio needs a new atlas
+        if self._atlas is not None and self._atlas.pixel_ratio != self.devicePixelRatioF():
+            self._atlas = None
+        painter = QPainter(self)
+        dirty = event.rect()
+        painter.fillRect(dirty, self._background)
+        atlas = self.atlas()
+        for char, cell in zip(self._text, self._cells):
+            if cell.intersects(dirty):
+                atlas.draw(painter, cell.x(), cell.y(), char)
+        painter.end()
+        if self.paint_observer is not None:
+            self.paint_observer(time.perf_counter() - started)
+
+
+class GlyphFrame(QObject):
+    """Countdown rendered once into a pixmap that any number of views can blit"""
+
+    changed = pyqtSignal(QRect)  # Dirty area of the frame in logical pixels
+
+    def __init__(self, text="00:00:00", font=None, pixel_ratio=1.0, parent=None):
+        super().__init__(parent)
+        self._text = text
+        self._font = font or QFont('Arial', 48, QFont.Bold)
+        self._color = QColor(255, 255, 255)
+        self._background = QColor(0, 0, 0)
+        self.pixel_ratio = pixel_ratio
+        self.pixmap = None
+        self._size = QSize()
+        self._cells = []
+        self._render_all()
+
+    def atlas(self):
+        """Return the atlas for the current font, color and pixel ratio"""
+        return get_atlas(self._font, self._color, self.pixel_ratio)
+
+    def size(self):
+        """Return the size of the frame in logical pixels"""
+        return QSize(self._size)
+
+    def text(self):
+        """Return the text currently rendered"""
+        return self._text
+
+    def font(self):
+        """Return the countdown font"""
+        return self._font
+
+    def background_color(self):
+        """Return the background color of the frame"""
+        return self._background
+
+    def setText(self, text):
+        """Render new text, redrawing only the cells whose glyph changed"""
+        if text == self._text:
+            return
+        old_text = self._text
+        self._text = text
+        if len(text) != len(old_text) or any(
+                a != b and not (a.isdigit() and b.isdigit()) for a, b in zip(text, old_text)):
+            self._render_all()
+            return
+
+        atlas = self.atlas()
+        dirty = QRect()
+        painter = QPainter(self.pixmap)
+        for char, old_char, cell in zip(text, old_text, self._cells):
+            if char != old_char:
+                self._draw_cell(painter, atlas, cell, char)
+                dirty = dirty.united(cell)
+        painter.end()
+        self.changed.emit(dirty)
+
+    def setFont(self, font):
+        """Change the countdown font"""
+        self._font = QFont(font)
+        self._render_all()
+
+    def set_text_color(self, color):
+        """Change the glyph color"""
+        if QColor(color) != self._color:
+            self._color = QColor(color)
+            self._render_all()
+
+    def set_background_color(self, color):
+        """Change the background color, which may be transparent"""
+        if QColor(color) != self._background:
+            self._background = QColor(color)
+            self._render_all()
+
+    def set_colors(self, color, background):
+        """Change the glyph and background colors with a single render"""
+        if QColor(color) != self._color or QColor(background) != self._background:
+            self._color = QColor(color)
+            self._background = QColor(background)
+            self._render_all()
+
+    def set_pixel_ratio(self, pixel_ratio):
+        """Render for screens with the given device pixel ratio"""
+        if pixel_ratio != self.pixel_ratio:
+            self.pixel_ratio = pixel_ratio
+            self._render_all()
+
+    def _draw_cell(self, painter, atlas, cell, char):
+        # Replace rather than blend, so transparent backgrounds are cleared too
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(cell, self._background)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        atlas.draw(painter, cell.x(), cell.y(), char)
+
+    def _render_all(self):
+        """Lay out every cell and render the whole frame"""
+        atlas = self.atlas()
+        width = max(1, atlas.text_width(self._text))
+        self.pixmap = QPixmap(int(width * self.pixel_ratio), int(atlas.height * self.pixel_ratio))
+        self.pixmap.setDevicePixelRatio(self.pixel_ratio)
+        self.pixmap.fill(self._background)
+        self._size = QSize(width, atlas.height)
+        self._cells = []
+        x = 0
+        painter = QPainter(self.pixmap)
+        for char in self._text:
+            cell = QRect(x, 0, atlas.widths.get(char, 0), atlas.height)
+            self._cells.append(cell)
+            atlas.draw(painter, x, 0, char)
+            x += cell.width()
+        painter.end()
+        self.changed.emit(QRect(0, 0, width, atlas.height))
+
+
+class FrameView(QWidget):
+    """Widget that blits the dirty parts of a shared GlyphFrame"""
+
+    MARGIN = 10
+
+    def __init__(self, frame, parent=None):
+        super().__init__(parent)
+        self.frame = frame
+        self._frame_size = frame.size()
+        self.keep_size = False  # Set when the window's size is chosen elsewhere, e.g. to fill a screen
+        # Optional callable given the seconds each paint took
+        self.paint_observer = None
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        frame.changed.connect(self.on_frame_changed)
+        if self.isWindow():
+            self.resize(self.sizeHint())
+
+    def sizeHint(self):
+        size = self.frame.size()
+        return QSize(size.width() + 2 * self.MARGIN, size.height() + 2 * self.MARGIN)
+
+    def frame_origin(self):
+        """Return the top-left corner of the frame, centered in the widget"""
+        size = self.frame.size()
+        return ((self.width() - size.width()) // 2, (self.height() - size.height()) // 2)
+
+    def on_frame_changed(self, rect):
+        if self.frame.size() != self._frame_size:
+            # The frame changed size, so resize and repaint everything
+            self._frame_size = self.frame.size()
+            self.updateGeometry()
+            if self.isWindow() and not self.keep_size:
+                self.resize(self.sizeHint())
+            self.update()
+            return
+        x, y = self.frame_origin()
+        self.update(rect.translated(x, y))
+
+    def paintEvent(self, event):
+        started = time.perf_counter()
+        painter = QPainter(self)
+        dirty = event.rect()
+        x, y = self.frame_origin()
+        painter.fillRect(dirty, self.frame.background_color())
+        # Copy just the dirty part of the shared frame
+        target = dirty.intersected(QRect(x, y, self.frame.size().width(), self.frame.size().height()))
+        if not target.isEmpty():
+            ratio = self.frame.pixel_ratio
+            source = target.translated(-x, -y)
+            painter.drawPixmap(target, self.frame.pixmap,
+                               QRect(int(source.x() * ratio), int(source.y() * ratio),
+                                     int(source.width() * ratio), int(source.height() * ratio)))
+        painter.end()
+        if self.paint_observer is not None:
+            self.paint_observer(time.perf_counter() - started)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Display-only SANS Timer for machines that just drive a projector
+
+Builds the timer display and nothing else: no control panel, dialogs or color
+settings. Commands use the control_api protocol and come from the command
+line, from a file that is re-read whenever it changes, from a local socket, or
+from a sync leader:
+
+    python kiosk.py start for 45m
+    python kiosk.py --commands /srv/timer/commands.txt
+    python kiosk.py --control
+    python kiosk.py --sync-follow leader-host:8766
+    python kiosk.py --hooks hooks.json start for 45m
+"""
+
+import argparse
+import sys
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QFileSystemWatcher, pyqtSignal
+
+from timer_engine import (TimerEngine, format_time, add_engine_arguments, engine_from_args, STAGE_NAMES,
+                          STAGE_NORMAL, STAGE_ENDED)
+from control_api import CommandError, parse_command, start_mode
+from sans_timer import (TimerDisplay, MirroredTimerDisplay, DeadlineScheduler, ControlServer,
+                        StartupTimer, MAIN_TIMER, parse_screens)
+
+
+# Mode used by "start" until another is chosen, like the control panel's default
+DEFAULT_MODE = ("for", 0, 30, 0)
+
+
+class KioskController(QObject):
+    """Runs the countdown for a display without any control widgets"""
+
+    leader_state = pyqtSignal(dict)  # State from a sync leader, emitted on its network thread
+
+    def __init__(self, timer_display, engine=None, schedule=None):
+        super().__init__()
+        self.timer_display = timer_display
+        self.engine = engine or TimerEngine()
+        self.schedule = schedule
+        self.mode = ("schedule",) if schedule is not None else DEFAULT_MODE
+        self.sync_follower = None
+        self.scheduler = DeadlineScheduler(self.engine.clock, self)
+        self.scheduler.ticked.connect(self.update_timer)
+        self.leader_state.connect(self.apply_leader_state)
+
+    def apply_command(self, command):
+        """Carry out a parsed control_api command"""
+        verb, mode = command
+        if mode is not None:
+            self.mode = mode
+        if verb == "start":
+            self.start_timer()
+        elif verb == "stop":
+            self.stop_timer()
+        elif verb == "reset":
+            self.reset_timer()
+        elif verb == "show":
+            self.timer_display.show()
+        elif verb == "hide":
+            self.timer_display.hide()
+
+    def start_timer(self):
+        if not start_mode(self.engine, self.mode, self.schedule):
+            print("Warning: No more scheduled events")
+            return
+        self.scheduler.add(MAIN_TIMER, self.engine)
+        self.update_timer()
+
+    def stop_timer(self):
+        self.scheduler.remove(MAIN_TIMER)
+        self.engine.stop()
+        if self.engine.stage == STAGE_ENDED:
+            self.timer_display.update_display(self.timer_display.current_time_str, stage=STAGE_ENDED)
+
+    def reset_timer(self):
+        self.stop_timer()
+        self.engine.reset()
+        self.timer_display.update_display("00:00:00")
+
+    def update_timer(self, name=MAIN_TIMER, lateness=0.0):
+        state = self.engine.state()
+        if state.ended and self.mode == ("schedule",) and self.sync_follower is None:
+            # Chain straight on to the next scheduled event
+            if start_mode(self.engine, self.mode, self.schedule):
+                self.scheduler.add(MAIN_TIMER, self.engine)
+                state = self.engine.state()
+        # Ended countdowns keep ticking so the display flashes until stopped
+        self.timer_display.update_display(state.text, state.is_warning, state.stage, state.blink)
+
+    def follow_leader(self, follower):
+        """Show the countdown of the instance that follower tracks"""
+        self.sync_follower = follower
+        follower.on_state = self.leader_state.emit
+
+    def apply_leader_state(self, state):
+        """Show the leader's countdown, its deadline already on our clock"""
+        if state.get("end_time") is None:
+            self.reset_timer()
+        elif state.get("running"):
+            self.engine.resume(state)
+            self.scheduler.add(MAIN_TIMER, self.engine)
+            self.update_timer()
+        elif state.get("stage") == "ended" and self.engine.stage == STAGE_ENDED:
+            pass  # Our copy of the countdown ended too and keeps flashing
+        else:
+            self.stop_timer()
+            stage = STAGE_NAMES.index(state["stage"]) if state.get("stage") in STAGE_NAMES else STAGE_NORMAL
+            self.timer_display.update_display(format_time(state.get("remaining", 0)), stage=stage)
+
+
+class CommandFile(QObject):
+    """Applies the commands in a file at startup and whenever the file changes"""
+
+    def __init__(self, path, controller):
+        super().__init__(controller)
+        self.path = path
+        self.controller = controller
+        self.watcher = QFileSystemWatcher([path], self)
+        self.watcher.fileChanged.connect(self.on_changed)
+        self.apply()
+
+    def on_changed(self, path):
+        # Editors that replace the file drop it from the watcher
+        if path not in self.watcher.files():
+            self.watcher.addPath(path)
+        self.apply()
+
+    def apply(self):
+        try:
+            with open(self.path, encoding="utf-8") as command_file:
+                lines = command_file.read().splitlines()
+        except OSError as e:
+            print(f"Warning: Could not read commands from {self.path}: {e}")
+            return
+        for line in lines:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                self.controller.apply_command(parse_command(line))
+            except CommandError as e:
+                print(f"Warning: {self.path}: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Display-only SANS Timer")
+    parser.add_argument("command", nargs="*", help="command to run at startup, e.g. start for 45m")
+    parser.add_argument("--commands", metavar="FILE",
+                        help="apply the commands in FILE now and whenever it changes")
+    parser.add_argument("--control", nargs="?", const="sans_timer", metavar="NAME",
+                        help="accept commands from control_api.py over a local socket")
+    parser.add_argument("--sync-follow", metavar="HOST[:PORT]",
+                        help="follow the countdown of the instance leading at this address")
+    parser.add_argument("--mirror", nargs="?", const=[], type=parse_screens, metavar="SCREENS",
+                        help="show the timer on every screen, or on a comma-separated list")
+    parser.add_argument("--fit", action="store_true",
+                        help="fill the screen, with the digits as large as it allows")
+    parser.add_argument("--schedule", metavar="FILE",
+                        help="course schedule (JSON) for the schedule mode")
+    parser.add_argument("--frame-output", nargs="?", const="", metavar="FILE",
+                        help="also render the countdown into a shared-memory frame for capture "
+                             "(see frame_output.py; default: a per-user file in /dev/shm)")
+    parser.add_argument("--frame-transparent", action="store_true",
+                        help="give the shared-memory frame a transparent background")
+    parser.add_argument("--hooks", metavar="FILE",
+                        help="run the commands and webhooks in FILE (JSON) at the countdown's thresholds")
+    add_engine_arguments(parser)
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="print a breakdown of the time taken to show the first frame")
+    # Leave any Qt options (e.g. -platform) for QApplication
+    args, _ = parser.parse_known_args()
+    startup = StartupTimer(args.startup_timing)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    startup.mark("application created")
+
+    schedule = None
+    if args.schedule:
+        from course_schedule import CourseSchedule, ScheduleError
+        try:
+            schedule = CourseSchedule.load(args.schedule)
+        except ScheduleError as e:
+            print(f"Warning: {e}")
+
+    if args.mirror is None:
+        timer_display = TimerDisplay()
+    else:
+        timer_display = MirroredTimerDisplay(args.mirror or None)
+    if args.fit:
+        timer_display.set_fit(True)
+    engine = engine_from_args(args)
+    controller = KioskController(timer_display, engine, schedule)
+    startup.mark("timer display created")
+
+    if args.frame_output is not None:
+        from frame_output import SharedFrameOutput
+        try:
+            frame_output = SharedFrameOutput(args.frame_output or None, transparent=args.frame_transparent)
+        except OSError as e:
+            print(f"Warning: Could not create the frame output: {e}")
+        else:
+            timer_display.add_output(frame_output)
+            app.aboutToQuit.connect(frame_output.close)
+            print(f"Sharing frames in {frame_output.path}")
+    if args.hooks:
+        from action_hooks import HookRunner, HookError, load_hooks
+        try:
+            hook_runner = HookRunner(load_hooks(args.hooks))
+        except HookError as e:
+            print(f"Warning: {e}")
+        else:
+            hook_runner.attach(engine)
+            app.aboutToQuit.connect(hook_runner.stop)
+    if args.command:
+        try:
+            controller.apply_command(parse_command(" ".join(args.command)))
+        except CommandError as e:
+            print(f"Error: {e}")
+            sys.exit(2)
+    if args.commands:
+        CommandFile(args.commands, controller)  # Parented to the controller, which keeps it alive
+    if args.control is not None:
+        control_server = ControlServer(controller, controller)
+        control_server.listen(args.control)
+    if args.sync_follow:
+        from lan_sync import SyncFollower, parse_address
+        try:
+            follower = SyncFollower(*parse_address(args.sync_follow))
+        except ValueError as e:
+            print(f"Warning: Invalid leader address {args.sync_follow}: {e}")
+        else:
+            controller.follow_leader(follower)
+            follower.start()
+
+    timer_display.show()
+    startup.mark("display shown")
+    startup.report_on_first_paint(timer_display.top_level_windows()[0])
+    sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Leader/follower synchronization of SANS Timer instances over UDP
+
+The leader owns the countdown and sends its state (with the deadline as an
+absolute timestamp on its own clock) to every follower whenever it changes.
+Followers ping the leader regularly; each reply carries the leader's receive
+and send times, so the follower can estimate the clock offset and round-trip
+delay the way NTP does, keeping the offset of the fastest recent exchange.
+The deadline is then translated to the follower's clock, and every instance
+renders the same second boundaries.
+
+    python lan_sync.py --lead 8766 --minutes 5
+    python lan_sync.py --follow 127.0.0.1:8766
+
+runs a headless leader and a follower that prints its offset estimate.
+"""
+
+import argparse
+import json
+import math
+import socket
+import threading
+import time
+from collections import deque
+
+
+DEFAULT_SYNC_PORT = 8766
+
+# Followers ping quickly until they have a few samples, then settle down
+FAST_PING_INTERVAL = 0.1
+PING_INTERVAL = 2.0
+FAST_PINGS = 8
+
+# Offset samples kept for the minimum-delay filter
+FILTER_SAMPLES = 8
+
+# Forget followers that have not pinged for this long
+FOLLOWER_TIMEOUT = 10.0
+
+# Re-apply the state when the offset estimate moves by more than this
+OFFSET_TOLERANCE = 0.002
+
+MAX_PACKET = 4096
+
+
+def estimate(t0, t1, t2, t3):
+    """Return (offset, delay) of the remote clock from one exchange
+
+    t0 and t3 are the local send and receive times, t1 and t2 the remote
+    receive and send times. A positive offset means the remote clock is ahead.
+    """
+    offset = ((t1 - t0) + (t2 - t3)) / 2
+    delay = (t3 - t0) - (t2 - t1)
+    return offset, delay
+
+
+class ClockFilter:
+    """Keeps recent samples and trusts the one with the smallest round trip"""
+
+    def __init__(self, size=FILTER_SAMPLES):
+        self.samples = deque(maxlen=size)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def add(self, offset, delay):
+        self.samples.append((delay, offset))
+
+    def best(self):
+        """Return (offset, delay) of the most trustworthy sample, or None"""
+        if not self.samples:
+            return None
+        delay, offset = min(self.samples)
+        return offset, delay
+
+
+class SyncLeader:
+    """Publishes the authoritative timer state to followers"""
+
+    def __init__(self, host="0.0.0.0", port=DEFAULT_SYNC_PORT):
+        self.host = host
+        self.port = port
+        self.state = None
+        self.seq = 0
+        self.followers = {}  # address -> time of last ping
+        self._lock = threading.Lock()
+        self._socket = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start answering followers on a background thread"""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.bind((self.host, self.port))
+        self.port = self._socket.getsockname()[1]
+        self._socket.settimeout(0.5)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="sync-leader", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._socket is not None:
+            self._socket.close()
+
+    def publish(self, state):
+        """Send a new state to every follower; safe to call from any thread"""
+        with self._lock:
+            self.seq += 1
+            self.state = dict(state)
+            payload = json.dumps({"type": "state", "seq": self.seq, "state": self.state}).encode()
+            followers = list(self.followers)
+        for address in followers:
+            self._sendto(payload, address)
+
+    def _sendto(self, payload, address):
+        try:
+            self._socket.sendto(payload, address)
+        except OSError as e:
+            print(f"Warning: Could not reach follower {address[0]}:{address[1]}: {e}")
+
+    def _run(self):
+        while self._running:
+            try:
+                data, address = self._socket.recvfrom(MAX_PACKET)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            received = time.time()
+            try:
+                message = json.loads(data)
+                t0 = float(message["t0"])
+            except (ValueError, KeyError, TypeError):
+                continue
+            now = time.monotonic()
+            with self._lock:
+                self.followers[address] = now
+                for other, last_seen in list(self.followers.items()):
+                    if now - last_seen > FOLLOWER_TIMEOUT:
+                        del self.followers[other]
+                reply = {"type": "sync", "t0": t0, "t1": received, "seq": self.seq}
+                # Resend the state to followers that missed an update
+                if message.get("seq") != self.seq and self.state is not None:
+                    reply["state"] = self.state
+            reply["t2"] = time.time()
+            self._sendto(json.dumps(reply).encode(), address)
+
+
+class SyncFollower:
+    """Tracks a leader's state and clock offset
+
+    on_state(state) is called on the network thread with the leader's state,
+    its end_time already translated to this machine's clock, whenever the
+    state or the offset estimate changes.
+    """
+
+    def __init__(self, host, port=DEFAULT_SYNC_PORT, on_state=None):
+        self.address = (host, port)
+        self.on_state = on_state
+        self.filter = ClockFilter()
+        self.offset = None
+        self.delay = None
+        self.seq = None
+        self.state = None
+        self.pings = 0
+        self._applied_offset = None
+        self._socket = None
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        """Start following on a background thread"""
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.connect(self.address)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="sync-follower", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+        if self._socket is not None:
+            self._socket.close()
+
+    def _ping(self):
+        self.pings += 1
+        message = {"type": "sync", "t0": time.time(), "seq": self.seq}
+        try:
+            self._socket.send(json.dumps(message).encode())
+        except OSError:
+            pass  # The leader is not up yet; keep trying
+
+    def _run(self):
+        next_ping = 0.0
+        while self._running:
+            now = time.monotonic()
+            if now >= next_ping:
+                self._ping()
+                fast = len(self.filter) < FAST_PINGS
+                next_ping = now + (FAST_PING_INTERVAL if fast else PING_INTERVAL)
+            self._socket.settimeout(max(0.01, next_ping - time.monotonic()))
+            try:
+                data = self._socket.recv(MAX_PACKET)
+            except socket.timeout:
+                continue
+            except OSError:
+                if not self._running:
+                    break
+                time.sleep(FAST_PING_INTERVAL)  # e.g. connection refused on loopback
+                continue
+            self._receive(data, time.time())
+
+    def _receive(self, data, received):
+        try:
+            message = json.loads(data)
+        except ValueError:
+            return
+        if message.get("type") == "sync":
+            try:
+                offset, delay = estimate(message["t0"], message["t1"], message["t2"], received)
+            except (KeyError, TypeError):
+                return
+            self.filter.add(offset, delay)
+            self.offset, self.delay = self.filter.best()
+        if "state" in message:
+            self.seq = message.get("seq")
+            self.state = message["state"]
+            self._apply()
+        elif self._applied_offset is None:
+            # A state pushed before the first offset estimate could not be applied yet
+            if self.state is not None:
+                self._apply()
+        elif abs(self.offset - self._applied_offset) > OFFSET_TOLERANCE:
+            self._apply()
+
+    def local_state(self):
+        """Return the leader's state with end_time on this machine's clock"""
+        if self.state is None or self.offset is None:
+            return None
+        state = dict(self.state)
+        if state.get("end_time") is not None:
+            state["end_time"] -= self.offset
+        return state
+
+    def _apply(self):
+        state = self.local_state()
+        if state is None:
+            return
+        self._applied_offset = self.offset
+        if self.on_state is not None:
+            try:
+                self.on_state(state)
+            except Exception as e:
+                print(f"Error applying leader state: {e}")
+
+
+def leader_publisher(leader):
+    """Return a timer engine listener that publishes every state change to followers"""
+    def publish(event, engine):
+        leader.publish(engine.snapshot())
+    return publish
+
+
+def parse_address(value, default_port=DEFAULT_SYNC_PORT):
+    """Parse HOST or HOST:PORT"""
+    host, _, port = value.rpartition(":")
+    if not host:
+        return value, default_port
+    return host, int(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synchronize SANS Timer countdowns headlessly")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--lead", type=int, metavar="PORT", help="run a leader on this port")
+    group.add_argument("--follow", metavar="HOST[:PORT]", help="follow the leader at this address")
+    parser.add_argument("--minutes", type=int, default=5, help="leader countdown length")
+    args = parser.parse_args()
+
+    from timer_engine import TimerEngine, format_time
+
+    try:
+        if args.lead is not None:
+            leader = SyncLeader(port=args.lead)
+            leader.start()
+            engine = TimerEngine()
+            engine.add_listener(leader_publisher(leader))
+            engine.start_for(minutes=args.minutes)
+            print(f"Leading on UDP port {leader.port}")
+            while engine.running:
+                engine.state()  # Fires the warning and end events
+                time.sleep(engine.until_next_tick())
+            leader.stop()
+        else:
+            follower = SyncFollower(*parse_address(args.follow))
+            follower.start()
+            while True:
+                time.sleep(1)
+                state = follower.local_state()
+                if state is None:
+                    print("Waiting for the leader...")
+                    continue
+                remaining = 0
+                if state["end_time"] is not None:
+                    remaining = max(0, state["end_time"] - time.time()) if state["running"] \
+                        else state["remaining"]
+                print(f"{format_time(math.ceil(remaining))}  offset {follower.offset * 1000:+.2f} ms  "
+                      f"delay {follower.delay * 1000:.2f} ms")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Tick latency and render time instrumentation for SANS Timer
+
+Metrics are plain Python objects (no Qt) rendered in the Prometheus text
+exposition format, so they can be scraped from the optional metrics endpoint
+or summarized in the control panel's diagnostics panel.
+"""
+
+from bisect import bisect_left
+
+
+# Bucket upper bounds in seconds
+LATENESS_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+DURATION_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05)
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}",
+                f"# TYPE {self.name} counter",
+                f"{self.name} {self.value}"]
+
+
+class Gauge:
+    """Value that can go up and down"""
+
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def render(self):
+        return [f"# HELP {self.name} {self.help_text}",
+                f"# TYPE {self.name} gauge",
+                f"{self.name} {self.value:g}"]
+
+
+class Histogram:
+    """Distribution of observed values over fixed buckets"""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket holding it"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}",
+                 f"# TYPE {self.name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound:g}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {self.sum:.9f}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class TimerMetrics:
+    """Every metric the timer records"""
+
+    def __init__(self):
+        self.tick_lateness = Histogram(
+            "sans_timer_tick_lateness_seconds",
+            "Delay between a second boundary and the tick that served it", LATENESS_BUCKETS)
+        self.update_duration = Histogram(
+            "sans_timer_update_seconds",
+            "Time spent updating the displays on a tick", DURATION_BUCKETS)
+        self.repaint_duration = Histogram(
+            "sans_timer_repaint_seconds",
+            "Time spent repainting the timer display", DURATION_BUCKETS)
+        self.ticks = Counter("sans_timer_ticks_total", "Ticks delivered to timers")
+        self.wakeups = Counter("sans_timer_wakeups_total", "Scheduler wakeups")
+        self.missed_ticks = Counter(
+            "sans_timer_missed_ticks_total",
+            "Second boundaries skipped because a tick fired more than a second late")
+        self.coalesced_ticks = Counter(
+            "sans_timer_coalesced_ticks_total",
+            "Ticks served by a wakeup scheduled for another timer")
+        self.precision_frames = Counter(
+            "sans_timer_precision_frames_total",
+            "Frames shown during sub-second final countdowns")
+        self.dropped_frames = Counter(
+            "sans_timer_dropped_frames_total",
+            "Sub-second frames skipped because a tick fired a whole frame late")
+        self.precision_fps = Gauge(
+            "sans_timer_precision_fps",
+            "Frame rate achieved in the current or most recent sub-second final countdown")
+        self.hook_latency = Histogram(
+            "sans_timer_hook_latency_seconds",
+            "Delay between a hook's deadline and the start of its action", LATENESS_BUCKETS)
+        self.hook_timeouts = Counter("sans_timer_hook_timeouts_total", "Hook actions cut off by their timeout")
+        self.hook_failures = Counter(
+            "sans_timer_hook_failures_total", "Hook actions that failed or were dropped")
+        self._frame_window = None  # [first, last, frames] of the current final countdown
+
+    def all(self):
+        return (self.tick_lateness, self.update_duration, self.repaint_duration,
+                self.ticks, self.wakeups, self.missed_ticks, self.coalesced_ticks,
+                self.precision_frames, self.dropped_frames, self.precision_fps,
+                self.hook_latency, self.hook_timeouts, self.hook_failures)
+
+    def record_frame(self, at, dropped=0):
+        """Count a sub-second frame shown at time at (in seconds) after dropping some"""
+        self.precision_frames.inc()
+        self.dropped_frames.inc(dropped)
+        window = self._frame_window
+        if window is None or at - window[1] > 1.0:
+            # A gap of more than a second starts a new final countdown
+            self._frame_window = [at, at, 1]
+            return
+        window[1] = at
+        window[2] += 1
+        self.precision_fps.set((window[2] - 1) / (at - window[0]) if at > window[0] else 0.0)
+
+    def render_prometheus(self):
+        """Return every metric in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.all():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """Return a short human-readable summary for the diagnostics panel"""
+        return "\n".join([
+            f"Tick lateness: p50 ≤ {self.tick_lateness.quantile(0.5) * 1000:g} ms, "
+            f"p99 ≤ {self.tick_lateness.quantile(0.99) * 1000:g} ms, "
+            f"mean {self.tick_lateness.mean() * 1000:.2f} ms",
+            f"Update: mean {self.update_duration.mean() * 1e6:.0f} µs, "
+            f"p99 ≤ {self.update_duration.quantile(0.99) * 1e6:g} µs",
+            f"Repaint: mean {self.repaint_duration.mean() * 1e6:.0f} µs, "
+            f"p99 ≤ {self.repaint_duration.quantile(0.99) * 1e6:g} µs",
+            f"Ticks {self.ticks.value}, wakeups {self.wakeups.value}, "
+            f"missed {self.missed_ticks.value}, coalesced {self.coalesced_ticks.value}",
+        ] + ([f"Final countdown: {self.precision_fps.value:.1f} fps, "
+              f"{self.precision_frames.value} frames, dropped {self.dropped_frames.value}"]
+             if self.precision_frames.value else [])
+          + ([f"Hooks: p99 ≤ {self.hook_latency.quantile(0.99) * 1000:g} ms to start, "
+              f"{self.hook_latency.count} run, timed out {self.hook_timeouts.value}, "
+              f"failed {self.hook_failures.value}"]
+             if self.hook_latency.count or self.hook_failures.value else []))
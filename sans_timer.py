@@ -6,14 +6,33 @@ SANS Timer - A timer application for teaching environments
 import sys
 import time
 import os
+import math
+import argparse
+import json
 from datetime import datetime, timedelta
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QTimeEdit, 
                             QRadioButton, QButtonGroup, QSpinBox, QGroupBox,
-                            QGridLayout, QSizePolicy, QDesktopWidget, QColorDialog,
-                            QFormLayout, QDialog, QScrollArea, QTextBrowser)
-from PyQt5.QtCore import Qt, QTimer, QTime
-from PyQt5.QtGui import QFont, QIcon, QColor
+                            QGridLayout, QColorDialog,
+                            QFormLayout, QDialog, QScrollArea, QTextBrowser,
+                            QShortcut, QSizeGrip)
+from PyQt5.QtCore import Qt, QTimer, QTime, QObject, QEvent, QPoint, pyqtSignal
+from PyQt5.QtGui import QFont, QIcon, QColor, QKeySequence
+from PyQt5.QtNetwork import QLocalServer
+
+from glyph_display import GlyphTimerWidget, GlyphFrame, FrameView, fitted_font, fit_sample
+from screen_manager import screen_manager
+from timer_engine import (TimerEngine, TimerQueue, format_time, format_clock, add_engine_arguments,
+                          engine_from_args, STAGE_NORMAL, STAGE_WARNING, STAGE_ENDED, STAGE_NAMES,
+                          PRESET_TIMES, PRESET_DURATIONS, DEFAULT_DURATION, stage_colors)
+from metrics import TimerMetrics
+from state_store import StateStore
+from control_api import CommandError, parse_command, control_address, start_mode
+
+MODULE_LOADED_AT = time.perf_counter()
+
+# Scheduler name of the control panel's own countdown
+MAIN_TIMER = "main"
 
 
 class TimerDisplay(QMainWindow):
@@ -23,11 +42,20 @@ class TimerDisplay(QMainWindow):
         super().__init__()
         # Default colors
         self.normal_color = QColor(255, 255, 255)  # White
+        self.caution_color = QColor(255, 191, 0)   # Amber
         self.warning_color = QColor(255, 0, 0)     # Red
         self.background_color = QColor(0, 0, 0)    # Black
         self.current_time_str = "00:00:00"
         self.is_warning_state = False
+        self.style_key = (STAGE_NORMAL, False)  # (stage, blink) currently shown
+        self.position = None  # Where the user last dragged the window, if anywhere
+        self.outputs = []  # Other renderings kept in step, e.g. a shared-memory frame
+        self.fit = False  # Scale the digits to the window instead of sizing the window to them
+        self.fill_screen = True  # In fit mode, cover the whole screen until double-clicked
+        self.stage_styles = {}
+        self.build_styles()
         self.initUI()
+        screen_manager().screens_changed.connect(self.on_screens_changed)
         
     def initUI(self):
         # Set window properties
@@ -42,87 +70,179 @@ class TimerDisplay(QMainWindow):
         layout = QVBoxLayout(central_widget)
         layout.setContentsMargins(10, 10, 10, 10)  # Add some padding
         
-        # Create timer display label
-        self.timer_label = QLabel('00:00:00')
-        self.timer_label.setFont(QFont('Arial', 48, QFont.Bold))
-        self.timer_label.setAlignment(Qt.AlignCenter)
-        self.timer_label.setStyleSheet(f"color: {self.normal_color.name()};")
+        # Create timer display, painted from a cached glyph atlas
+        self.timer_label = GlyphTimerWidget('00:00:00', QFont('Arial', 48, QFont.Bold))
         layout.addWidget(self.timer_label)
+        # Lets the frameless window be resized in fit mode
+        self.size_grip = QSizeGrip(central_widget)
+        self.size_grip.hide()
+        layout.addWidget(self.size_grip, 0, Qt.AlignBottom | Qt.AlignRight)
+        self.apply_style(self.style_key)
         
         # Set window size to fit content
         self.adjustSize()
-        self.setStyleSheet(f"background-color: {self.background_color.name()};")
     
     def showEvent(self, event):
         """Handle the window show event to ensure proper positioning"""
         super().showEvent(event)
-        # Ensure the window size is correct
-        self.adjustSize()
         # Position the window on the correct monitor
         self.move_to_secondary_monitor()
     
+    def on_screens_changed(self):
+        """Follow screens being plugged in, removed or resized"""
+        if self.isVisible():
+            self.move_to_secondary_monitor()
+    
     def move_to_secondary_monitor(self):
         """Position the window on the secondary monitor if available"""
-        desktop = QDesktopWidget()
+        screens = screen_manager()
         
-        # First, ensure the window size is properly calculated
-        self.adjustSize()
+        if self.fit and self.fill_screen:
+            # Cover the projector; the digits scale to fit
+            self.setGeometry(screens.screen(screens.secondary_index()).geometry)
+            return
         
-        if desktop.screenCount() > 1:
-            # Use second monitor
-            screen_geometry = desktop.screenGeometry(1)
-            
-            # Calculate position to ensure window is fully on the secondary monitor
-            x = screen_geometry.left() + screen_geometry.width() - self.width() - 20
-            y = screen_geometry.top() + screen_geometry.height() - self.height() - 20
-            
-            # Ensure x coordinate is within the secondary monitor bounds
-            if x < screen_geometry.left():
-                x = screen_geometry.left() + 20
-                
-            self.move(x, y)
-            
-            # Double-check that we're on the right monitor and adjust if needed
-            if self.frameGeometry().left() < screen_geometry.left():
-                # If still not on secondary monitor, force it there
-                self.move(screen_geometry.left() + 50, y)
-        else:
-            # Only one monitor, position on the lower right corner
-            screen_geometry = desktop.screenGeometry(0)
-            x = screen_geometry.width() - self.width() - 20
-            y = screen_geometry.height() - self.height() - 20
-            self.move(x, y)
-    
-    def update_display(self, time_str, is_warning=False):
-        """Update the timer display with the given time string"""
-        self.current_time_str = time_str
-        self.is_warning_state = is_warning
-        self.timer_label.setText(time_str)
-        
-        # Change color based on time remaining
-        if is_warning:
-            self.timer_label.setStyleSheet(f"color: {self.warning_color.name()};")
-        else:
-            self.timer_label.setStyleSheet(f"color: {self.normal_color.name()};")
+        # First, ensure the window size is properly calculated (in fit mode the user sizes it)
+        if not self.fit:
+            self.adjustSize()
         
-        # Adjust size to fit content
-        self.adjustSize()
+        # Keep a position the user chose, as long as it is still on a screen
+        if self.position is not None and screens.contains(self.position):
+            self.move(self.position)
+            return
+        
+        # Lower right corner of the second monitor, or of the only one
+        screen_geometry = screens.screen(screens.secondary_index()).geometry
+        x = screen_geometry.left() + screen_geometry.width() - self.width() - 20
+        y = screen_geometry.top() + screen_geometry.height() - self.height() - 20
+        
+        # Ensure the window stays within the monitor's bounds
+        if x < screen_geometry.left():
+            x = screen_geometry.left() + 20
+        self.move(x, y)
+    
+    def build_styles(self):
+        """Precompute the colors and window stylesheet of every (stage, blink)"""
+        colors = stage_colors(self.normal_color, self.caution_color, self.warning_color,
+                              self.background_color)
+        self.stage_styles = {
+            key: (text, background, f"background-color: {background.name()};")
+            for key, (text, background) in colors.items()
+        }
+    
+    def apply_style(self, key):
+        """Show the colors of a (stage, blink)"""
+        self.style_key = key
+        self.is_warning_state = key[0] >= STAGE_WARNING
+        text, background, window_style = self.stage_styles[key]
+        self.timer_label.set_text_color(text)
+        self.timer_label.set_background_color(background)
+        # Restyling the window is the expensive part, and only blinking changes it
+        if window_style != self.styleSheet():
+            self.setStyleSheet(window_style)
     
-    def set_colors(self, normal_color, warning_color, background_color):
+    def update_display(self, time_str, is_warning=False, stage=None, blink=False):
+        """Update the timer display with the given time string
+        
+        Callers that only know whether to warn can leave out the stage.
+        """
+        # Restyling and relayout are expensive, so only do them on changes
+        if time_str != self.current_time_str:
+            resize_needed = len(time_str) != len(self.current_time_str)
+            self.current_time_str = time_str
+            self.timer_label.setText(time_str)  # Repaints only the changed digits
+            # Digits share one width, so the size only changes with the length
+            if resize_needed and not self.fit:
+                self.adjustSize()
+        
+        # Change color based on the stage of the countdown
+        if stage is None:
+            stage = STAGE_WARNING if is_warning else STAGE_NORMAL
+        if (stage, blink) != self.style_key:
+            self.apply_style((stage, blink))
+        for output in self.outputs:
+            output.update_display(time_str, stage=stage, blink=blink)
+    
+    def set_colors(self, normal_color, warning_color, background_color, caution_color=None):
         """Set the colors for the timer display"""
         self.normal_color = normal_color
         self.warning_color = warning_color
         self.background_color = background_color
+        if caution_color is not None:
+            self.caution_color = caution_color
+        self.build_styles()
         
         # Update the display with the new colors
-        self.setStyleSheet(f"background-color: {self.background_color.name()};")
-        
-        # Check if we're in warning mode by looking at the current text color
-        current_style = self.timer_label.styleSheet()
-        if "red" in current_style or self.warning_color.name() in current_style:
-            self.timer_label.setStyleSheet(f"color: {self.warning_color.name()};")
+        self.apply_style(self.style_key)
+        for output in self.outputs:
+            output.set_colors(normal_color, warning_color, background_color, self.caution_color)
+    
+    def add_output(self, output):
+        """Keep output (anything with update_display and set_colors) showing this countdown"""
+        output.set_colors(self.normal_color, self.warning_color, self.background_color, self.caution_color)
+        output.update_display(self.current_time_str, stage=self.style_key[0], blink=self.style_key[1])
+        self.outputs.append(output)
+    
+    def set_fit(self, fit):
+        """Scale the digits to fill the window (and the screen, until double-clicked)"""
+        self.fit = fit
+        self.timer_label.set_fit(fit)
+        self.size_grip.setVisible(fit and not self.fill_screen)
+        if fit:
+            self.move_to_secondary_monitor()
         else:
-            self.timer_label.setStyleSheet(f"color: {self.normal_color.name()};")
+            self.adjustSize()
+    
+    def mouseDoubleClickEvent(self, event):
+        """In fit mode, switch between filling the screen and a resizable window"""
+        if not self.fit:
+            return
+        self.fill_screen = not self.fill_screen
+        self.size_grip.setVisible(not self.fill_screen)
+        if not self.fill_screen:
+            self.resize(self.width() // 2, self.height() // 2)
+            self.position = None
+        self.move_to_secondary_monitor()
+    
+    def set_paint_observer(self, observer):
+        """Call observer(seconds) after every repaint of the countdown"""
+        self.timer_label.paint_observer = observer
+    
+    def top_level_windows(self):
+        """Return the windows showing the countdown"""
+        return [self]
+    
+    def mousePressEvent(self, event):
+        """Enable dragging the window when clicked"""
+        self.oldPos = event.globalPos()
+        
+    def mouseMoveEvent(self, event):
+        """Move the window when dragged"""
+        delta = event.globalPos() - self.oldPos
+        self.move(self.x() + delta.x(), self.y() + delta.y())
+        self.oldPos = event.globalPos()
+        self.position = self.pos()
+
+
+class MirrorWindow(FrameView):
+    """Frameless window on one screen showing the shared countdown frame"""
+    
+    def __init__(self, frame, screen_index):
+        super().__init__(frame)
+        self.screen_index = screen_index
+        self.setWindowTitle('Timer Display')
+        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint | Qt.Tool)
+        self.resize(self.sizeHint())
+    
+    def move_to_screen(self):
+        """Position the window in the lower right corner of its screen, or fill it in fit mode"""
+        screen_geometry = screen_manager().screen(self.screen_index).geometry
+        if self.keep_size:
+            self.setGeometry(screen_geometry)
+            return
+        x = screen_geometry.left() + screen_geometry.width() - self.width() - 20
+        y = screen_geometry.top() + screen_geometry.height() - self.height() - 20
+        self.move(max(x, screen_geometry.left()), max(y, screen_geometry.top()))
     
     def mousePressEvent(self, event):
         """Enable dragging the window when clicked"""
@@ -135,6 +255,223 @@ class TimerDisplay(QMainWindow):
         self.oldPos = event.globalPos()
 
 
+class MirroredTimerDisplay(QObject):
+    """Timer display shown on several screens at once
+    
+    The countdown is rendered once into a shared GlyphFrame and every screen's
+    window copies only the changed part of it, so adding screens does not add
+    text layout or styling work per tick. Stands in for TimerDisplay.
+    """
+    
+    def __init__(self, screens=None):
+        super().__init__()
+        # Default colors
+        self.normal_color = QColor(255, 255, 255)  # White
+        self.caution_color = QColor(255, 191, 0)   # Amber
+        self.warning_color = QColor(255, 0, 0)     # Red
+        self.background_color = QColor(0, 0, 0)    # Black
+        self.current_time_str = "00:00:00"
+        self.is_warning_state = False
+        self.style_key = (STAGE_NORMAL, False)  # (stage, blink) currently shown
+        self.stage_styles = {}
+        self.build_styles()
+        self.position = None  # Mirrored windows always follow their screens
+        self.outputs = []  # Other renderings kept in step, e.g. a shared-memory frame
+        self.fit = False  # Fill every screen, with digits sized for the smallest
+        self.base_font = QFont('Arial', 48, QFont.Bold)
+        
+        # Every attached screen unless a subset was chosen
+        manager = screen_manager()
+        screen_count = manager.count()
+        if screens is None:
+            screens = range(screen_count)
+        screens = [index for index in screens if 0 <= index < screen_count] or [0]
+        
+        self.frame = GlyphFrame('00:00:00', self.base_font, self.pixel_ratio(screens), self)
+        self.apply_style(self.style_key)
+        self.windows = [MirrorWindow(self.frame, index) for index in screens]
+        manager.screens_changed.connect(self.on_screens_changed)
+    
+    def pixel_ratio(self, screens):
+        """Return the sharpest pixel ratio among the given screens"""
+        manager = screen_manager()
+        return max(manager.screen(index).pixel_ratio for index in screens)
+    
+    def on_screens_changed(self):
+        """Re-render for the new pixel ratio and put every window back on its screen"""
+        ratio = self.pixel_ratio([window.screen_index for window in self.windows])
+        if ratio != self.frame.pixel_ratio:
+            self.frame.set_pixel_ratio(ratio)
+        if self.fit:
+            self.fit_frame()
+        if self.isVisible():
+            self.move_to_secondary_monitor()
+    
+    def build_styles(self):
+        """Precompute the colors of every (stage, blink)"""
+        self.stage_styles = stage_colors(self.normal_color, self.caution_color, self.warning_color,
+                                         self.background_color)
+    
+    def apply_style(self, key):
+        """Show the colors of a (stage, blink)"""
+        self.style_key = key
+        self.is_warning_state = key[0] >= STAGE_WARNING
+        self.frame.set_colors(*self.stage_styles[key])
+    
+    def update_display(self, time_str, is_warning=False, stage=None, blink=False):
+        """Update every mirrored window with the given time string"""
+        if time_str != self.current_time_str:
+            refit = self.fit and len(time_str) != len(self.current_time_str)
+            self.current_time_str = time_str
+            if refit:
+                self.fit_frame()
+            self.frame.setText(time_str)
+        if stage is None:
+            stage = STAGE_WARNING if is_warning else STAGE_NORMAL
+        if (stage, blink) != self.style_key:
+            self.apply_style((stage, blink))
+        for output in self.outputs:
+            output.update_display(time_str, stage=stage, blink=blink)
+    
+    def set_colors(self, normal_color, warning_color, background_color, caution_color=None):
+        """Set the colors for every mirrored window"""
+        self.normal_color = normal_color
+        self.warning_color = warning_color
+        self.background_color = background_color
+        if caution_color is not None:
+            self.caution_color = caution_color
+        self.build_styles()
+        self.apply_style(self.style_key)
+        for output in self.outputs:
+            output.set_colors(normal_color, warning_color, background_color, self.caution_color)
+    
+    def add_output(self, output):
+        """Keep output (anything with update_display and set_colors) showing this countdown"""
+        output.set_colors(self.normal_color, self.warning_color, self.background_color, self.caution_color)
+        output.update_display(self.current_time_str, stage=self.style_key[0], blink=self.style_key[1])
+        self.outputs.append(output)
+    
+    def set_fit(self, fit):
+        """Fill every screen, with the digits as large as the smallest screen allows"""
+        self.fit = fit
+        for window in self.windows:
+            window.keep_size = fit
+        if fit:
+            self.fit_frame()
+        else:
+            self.frame.setFont(self.base_font)
+            for window in self.windows:
+                window.resize(window.sizeHint())
+        if self.isVisible():
+            self.move_to_secondary_monitor()
+    
+    def fit_frame(self):
+        """Render the frame at the font size that fits the smallest screen"""
+        manager = screen_manager()
+        infos = [manager.screen(window.screen_index) for window in self.windows]
+        margin = 2 * FrameView.MARGIN
+        font = fitted_font(self.base_font, min(info.geometry.width() for info in infos) - margin,
+                           min(info.geometry.height() for info in infos) - margin,
+                           min(info.logical_dpi for info in infos), fit_sample(self.current_time_str))
+        if font != self.frame.font():
+            self.frame.setFont(font)
+    
+    def set_paint_observer(self, observer):
+        """Call observer(seconds) after every repaint of a mirrored window"""
+        for window in self.windows:
+            window.paint_observer = observer
+    
+    def top_level_windows(self):
+        """Return the windows showing the countdown"""
+        return list(self.windows)
+    
+    def move_to_secondary_monitor(self):
+        """Position each window on its own screen"""
+        for window in self.windows:
+            window.move_to_screen()
+    
+    def show(self):
+        for window in self.windows:
+            window.show()
+        self.move_to_secondary_monitor()
+    
+    def hide(self):
+        for window in self.windows:
+            window.hide()
+    
+    def close(self):
+        for window in self.windows:
+            window.close()
+    
+    def isVisible(self):
+        return any(window.isVisible() for window in self.windows)
+
+
+class TimerBoard(QMainWindow):
+    """Window showing one row per named timer"""
+    
+    removed = pyqtSignal(str)  # Name of the timer whose remove button was clicked
+    
+    def __init__(self, timer_display):
+        super().__init__()
+        self.timer_display = timer_display  # Source of the color scheme
+        self.rows = {}
+        self.setWindowTitle('SANS Timer Board')
+        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.Tool)
+        
+        central_widget = QWidget()
+        self.setCentralWidget(central_widget)
+        self.grid = QGridLayout(central_widget)
+        self.grid.setContentsMargins(10, 10, 10, 10)
+        self.set_colors()
+    
+    def add_row(self, name):
+        """Add a row for the named timer"""
+        name_label = QLabel(name)
+        name_label.setFont(QFont('Arial', 16))
+        countdown = GlyphTimerWidget('00:00:00', QFont('Arial', 32, QFont.Bold))
+        countdown.set_text_color(self.timer_display.normal_color)
+        countdown.set_background_color(self.timer_display.background_color)
+        remove_button = QPushButton("×")
+        remove_button.setFixedSize(24, 24)
+        remove_button.clicked.connect(lambda: self.removed.emit(name))
+        
+        row = self.grid.rowCount()
+        self.grid.addWidget(name_label, row, 0)
+        self.grid.addWidget(countdown, row, 1)
+        self.grid.addWidget(remove_button, row, 2)
+        self.rows[name] = (name_label, countdown, remove_button, [STAGE_NORMAL])
+        self.adjustSize()
+    
+    def remove_row(self, name):
+        """Remove the named timer's row"""
+        widgets = self.rows.pop(name, None)
+        if widgets is None:
+            return
+        for widget in widgets[:3]:
+            self.grid.removeWidget(widget)
+            widget.deleteLater()
+        self.adjustSize()
+    
+    def update_row(self, name, time_str, stage):
+        """Show the time for the named timer in the color of its stage"""
+        if name not in self.rows:
+            return
+        _, countdown, _, row_stage = self.rows[name]
+        countdown.setText(time_str)
+        if stage != row_stage[0]:
+            row_stage[0] = stage
+            countdown.set_text_color(self.timer_display.stage_styles[stage, False][0])
+    
+    def set_colors(self):
+        """Apply the timer display's color scheme to every row"""
+        background = self.timer_display.background_color
+        self.setStyleSheet(f"background-color: {background.name()}; color: {self.timer_display.normal_color.name()};")
+        for _, countdown, _, row_stage in self.rows.values():
+            countdown.set_background_color(background)
+            countdown.set_text_color(self.timer_display.stage_styles[row_stage[0], False][0])
+
+
 class HelpDialog(QDialog):
     """Dialog to display help information"""
     
@@ -182,6 +519,7 @@ class HelpDialog(QDialog):
 3. Use "Stop Timer" to pause and "Reset" to clear the timer
 4. Click "Show Timer Window" to display the floating timer when needed
 5. Click "Hide Timer Window" to hide the floating timer
+6. Click "Add Named Timer" to run the selected mode as an extra countdown on the timer board
 
 ### Multi-Monitor Support
 
@@ -192,34 +530,271 @@ class HelpDialog(QDialog):
 ### Color Customization
 
 1. Click the "Choose" buttons in the Color Settings section
-2. Select your preferred colors for normal text, warning text, and background
+2. Select your preferred colors for normal text, caution text, warning text, and background
 3. Changes apply immediately to both displays
 
+### Warning Stages
+
+- The timer turns the caution color with 10 minutes left and the warning color with 5 minutes left
+- At zero it flashes until you press Stop or Reset
+- Start with --caution-minutes, --warning-minutes or --overtime to change this
+- Start with --precision 30 to show tenths of a second during the last 30 seconds (--precision-digits 2 for hundredths)
+- Start with --fit to make the digits fill the timer window and its screen; double-click the window to switch to a resizable window
+- Start with --tray to show the minutes left in the system tray; click the icon to hide or show the windows
+- Start with --frame-output to share the countdown with OBS or another capture source through shared memory (--frame-transparent for overlays)
+- Start with --hooks FILE to run commands or webhooks at each stage, at zero and every overtime minute
+
 ## Timer Modes
 
 - Time until 8:30 AM, 9:00 AM, 10:50 AM, 1:30 PM, 3:20 PM: Calculates time until the specified time today (or tomorrow if the time has already passed)
 - Time until custom time: Allows you to set any target time
 - 20, 30, 45 Minute Timer: Fixed duration countdown timers
 - Custom Timer: Set your own hours, minutes, and seconds for the countdown
+- Follow course schedule: Counts down to each event of the schedule loaded with --schedule, moving on to the next one automatically
 
 Created by: Kenneth G. Hartman (ken@kennethghartman.com)
 Source code available at: https://github.com/resistor52/sans_timer
 
 """
 
+class DeadlineScheduler(QObject):
+    """Single-shot scheduler that fires just after each whole second of its countdowns
+    
+    (Or each tenth or hundredth of a second inside a countdown's precision
+    window; the engine's until_next_tick decides.) Every named timer has its
+    next boundary in one priority queue, so the
+    process wakes once per due event no matter how many timers are running.
+    Boundaries that fall within COALESCE_MS of each other share a wakeup. The
+    timer is re-armed for each batch, aiming a few milliseconds past the last
+    boundary in it. The observed lateness is folded into a running estimate that
+    is subtracted from the next delay, and every tick reports how late it was.
+    Lateness, missed and coalesced ticks are recorded in the optional metrics.
+    
+    While nothing is on screen (set_visible(False)) each timer only wakes when
+    its next stage starts, and not at all once it has ended; long waits use a
+    coarse timer that the OS can batch with other wakeups before finishing
+    precisely. A view that only shows minutes, like the tray icon, adds a
+    wakeup whenever those change.
+    """
+    
+    ticked = pyqtSignal(str, float)  # Timer name and lateness of the tick in seconds
+    
+    MARGIN_MS = 2          # Aim this far past the boundary so the digit has changed
+    COALESCE_MS = 15       # Serve boundaries this close together with one wakeup
+    LATENCY_SMOOTHING = 0.2
+    COARSE_AFTER_MS = 2000  # Longer waits start on a coarse timer
+    COARSE_EARLY = 0.94     # Coarse timers may fire 5% late, so aim this fraction of the way
+    
+    def __init__(self, clock=None, parent=None, metrics=None):
+        super().__init__(parent)
+        self.clock = clock or datetime.now
+        self.metrics = metrics
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timeout)
+        self.engines = {}
+        self._queue = TimerQueue()
+        self._batch = []
+        self._target = None
+        self._latency_ms = 0.0
+        self.last_lateness = 0.0
+        self.wakeups = 0
+        self.visible = True
+        self.minutes_visible = False  # Only a minutes view (the tray icon) is showing
+    
+    def next_due(self, engine, now):
+        """Return when the engine next needs serving, or None if it can wait until shown"""
+        if self.visible:
+            return now + timedelta(seconds=engine.until_next_tick(now))
+        # Nobody can see the seconds change; only the stage changes matter
+        delay = engine.until_next_transition(now)
+        if self.minutes_visible:
+            delays = [d for d in (delay, engine.until_minutes_change(now)) if d is not None]
+            delay = min(delays) if delays else None
+        return None if delay is None else now + timedelta(seconds=delay)
+    
+    def _schedule(self, name, engine, now):
+        """Queue the engine's next due time; return it"""
+        due = self.next_due(engine, now)
+        if due is not None:
+            self._queue.schedule(name, due)
+        return due
+    
+    def set_visible(self, visible, minutes_visible=False):
+        """Tick every second while the countdowns are on screen, otherwise only at transitions
+        
+        (and when the minutes change, if minutes_visible).
+        """
+        if (visible, minutes_visible) == (self.visible, self.minutes_visible):
+            return
+        self.visible = visible
+        self.minutes_visible = minutes_visible
+        self._batch = []
+        self._target = None
+        self._timer.stop()
+        now = self.clock()
+        for name, engine in self.engines.items():
+            self._schedule(name, engine, now)
+        self._rearm(now)
+    
+    def add(self, name, engine):
+        """Start ticking on the second boundaries of the engine's deadline"""
+        self.remove(name)
+        self.engines[name] = engine
+        now = self.clock()
+        due = self._schedule(name, engine, now)
+        if due is not None and self._target is not None and due < self._target:
+            # The new timer is due before the armed batch
+            self._requeue_batch()
+        self._rearm(now)
+    
+    def remove(self, name):
+        """Stop ticking for the named timer"""
+        if self.engines.pop(name, None) is None:
+            return
+        self._queue.cancel(name)
+        self._batch = [(due, other) for due, other in self._batch if other != name]
+        if not self._batch:
+            self._timer.stop()
+            self._target = None
+            self._rearm(self.clock())
+    
+    def _requeue_batch(self):
+        """Return the armed batch to the queue so it can be re-batched"""
+        for due, name in self._batch:
+            self._queue.schedule(name, due)
+        self._batch = []
+        self._target = None
+        self._timer.stop()
+    
+    def isActive(self, name=None):
+        """Return True while the scheduler (or the named timer) is ticking"""
+        if name is not None:
+            return name in self.engines
+        return self._timer.isActive()
+    
+    def _rearm(self, now):
+        """Arm the single-shot timer for the next batch of due timers"""
+        if self._batch:
+            return  # Already armed
+        self._batch = self._queue.take_batch(timedelta(milliseconds=self.COALESCE_MS))
+        if not self._batch:
+            self._target = None
+            return
+        self._target = max(due for due, _ in self._batch)
+        delay_ms = (self._target - now).total_seconds() * 1000 + self.MARGIN_MS - self._latency_ms
+        self._start_timer(delay_ms)
+    
+    def _start_timer(self, delay_ms):
+        """Start the single-shot timer, on a coarse timer for long waits"""
+        if delay_ms > self.COARSE_AFTER_MS:
+            # Wake early; the early-fire path finishes the wait precisely
+            self._timer.setTimerType(Qt.CoarseTimer)
+            delay_ms *= self.COARSE_EARLY
+        else:
+            self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.start(max(0, int(round(delay_ms))))
+    
+    def _on_timeout(self):
+        if not self._batch:
+            return
+        now = self.clock()
+        lateness = (now - self._target).total_seconds()
+        if lateness < 0:
+            # Fired before the boundary; wait out the remainder
+            self._start_timer(math.ceil(-lateness * 1000))
+            return
+        
+        # Track how late the event loop delivers timers beyond the margin we asked for
+        observed_ms = lateness * 1000 - self.MARGIN_MS
+        self._latency_ms += self.LATENCY_SMOOTHING * (observed_ms - self._latency_ms)
+        self._latency_ms = max(0.0, self._latency_ms)
+        self.last_lateness = lateness
+        self.wakeups += 1
+        
+        # Anything else that fell due while we were waiting is served now too
+        batch = self._batch + self._queue.take_until(now)
+        self._batch = []
+        if self.metrics is not None:
+            self.record(batch, now)
+        for due, name in batch:
+            engine = self.engines.get(name)
+            if engine is not None:
+                self._schedule(name, engine, now)
+        self._rearm(now)
+        
+        for due, name in batch:
+            # A handler may have removed a timer that is later in this batch
+            if name in self.engines:
+                self.ticked.emit(name, (now - due).total_seconds())
+    
+    def record(self, batch, now):
+        """Record a wakeup serving the given batch in the metrics"""
+        metrics = self.metrics
+        metrics.wakeups.inc()
+        # Every tick after the first rode along on a wakeup for another boundary
+        metrics.coalesced_ticks.inc(len(batch) - 1)
+        for due, name in batch:
+            lateness = (now - due).total_seconds()
+            metrics.ticks.inc()
+            metrics.tick_lateness.observe(lateness)
+            # A tick more than a second late skipped whole boundaries
+            metrics.missed_ticks.inc(int(lateness))
+            engine = self.engines.get(name)
+            period = engine.tick_period(due) if engine is not None else 1.0
+            if period < 1.0:
+                # Sub-second final countdown; a tick a whole frame late dropped frames
+                metrics.record_frame(now.timestamp(), int(lateness / period))
+
+
 class ControlPanel(QMainWindow):
     """Window for controlling the timer settings"""
     
-    def __init__(self, timer_display):
+    leader_state = pyqtSignal(dict)  # State from a sync leader, emitted on its network thread
+    
+    def __init__(self, timer_display, engine=None, schedule=None):
         super().__init__()
         self.timer_display = timer_display
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_timer)
-        self.end_time = None
-        self.timer_mode = "Not started"
+        self.engine = engine or TimerEngine()
+        self.schedule = schedule  # Optional CourseSchedule to follow
+        self.metrics = TimerMetrics()
+        self.scheduler = DeadlineScheduler(self.engine.clock, self, self.metrics)
+        self.scheduler.ticked.connect(self.on_tick)
+        self.named_timers = {}
+        self.timer_board = None  # Created when the first named timer is added
+        self.last_tick_lateness = 0.0
+        self.control_styles = {}
+        self.control_style_key = None
+        self.help_dialog = None  # Created on first use
+        self.state_store = None  # Optional StateStore kept up to date with every change
+        self.tray = None  # Optional TimerTray
+        self.sync_follower = None  # Set when another instance leads the countdown
+        self.leader_state.connect(self.apply_leader_state)
+        self.diagnostics_group = None  # Created the first time it is shown
         self.timer_window_visible = False  # Start with timer window hidden
         self.initUI()
+        screen_manager().screens_changed.connect(self.on_screens_changed)
+        
+        # Stop ticking every second while none of the countdowns are on screen
+        self.installEventFilter(self)
+        for window in self.timer_display.top_level_windows():
+            window.installEventFilter(self)
+        
+        # Pick up a countdown restored from saved state
+        if self.engine.running:
+            self.resume_timer()
         
+    @property
+    def end_time(self):
+        """Deadline of the current countdown, or None"""
+        return self.engine.end_time
+    
+    @property
+    def timer_mode(self):
+        """Description of the current timer mode"""
+        return self.engine.mode
+    
     def initUI(self):
         # Set window properties
         self.setWindowTitle('SANS Timer Control Panel')
@@ -287,11 +862,11 @@ class ControlPanel(QMainWindow):
         
         main_layout.addLayout(top_bar)
         
-        # Add timer display in control panel
-        self.control_timer_display = QLabel('00:00:00')
-        self.control_timer_display.setFont(QFont('Arial', 24, QFont.Bold))
-        self.control_timer_display.setAlignment(Qt.AlignCenter)
-        self.control_timer_display.setStyleSheet(f"color: {self.timer_display.normal_color.name()}; background-color: {self.timer_display.background_color.name()}; padding: 5px; border-radius: 5px;")
+        # Add timer display in control panel, painted from the glyph atlas like the timer window
+        self.control_timer_display = GlyphTimerWidget('00:00:00', QFont('Arial', 24, QFont.Bold))
+        self.control_timer_display.setMinimumHeight(self.control_timer_display.sizeHint().height() + 10)
+        self.build_control_styles()
+        self.set_control_stage(STAGE_NORMAL)
         main_layout.addWidget(self.control_timer_display)
         
         # Create timer mode selection group
@@ -301,12 +876,14 @@ class ControlPanel(QMainWindow):
         # Create radio buttons for timer modes
         self.mode_group = QButtonGroup(self)
         
-        # Time until specific time modes
-        self.radio_830am = QRadioButton("Time until 8:30 AM")
-        self.radio_9am = QRadioButton("Time until 9:00 AM")
-        self.radio_1050am = QRadioButton("Time until 10:50 AM")
-        self.radio_130pm = QRadioButton("Time until 1:30 PM")
-        self.radio_320pm = QRadioButton("Time until 3:20 PM")
+        # Follow the loaded course schedule, chaining from one event to the next
+        self.radio_schedule = QRadioButton("Follow course schedule")
+        self.radio_schedule.setVisible(self.schedule is not None)
+        
+        # Time until specific time modes, mapped onto engine targets
+        self.time_presets = {}
+        for hour, minute in PRESET_TIMES:
+            self.time_presets[QRadioButton(f"Time until {format_clock(hour, minute)}")] = (hour, minute)
         self.radio_custom_time = QRadioButton("Time until custom time")
         
         # Custom time selection
@@ -317,10 +894,10 @@ class ControlPanel(QMainWindow):
         time_layout.addWidget(QLabel("Custom time:"))
         time_layout.addWidget(self.custom_time_edit)
         
-        # Countdown timer modes
-        self.radio_20min = QRadioButton("20 Minute Timer")
-        self.radio_30min = QRadioButton("30 Minute Timer")
-        self.radio_45min = QRadioButton("45 Minute Timer")
+        # Countdown timer modes, mapped onto their minutes
+        self.duration_presets = {}
+        for minutes in PRESET_DURATIONS:
+            self.duration_presets[QRadioButton(f"{minutes} Minute Timer")] = minutes
         self.radio_custom_duration = QRadioButton("Custom Timer")
         
         # Custom duration selection
@@ -342,73 +919,33 @@ class ControlPanel(QMainWindow):
         duration_layout.addWidget(self.seconds_spin)
         
         # Add radio buttons to the button group
-        self.mode_group.addButton(self.radio_830am)
-        self.mode_group.addButton(self.radio_9am)
-        self.mode_group.addButton(self.radio_1050am)
-        self.mode_group.addButton(self.radio_130pm)
-        self.mode_group.addButton(self.radio_320pm)
+        self.mode_group.addButton(self.radio_schedule)
+        for radio in self.time_presets:
+            self.mode_group.addButton(radio)
         self.mode_group.addButton(self.radio_custom_time)
-        self.mode_group.addButton(self.radio_20min)
-        self.mode_group.addButton(self.radio_30min)
-        self.mode_group.addButton(self.radio_45min)
+        for radio in self.duration_presets:
+            self.mode_group.addButton(radio)
         self.mode_group.addButton(self.radio_custom_duration)
         
         # Add widgets to the mode layout
-        mode_layout.addWidget(self.radio_830am)
-        mode_layout.addWidget(self.radio_9am)
-        mode_layout.addWidget(self.radio_1050am)
-        mode_layout.addWidget(self.radio_130pm)
-        mode_layout.addWidget(self.radio_320pm)
+        mode_layout.addWidget(self.radio_schedule)
+        for radio in self.time_presets:
+            mode_layout.addWidget(radio)
         mode_layout.addWidget(self.radio_custom_time)
         mode_layout.addLayout(time_layout)
-        mode_layout.addWidget(self.radio_20min)
-        mode_layout.addWidget(self.radio_30min)
-        mode_layout.addWidget(self.radio_45min)
+        for radio in self.duration_presets:
+            mode_layout.addWidget(radio)
         mode_layout.addWidget(self.radio_custom_duration)
         mode_layout.addLayout(duration_layout)
         
         mode_group.setLayout(mode_layout)
         main_layout.addWidget(mode_group)
         
-        # Create color configuration group
-        color_group = QGroupBox("Color Settings")
-        color_layout = QFormLayout()
-        
-        # Normal color button
-        self.normal_color_button = QPushButton("Choose")
-        self.normal_color_button.clicked.connect(self.choose_normal_color)
-        self.normal_color_preview = QLabel()
-        self.normal_color_preview.setFixedSize(20, 20)
-        self.normal_color_preview.setStyleSheet(f"background-color: {self.timer_display.normal_color.name()}; border: 1px solid black;")
-        normal_color_layout = QHBoxLayout()
-        normal_color_layout.addWidget(self.normal_color_button)
-        normal_color_layout.addWidget(self.normal_color_preview)
-        color_layout.addRow("Normal Text Color:", normal_color_layout)
-        
-        # Warning color button
-        self.warning_color_button = QPushButton("Choose")
-        self.warning_color_button.clicked.connect(self.choose_warning_color)
-        self.warning_color_preview = QLabel()
-        self.warning_color_preview.setFixedSize(20, 20)
-        self.warning_color_preview.setStyleSheet(f"background-color: {self.timer_display.warning_color.name()}; border: 1px solid black;")
-        warning_color_layout = QHBoxLayout()
-        warning_color_layout.addWidget(self.warning_color_button)
-        warning_color_layout.addWidget(self.warning_color_preview)
-        color_layout.addRow("Warning Text Color:", warning_color_layout)
-        
-        # Background color button
-        self.background_color_button = QPushButton("Choose")
-        self.background_color_button.clicked.connect(self.choose_background_color)
-        self.background_color_preview = QLabel()
-        self.background_color_preview.setFixedSize(20, 20)
-        self.background_color_preview.setStyleSheet(f"background-color: {self.timer_display.background_color.name()}; border: 1px solid black;")
-        background_color_layout = QHBoxLayout()
-        background_color_layout.addWidget(self.background_color_button)
-        background_color_layout.addWidget(self.background_color_preview)
-        color_layout.addRow("Background Color:", background_color_layout)
-        
-        color_group.setLayout(color_layout)
-        main_layout.addWidget(color_group)
+        # The color settings are built after the first frame (see build_color_settings)
+        self.main_layout = main_layout
+        self.color_group = None
+        self.color_group_index = main_layout.count()
+        self.secondary_panels_pending = False
         
         # Create control buttons
         button_layout = QHBoxLayout()
@@ -437,18 +974,130 @@ class ControlPanel(QMainWindow):
         # Add toggle timer window button in its own row
         main_layout.addWidget(self.toggle_timer_button)
         
+        # Run the selected mode as an additional named timer on the timer board
+        self.add_named_timer_button = QPushButton("Add Named Timer")
+        self.add_named_timer_button.clicked.connect(lambda: self.add_named_timer())
+        main_layout.addWidget(self.add_named_timer_button)
+        
         # Current timer display
         self.current_timer_label = QLabel("Timer not started")
         self.current_timer_label.setAlignment(Qt.AlignCenter)
         self.current_timer_label.setFont(QFont('Arial', 14))
         main_layout.addWidget(self.current_timer_label)
         
+        # Hidden diagnostics panel
+        self.diagnostics_shortcut = QShortcut(QKeySequence("Ctrl+Shift+D"), self)
+        self.diagnostics_shortcut.activated.connect(self.toggle_diagnostics)
+        self.timer_display.set_paint_observer(self.metrics.repaint_duration.observe)
+        
         # Set default selection
-        self.radio_30min.setChecked(True)
+        if self.schedule is not None:
+            self.radio_schedule.setChecked(True)
+        else:
+            for radio, minutes in self.duration_presets.items():
+                radio.setChecked(minutes == DEFAULT_DURATION)
         
         # Position on primary monitor
         self.move_to_primary_monitor()
     
+    def build_color_settings(self):
+        """Build the color settings group, deferred until after the first frame"""
+        if self.color_group is not None:
+            return
+        
+        # Create color configuration group
+        color_group = QGroupBox("Color Settings")
+        color_layout = QFormLayout()
+        
+        # Normal color button
+        self.normal_color_button = QPushButton("Choose")
+        self.normal_color_button.clicked.connect(self.choose_normal_color)
+        self.normal_color_preview = QLabel()
+        self.normal_color_preview.setFixedSize(20, 20)
+        self.normal_color_preview.setStyleSheet(f"background-color: {self.timer_display.normal_color.name()}; border: 1px solid black;")
+        normal_color_layout = QHBoxLayout()
+        normal_color_layout.addWidget(self.normal_color_button)
+        normal_color_layout.addWidget(self.normal_color_preview)
+        color_layout.addRow("Normal Text Color:", normal_color_layout)
+        
+        # Caution color button
+        self.caution_color_button = QPushButton("Choose")
+        self.caution_color_button.clicked.connect(self.choose_caution_color)
+        self.caution_color_preview = QLabel()
+        self.caution_color_preview.setFixedSize(20, 20)
+        self.caution_color_preview.setStyleSheet(f"background-color: {self.timer_display.caution_color.name()}; border: 1px solid black;")
+        caution_color_layout = QHBoxLayout()
+        caution_color_layout.addWidget(self.caution_color_button)
+        caution_color_layout.addWidget(self.caution_color_preview)
+        color_layout.addRow("Caution Text Color:", caution_color_layout)
+        
+        # Warning color button
+        self.warning_color_button = QPushButton("Choose")
+        self.warning_color_button.clicked.connect(self.choose_warning_color)
+        self.warning_color_preview = QLabel()
+        self.warning_color_preview.setFixedSize(20, 20)
+        self.warning_color_preview.setStyleSheet(f"background-color: {self.timer_display.warning_color.name()}; border: 1px solid black;")
+        warning_color_layout = QHBoxLayout()
+        warning_color_layout.addWidget(self.warning_color_button)
+        warning_color_layout.addWidget(self.warning_color_preview)
+        color_layout.addRow("Warning Text Color:", warning_color_layout)
+        
+        # Background color button
+        self.background_color_button = QPushButton("Choose")
+        self.background_color_button.clicked.connect(self.choose_background_color)
+        self.background_color_preview = QLabel()
+        self.background_color_preview.setFixedSize(20, 20)
+        self.background_color_preview.setStyleSheet(f"background-color: {self.timer_display.background_color.name()}; border: 1px solid black;")
+        background_color_layout = QHBoxLayout()
+        background_color_layout.addWidget(self.background_color_button)
+        background_color_layout.addWidget(self.background_color_preview)
+        color_layout.addRow("Background Color:", background_color_layout)
+        
+        color_group.setLayout(color_layout)
+        self.main_layout.insertWidget(self.color_group_index, color_group)
+        self.color_group = color_group
+    
+    def paintEvent(self, event):
+        """Build the secondary panels once the first frame has been painted"""
+        super().paintEvent(event)
+        if self.color_group is None and not self.secondary_panels_pending:
+            self.secondary_panels_pending = True
+            QTimer.singleShot(0, self.build_color_settings)
+    
+    def eventFilter(self, obj, event):
+        """Follow the visibility of every window that shows a countdown"""
+        if event.type() in (QEvent.Show, QEvent.Hide, QEvent.WindowStateChange):
+            self.update_power_mode()
+        return False
+    
+    def update_power_mode(self):
+        """Tick every second only while a countdown is on screen"""
+        windows = [self] + self.timer_display.top_level_windows()
+        if self.timer_board is not None:
+            windows.append(self.timer_board)
+        visible = any(window.isVisible() and not window.isMinimized() for window in windows)
+        minutes_visible = self.tray is not None and self.tray.isVisible()
+        if (visible, minutes_visible) != (self.scheduler.visible, self.scheduler.minutes_visible):
+            self.scheduler.set_visible(visible, minutes_visible)
+            if visible:
+                # Catch up straight away rather than at the next second boundary
+                self.refresh_timers()
+    
+    def attach_tray(self, tray):
+        """Show the countdown in a TimerTray, which keeps ticking once the windows are hidden"""
+        self.tray = tray
+        self.timer_display.add_output(tray)
+        tray.show()
+        self.update_power_mode()
+    
+    def refresh_timers(self):
+        """Show the current state of every running countdown"""
+        if self.scheduler.isActive(MAIN_TIMER):
+            self.update_timer()
+        for name in list(self.named_timers):
+            if self.scheduler.isActive(name):
+                self.update_named_timer(name)
+    
     def closeEvent(self, event):
         """Handle the window close event to close both windows"""
         self.quit_application()
@@ -465,6 +1114,17 @@ class ControlPanel(QMainWindow):
         except Exception as e:
             print(f"Error selecting color: {e}")
     
+    def choose_caution_color(self):
+        """Open color dialog to choose caution text color"""
+        try:
+            color = QColorDialog.getColor(self.timer_display.caution_color, self, "Choose Caution Text Color")
+            if color.isValid():
+                self.timer_display.caution_color = color
+                self.caution_color_preview.setStyleSheet(f"background-color: {color.name()}; border: 1px solid black;")
+                self.update_timer_display_colors()
+        except Exception as e:
+            print(f"Error selecting color: {e}")
+    
     def choose_warning_color(self):
         """Open color dialog to choose warning text color"""
         try:
@@ -493,22 +1153,43 @@ class ControlPanel(QMainWindow):
             self.timer_display.set_colors(
                 self.timer_display.normal_color,
                 self.timer_display.warning_color,
-                self.timer_display.background_color
+                self.timer_display.background_color,
+                self.timer_display.caution_color
             )
             
+            if self.timer_board is not None:
+                self.timer_board.set_colors()
+            
             # Update control panel timer colors too
-            if self.timer_display.is_warning_state:
-                self.control_timer_display.setStyleSheet(f"color: {self.timer_display.warning_color.name()}; background-color: {self.timer_display.background_color.name()}; padding: 5px; border-radius: 5px;")
-            else:
-                self.control_timer_display.setStyleSheet(f"color: {self.timer_display.normal_color.name()}; background-color: {self.timer_display.background_color.name()}; padding: 5px; border-radius: 5px;")
-                
+            self.build_control_styles()
+            self.set_control_stage(*self.timer_display.style_key, force=True)
+            
         except Exception as e:
             print(f"Error updating colors: {e}")
+        self.save_state()
+    
+    def build_control_styles(self):
+        """Precompute the control panel timer colors for the current color scheme"""
+        display = self.timer_display
+        self.control_styles = stage_colors(display.normal_color, display.caution_color,
+                                           display.warning_color, display.background_color)
+    
+    def set_control_stage(self, stage, blink=False, force=False):
+        """Apply the control panel timer colors, only when the stage or blink phase changes"""
+        if (stage, blink) != self.control_style_key or force:
+            self.control_style_key = (stage, blink)
+            color, background = self.control_styles[stage, blink]
+            self.control_timer_display.set_text_color(color)
+            self.control_timer_display.set_background_color(background)
+    
+    def on_screens_changed(self):
+        """Bring the window back to the primary monitor if its screen went away"""
+        if not screen_manager().contains(self.frameGeometry().center()):
+            self.move_to_primary_monitor()
     
     def move_to_primary_monitor(self):
         """Position the window on the primary monitor"""
-        desktop = QDesktopWidget()
-        screen_geometry = desktop.screenGeometry(0)  # Primary monitor
+        screen_geometry = screen_manager().screen(0).geometry  # Primary monitor
         
         # Ensure the window fits within the primary monitor
         window_width = min(self.width(), screen_geometry.width() - 40)
@@ -535,11 +1216,73 @@ class ControlPanel(QMainWindow):
             
         self.move(x, y)
     
+    def attach_state_store(self, store):
+        """Save the countdown, colors and window positions to store whenever they change"""
+        self.state_store = store
+        self.engine.add_listener(self.on_engine_event)
+        self.save_state()
+    
+    def on_engine_event(self, event, engine):
+        # The warning is derived from the deadline, so it needs no save
+        if event != "warning":
+            self.save_state()
+    
+    def save_state(self):
+        """Write the current state to the state store, if it changed"""
+        if self.state_store is None:
+            return
+        display = self.timer_display
+        windows = {"control": [self.x(), self.y()]}
+        if display.position is not None:
+            windows["timer"] = [display.position.x(), display.position.y()]
+        self.state_store.save({
+            "timer": self.engine.saved_state(),
+            "colors": {
+                "normal": display.normal_color.name(),
+                "caution": display.caution_color.name(),
+                "warning": display.warning_color.name(),
+                "background": display.background_color.name(),
+            },
+            "windows": windows,
+        })
+    
+    def restore_state(self, state):
+        """Apply the colors and window positions from saved state"""
+        colors = state.get("colors")
+        if isinstance(colors, dict):
+            normal, warning, background = (QColor(str(colors.get(key, "")))
+                                           for key in ("normal", "warning", "background"))
+            if normal.isValid() and warning.isValid() and background.isValid():
+                self.timer_display.normal_color = normal
+                self.timer_display.warning_color = warning
+                self.timer_display.background_color = background
+                # Saved before the caution stage existed if it is missing
+                caution = QColor(str(colors.get("caution", "")))
+                if caution.isValid():
+                    self.timer_display.caution_color = caution
+                self.update_timer_display_colors()
+        
+        windows = state.get("windows")
+        if not isinstance(windows, dict):
+            return
+        try:
+            if "control" in windows:
+                position = QPoint(*windows["control"])
+                if screen_manager().contains(position):
+                    self.move(position)
+            if "timer" in windows:
+                self.timer_display.position = QPoint(*windows["timer"])
+        except TypeError as e:
+            print(f"Warning: Ignoring saved window positions: {e}")
+    
     def quit_application(self):
         """Quit the application"""
+        self.save_state()
         # Close the timer display window first
         if self.timer_display:
             self.timer_display.close()
+        if self.timer_board is not None:
+            self.timer_board.close()
         # Then close this window and exit the application
         self.close()
         QApplication.quit()
@@ -557,183 +1300,495 @@ class ControlPanel(QMainWindow):
     
     def start_timer(self):
         """Start the timer based on the selected mode"""
-        self.start_button.setEnabled(False)
-        self.stop_button.setEnabled(True)
+        self.set_running_buttons(True)
         
-        now = datetime.now()
+        if self.radio_schedule.isChecked():
+            if not self.start_next_scheduled():
+                self.current_timer_label.setText("No more scheduled events")
+                self.stop_timer()
+            return
         
+        self.apply_selected_mode(self.engine)
+        self.current_timer_label.setText(self.engine.label)
+        
+        # Tick on the second boundaries of the deadline
+        self.scheduler.add(MAIN_TIMER, self.engine)
+        self.update_timer()
+    
+    def select_mode(self, mode):
+        """Check the radio button for a control_api mode, filling in custom values"""
+        kind = mode[0]
+        if kind == "schedule":
+            self.radio_schedule.setChecked(True)
+        elif kind == "until":
+            hour, minute = mode[1:]
+            for radio, preset in self.time_presets.items():
+                if preset == (hour, minute):
+                    radio.setChecked(True)
+                    return
+            self.custom_time_edit.setTime(QTime(hour, minute))
+            self.radio_custom_time.setChecked(True)
+        elif kind == "for":
+            hours, minutes, seconds = mode[1:]
+            for radio, preset in self.duration_presets.items():
+                if (hours, minutes, seconds) == (0, preset, 0):
+                    radio.setChecked(True)
+                    return
+            self.hours_spin.setValue(hours)
+            self.minutes_spin.setValue(minutes)
+            self.seconds_spin.setValue(seconds)
+            self.radio_custom_duration.setChecked(True)
+    
+    def apply_command(self, command):
+        """Carry out a parsed control_api command"""
+        verb, mode = command
+        if mode is not None:
+            self.select_mode(mode)
+        if verb == "start":
+            self.start_timer()
+        elif verb == "stop":
+            self.stop_timer()
+        elif verb == "reset":
+            self.reset_timer()
+        elif verb in ("show", "hide") and self.timer_window_visible != (verb == "show"):
+            self.toggle_timer_window()
+    
+    def set_running_buttons(self, running):
+        """Enable Start or Stop; a follower takes both from its leader"""
+        local = self.sync_follower is None
+        self.start_button.setEnabled(local and not running)
+        self.stop_button.setEnabled(local and running)
+    
+    def follow_leader(self, follower):
+        """Mirror the countdown of the instance that follower tracks"""
+        self.sync_follower = follower
+        # Delivered to apply_leader_state on the GUI thread
+        follower.on_state = self.leader_state.emit
+        self.set_running_buttons(self.engine.running)
+        self.reset_button.setEnabled(False)
+        self.current_timer_label.setText("Waiting for the leader...")
+    
+    def apply_leader_state(self, state):
+        """Show the leader's countdown, its deadline already on our clock"""
+        if state.get("end_time") is None:
+            self.reset_timer()
+        elif state.get("running"):
+            self.engine.resume(state)
+            self.resume_timer()
+        elif state.get("stage") == "ended" and self.engine.stage == STAGE_ENDED:
+            pass  # Our copy of the countdown ended too and keeps flashing
+        else:
+            # Stopped on the leader; show where it stopped
+            self.stop_timer()
+            text = format_time(state.get("remaining", 0))
+            stage = STAGE_NAMES.index(state["stage"]) if state.get("stage") in STAGE_NAMES else STAGE_NORMAL
+            self.timer_display.update_display(text, stage=stage)
+            self.control_timer_display.setText(text)
+            self.set_control_stage(stage)
+            ended = state.get("remaining", 0) == 0
+            self.current_timer_label.setText("Timer Ended!" if ended else state.get("label", ""))
+    
+    def resume_timer(self):
+        """Continue the engine's running countdown, e.g. after a restart"""
+        self.set_running_buttons(True)
+        self.current_timer_label.setText(self.engine.label)
+        self.scheduler.add(MAIN_TIMER, self.engine)
+        self.update_timer()
+    
+    def start_next_scheduled(self):
+        """Count down to the next event of the course schedule, if there is one"""
+        if not start_mode(self.engine, ("schedule",), self.schedule):
+            return False
+        self.current_timer_label.setText(self.engine.label)
+        self.scheduler.add(MAIN_TIMER, self.engine)
+        self.update_timer()
+        return True
+    
+    def apply_selected_mode(self, engine):
+        """Start the engine according to the selected mode"""
         # Determine the end time based on the selected mode
-        if self.radio_830am.isChecked():
-            target_time = now.replace(hour=8, minute=30, second=0, microsecond=0)
-            if target_time < now:
-                # If 8:30 AM has already passed today, use tomorrow
-                target_time = target_time + timedelta(days=1)
-            self.end_time = target_time
-            self.timer_mode = "Until 8:30 AM"
-            self.current_timer_label.setText(f"Timer until 8:30 AM")
-            
-        elif self.radio_9am.isChecked():
-            target_time = now.replace(hour=9, minute=0, second=0, microsecond=0)
-            if target_time < now:
-                # If 9:00 AM has already passed today, use tomorrow
-                target_time = target_time + timedelta(days=1)
-            self.end_time = target_time
-            self.timer_mode = "Until 9:00 AM"
-            self.current_timer_label.setText(f"Timer until 9:00 AM")
-            
-        elif self.radio_1050am.isChecked():
-            target_time = now.replace(hour=10, minute=50, second=0, microsecond=0)
-            if target_time < now:
-                # If 10:50 AM has already passed today, use tomorrow
-                target_time = target_time + timedelta(days=1)
-            self.end_time = target_time
-            self.timer_mode = "Until 10:50 AM"
-            self.current_timer_label.setText(f"Timer until 10:50 AM")
-            
-        elif self.radio_130pm.isChecked():
-            target_time = now.replace(hour=13, minute=30, second=0, microsecond=0)
-            if target_time < now:
-                # If 1:30 PM has already passed today, use tomorrow
-                target_time = target_time + timedelta(days=1)
-            self.end_time = target_time
-            self.timer_mode = "Until 1:30 PM"
-            self.current_timer_label.setText(f"Timer until 1:30 PM")
-            
-        elif self.radio_320pm.isChecked():
-            target_time = now.replace(hour=15, minute=20, second=0, microsecond=0)
-            if target_time < now:
-                # If 3:20 PM has already passed today, use tomorrow
-                target_time = target_time + timedelta(days=1)
-            self.end_time = target_time
-            self.timer_mode = "Until 3:20 PM"
-            self.current_timer_label.setText(f"Timer until 3:20 PM")
-            
-        elif self.radio_custom_time.isChecked():
+        checked = self.mode_group.checkedButton()
+        if checked in self.time_presets:
+            engine.start_until(*self.time_presets[checked])
+        elif checked is self.radio_custom_time:
             custom_time = self.custom_time_edit.time()
-            target_time = now.replace(
-                hour=custom_time.hour(),
-                minute=custom_time.minute(),
-                second=0,
-                microsecond=0
-            )
-            if target_time < now:
-                # If the custom time has already passed today, use tomorrow
-                target_time = target_time + timedelta(days=1)
-            self.end_time = target_time
-            time_str = self.custom_time_edit.time().toString("hh:mm")
-            self.timer_mode = f"Until {time_str}"
-            self.current_timer_label.setText(f"Timer until {time_str}")
-            
-        elif self.radio_20min.isChecked():
-            self.end_time = now + timedelta(minutes=20)
-            self.timer_mode = "20 Minute Timer"
-            self.current_timer_label.setText("20 Minute Timer")
-            
-        elif self.radio_30min.isChecked():
-            self.end_time = now + timedelta(minutes=30)
-            self.timer_mode = "30 Minute Timer"
-            self.current_timer_label.setText("30 Minute Timer")
-            
-        elif self.radio_45min.isChecked():
-            self.end_time = now + timedelta(minutes=45)
-            self.timer_mode = "45 Minute Timer"
-            self.current_timer_label.setText("45 Minute Timer")
-            
-        elif self.radio_custom_duration.isChecked():
-            hours = self.hours_spin.value()
-            minutes = self.minutes_spin.value()
-            seconds = self.seconds_spin.value()
-            
-            if hours == 0 and minutes == 0 and seconds == 0:
-                # Default to 1 minute if no time is specified
-                self.end_time = now + timedelta(minutes=1)
-                self.timer_mode = "1 Minute Timer"
-                self.current_timer_label.setText("1 Minute Timer")
-            else:
-                self.end_time = now + timedelta(
-                    hours=hours,
-                    minutes=minutes,
-                    seconds=seconds
-                )
-                time_parts = []
-                if hours > 0:
-                    time_parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
-                if minutes > 0:
-                    time_parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
-                if seconds > 0:
-                    time_parts.append(f"{seconds} second{'s' if seconds > 1 else ''}")
-                
-                time_str = " ".join(time_parts)
-                self.timer_mode = f"{time_str} Timer"
-                self.current_timer_label.setText(f"{time_str} Timer")
-        
-        # Start the timer to update every second
-        self.timer.start(1000)
-        self.update_timer()
+            engine.start_until(custom_time.hour(), custom_time.minute(),
+                               label=custom_time.toString("hh:mm"))
+        elif checked in self.duration_presets:
+            minutes = self.duration_presets[checked]
+            engine.start_for(minutes=minutes, label=f"{minutes} Minute Timer")
+        elif checked is self.radio_custom_duration:
+            engine.start_for(self.hours_spin.value(),
+                             self.minutes_spin.value(),
+                             self.seconds_spin.value())
+    
+    def on_tick(self, name, lateness):
+        """Handle a scheduler tick, recording how late it fired"""
+        started = time.perf_counter()
+        if name == MAIN_TIMER:
+            self.last_tick_lateness = lateness
+            self.update_timer()
+            if self.diagnostics_group is not None and self.diagnostics_group.isVisible():
+                self.diagnostics_label.setText(self.metrics.summary())
+        else:
+            self.update_named_timer(name)
+        self.metrics.update_duration.observe(time.perf_counter() - started)
+    
+    def toggle_diagnostics(self):
+        """Show or hide the tick and repaint timing panel (Ctrl+Shift+D)"""
+        if self.diagnostics_group is None:
+            self.diagnostics_group = QGroupBox("Diagnostics")
+            layout = QVBoxLayout()
+            self.diagnostics_label = QLabel()
+            self.diagnostics_label.setFont(QFont('Courier', 9))
+            layout.addWidget(self.diagnostics_label)
+            self.diagnostics_group.setLayout(layout)
+            self.diagnostics_group.hide()
+            self.main_layout.addWidget(self.diagnostics_group)
+        visible = not self.diagnostics_group.isVisible()
+        if visible:
+            self.diagnostics_label.setText(self.metrics.summary())
+        self.diagnostics_group.setVisible(visible)
+        self.adjustSize()
     
     def update_timer(self):
         """Update the timer display"""
-        now = datetime.now()
-        
-        if self.end_time is None:
+        if self.engine.end_time is None:
             return
         
-        # Calculate the remaining time
-        if now >= self.end_time:
-            # Timer has ended
-            self.timer_display.update_display("00:00:00", is_warning=True)
-            self.control_timer_display.setText("00:00:00")
-            self.control_timer_display.setStyleSheet(f"color: {self.timer_display.warning_color.name()}; background-color: {self.timer_display.background_color.name()}; padding: 5px; border-radius: 5px;")
-            self.current_timer_label.setText("Timer Ended!")
-            self.stop_timer()
+        state = self.engine.state()
+        if state.ended and self.radio_schedule.isChecked() and self.start_next_scheduled():
+            # Chained straight on to the next scheduled event
             return
         
-        # Calculate the time difference
-        time_diff = self.end_time - now
-        
-        # Convert to hours, minutes, seconds
-        total_seconds = int(time_diff.total_seconds())
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        
-        # Format the time string
-        time_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        
         # Update the displays
-        is_warning = time_diff.total_seconds() < 300  # Warning if less than 5 minutes
-        self.timer_display.update_display(time_str, is_warning)
+        self.timer_display.update_display(state.text, state.is_warning, state.stage, state.blink)
         
         # Update control panel timer display
-        self.control_timer_display.setText(time_str)
-        if is_warning:
-            self.control_timer_display.setStyleSheet(f"color: {self.timer_display.warning_color.name()}; background-color: {self.timer_display.background_color.name()}; padding: 5px; border-radius: 5px;")
-        else:
-            self.control_timer_display.setStyleSheet(f"color: {self.timer_display.normal_color.name()}; background-color: {self.timer_display.background_color.name()}; padding: 5px; border-radius: 5px;")
+        self.control_timer_display.setText(state.text)
+        self.set_control_stage(state.stage, state.blink)
+        
+        if state.ended and self.current_timer_label.text() != "Timer Ended!":
+            # Keep ticking so the display flashes (and counts overtime) until stopped
+            self.current_timer_label.setText("Timer Ended!")
+            self.start_button.setEnabled(self.sync_follower is None)
     
     def stop_timer(self):
         """Stop the timer"""
-        self.timer.stop()
-        self.start_button.setEnabled(True)
-        self.stop_button.setEnabled(False)
+        self.scheduler.remove(MAIN_TIMER)
+        self.engine.stop()
+        self.set_running_buttons(False)
+        if self.engine.stage == STAGE_ENDED:
+            # Stop flashing
+            self.timer_display.update_display(self.timer_display.current_time_str, stage=STAGE_ENDED)
+            self.set_control_stage(STAGE_ENDED)
     
     def reset_timer(self):
         """Reset the timer"""
         self.stop_timer()
         self.timer_display.update_display("00:00:00")
         self.control_timer_display.setText("00:00:00")
-        self.control_timer_display.setStyleSheet(f"color: {self.timer_display.normal_color.name()}; background-color: {self.timer_display.background_color.name()}; padding: 5px; border-radius: 5px;")
-        self.current_timer_label.setText("Timer not started")
-        self.end_time = None
-        self.timer_mode = "Not started"
+        self.set_control_stage(STAGE_NORMAL)
+        self.engine.reset()
+        self.current_timer_label.setText(self.engine.label)
+    
+    def add_named_timer(self, name=None, engine=None):
+        """Run an additional countdown on the timer board, by default in the selected mode"""
+        if engine is None:
+            engine = self.engine.sibling()
+            self.apply_selected_mode(engine)
+        name = name or engine.label
+        # Keep names unique, including against the main countdown
+        base_name, count = name, 1
+        while name in self.named_timers or name == MAIN_TIMER:
+            count += 1
+            name = f"{base_name} ({count})"
+        
+        if self.timer_board is None:
+            self.timer_board = TimerBoard(self.timer_display)
+            self.timer_board.removed.connect(self.remove_named_timer)
+            self.timer_board.installEventFilter(self)
+        self.named_timers[name] = engine
+        self.timer_board.add_row(name)
+        self.timer_board.show()
+        self.scheduler.add(name, engine)
+        self.update_named_timer(name)
+        return name
+    
+    def remove_named_timer(self, name):
+        """Stop a named timer and remove it from the timer board"""
+        self.scheduler.remove(name)
+        if self.named_timers.pop(name, None) is not None:
+            self.timer_board.remove_row(name)
+    
+    def update_named_timer(self, name):
+        """Show the current state of a named timer on the timer board"""
+        engine = self.named_timers.get(name)
+        if engine is None:
+            return
+        state = engine.state()
+        self.timer_board.update_row(name, state.text, state.stage)
+        if state.ended:
+            # Keep the finished row visible but stop waking up for it
+            self.scheduler.remove(name)
+            engine.stop()
     
     def show_help(self):
         """Show the help dialog"""
-        help_dialog = HelpDialog(self)
-        help_dialog.exec_()
+        if self.help_dialog is None:
+            self.help_dialog = HelpDialog(self)
+        self.help_dialog.exec_()
+
+
+class ControlServer(QObject):
+    """Accepts control_api commands from other programs
+    
+    Commands arrive over a QLocalServer or, via handle_http, from the HTTP
+    server's thread. Each is parsed and acknowledged straight away; anything
+    that changes the timer is then applied from the event loop. The controller
+    is a ControlPanel or anything else with engine, schedule, sync_follower and
+    apply_command (e.g. the kiosk's). The HTTP thread never reads the engine:
+    it answers "state" from the snapshot taken on the GUI thread at the last
+    engine event.
+    """
+    
+    command_received = pyqtSignal(object)  # Parsed (verb, mode), applied on the GUI thread
+    
+    def __init__(self, control_panel, parent=None):
+        super().__init__(parent)
+        self.control_panel = control_panel
+        self.server = QLocalServer(self)
+        self.server.newConnection.connect(self.on_new_connection)
+        # Queued even from the GUI thread, so the reply goes out before the command runs
+        self.command_received.connect(control_panel.apply_command, Qt.QueuedConnection)
+        # Replaced whole on every engine event, so other threads always see a consistent state
+        self.published_state = control_panel.engine.snapshot()
+        control_panel.engine.add_listener(self.on_engine_event)
+    
+    def on_engine_event(self, event, engine):
+        self.published_state = engine.snapshot()
+    
+    def listen(self, name):
+        """Listen on the local control channel called name; return True on success"""
+        address = control_address(name)
+        # Clear a socket left behind by a crashed instance
+        QLocalServer.removeServer(address)
+        if not self.server.listen(address):
+            print(f"Warning: Could not open the control channel {address}: {self.server.errorString()}")
+            return False
+        return True
+    
+    def on_new_connection(self):
+        while self.server.hasPendingConnections():
+            connection = self.server.nextPendingConnection()
+            connection.readyRead.connect(lambda connection=connection: self.on_ready_read(connection))
+            connection.disconnected.connect(connection.deleteLater)
+    
+    def on_ready_read(self, connection):
+        while connection.canReadLine():
+            line = bytes(connection.readLine()).decode("utf-8", "replace")
+            connection.write((self.handle(line) + "\n").encode())
+        connection.flush()
+    
+    def handle(self, line, state=None):
+        """Acknowledge one command line and queue it; return the reply line
+        
+        Off the GUI thread, pass the state to answer "state" with.
+        """
+        try:
+            command = parse_command(line)
+            verb, mode = command
+            if verb == "state":
+                return "ok " + json.dumps(state or self.control_panel.engine.snapshot())
+            if verb == "ping":
+                return "ok"
+            if mode == ("schedule",) and self.control_panel.schedule is None:
+                raise CommandError("No course schedule is loaded")
+            if verb in ("start", "stop", "reset") and self.control_panel.sync_follower is not None:
+                raise CommandError("Following a leader")
+        except CommandError as e:
+            return f"error {e}"
+        # Emitting from any thread queues the command for the GUI thread
+        self.command_received.emit(command)
+        return "ok"
+    
+    def handle_http(self, body):
+        """POST /control handler for BroadcastServer.add_post_route"""
+        state = self.published_state
+        if state["running"]:
+            state = dict(state, remaining=max(0, math.ceil(state["end_time"] - time.time())))
+        reply = self.handle(body.decode("utf-8", "replace"), state)
+        status = "200 OK" if reply.startswith("ok") else "400 Bad Request"
+        return status, "text/plain; charset=utf-8", (reply + "\n").encode()
+
+
+class StartupTimer(QObject):
+    """Records named milestones during startup and prints a breakdown"""
+    
+    def __init__(self, enabled=False):
+        super().__init__()
+        self.enabled = enabled
+        self.marks = [("module imported", MODULE_LOADED_AT)]
+    
+    def report_on_first_paint(self, widget):
+        """Mark the first frame and print the breakdown when the widget first paints"""
+        if self.enabled:
+            widget.installEventFilter(self)
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            self.mark("first frame")
+            self.report()
+        return False
+    
+    def mark(self, name):
+        """Record that a startup milestone has been reached"""
+        if self.enabled:
+            self.marks.append((name, time.perf_counter()))
+    
+    def report(self):
+        """Print the time spent between consecutive milestones"""
+        if not self.enabled:
+            return
+        print("Startup timing:")
+        age = process_age()
+        if age is not None:
+            # Interpreter start up to the import of this module
+            print(f"  {'process start to module import':<32} {age * 1000:8.1f} ms")
+        previous = self.marks[0][1]
+        for name, at in self.marks[1:]:
+            print(f"  {name:<32} {(at - previous) * 1000:8.1f} ms")
+            previous = at
+        print(f"  {'total since module import':<32} {(previous - self.marks[0][1]) * 1000:8.1f} ms")
+
+
+def process_age():
+    """Return how long before module import the process started, where the OS exposes it"""
+    try:
+        with open("/proc/self/stat") as stat:
+            # Skip past the command name, which may itself contain spaces
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as uptime:
+            uptime_seconds = float(uptime.read().split()[0])
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        # Shift the age back from now to the moment the module finished importing
+        return uptime_seconds - started - (time.perf_counter() - MODULE_LOADED_AT)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def create_windows(startup=None, mirror_screens=None, schedule=None, engine=None):
+    """Create both windows and show the control panel
+    
+    With mirror_screens (a list of screen indexes, empty for all screens) the
+    timer display is mirrored onto several screens. A CourseSchedule adds the
+    "Follow course schedule" mode. A running engine (e.g. one restored from
+    saved state) keeps counting down.
+    """
+    startup = startup or StartupTimer()
+    
+    # Create the timer display window
+    if mirror_screens is None:
+        timer_display = TimerDisplay()
+    else:
+        timer_display = MirroredTimerDisplay(mirror_screens or None)
+    startup.mark("timer display created")
+    
+    # Create the control panel window
+    control_panel = ControlPanel(timer_display, engine, schedule)
+    startup.mark("control panel created")
+    
+    # Show only the control panel initially
+    control_panel.show()
+    
+    # Force proper positioning after windows are shown
+    timer_display.move_to_secondary_monitor()
+    control_panel.move_to_primary_monitor()
+    startup.mark("windows shown")
+    
+    return timer_display, control_panel
+
+
+def parse_screens(value):
+    """Parse the --mirror list of screen numbers; an empty list means every screen"""
+    screens = []
+    for index in value.split(","):
+        if not index.strip():
+            continue
+        try:
+            screens.append(int(index))
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid screen number {index.strip()!r}")
+        if screens[-1] < 0:
+            raise argparse.ArgumentTypeError(f"screen numbers start at 0, not {screens[-1]}")
+    return screens
 
 
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="SANS Timer")
+    parser.add_argument("--startup-timing", action="store_true",
+                        help="print a breakdown of the time taken to show the first frame")
+    parser.add_argument("--mirror", nargs="?", const=[], type=parse_screens, metavar="SCREENS",
+                        help="show the timer window on every screen, or on a "
+                             "comma-separated list of screen numbers (e.g. 1,2)")
+    parser.add_argument("--fit", action="store_true",
+                        help="scale the digits to fill the timer window, which starts out covering "
+                             "its screen (double-click it for a resizable window)")
+    parser.add_argument("--schedule", metavar="FILE",
+                        help="course schedule (JSON) to follow automatically")
+    add_engine_arguments(parser)
+    parser.add_argument("--state", metavar="FILE",
+                        help="file that keeps the countdown, colors and window positions "
+                             "across restarts (default: a per-user state file)")
+    parser.add_argument("--no-restore", action="store_true",
+                        help="start fresh instead of resuming the saved state")
+    parser.add_argument("--history", metavar="FILE",
+                        help="SQLite database that logs every session for session_history.py "
+                             "(default: next to the state file)")
+    parser.add_argument("--no-history", action="store_true", help="do not log sessions")
+    parser.add_argument("--sync-lead", type=int, metavar="PORT",
+                        help="lead other instances: send them this countdown over UDP on this port")
+    parser.add_argument("--sync-follow", metavar="HOST[:PORT]",
+                        help="follow the countdown of the instance leading at this address")
+    parser.add_argument("--serve", type=int, metavar="PORT",
+                        help="broadcast the countdown to browsers on this port")
+    parser.add_argument("--serve-host", default="127.0.0.1",
+                        help="address for the HTTP options (--serve, --metrics, --control-http) "
+                             "to listen on (default: 127.0.0.1)")
+    parser.add_argument("--control", nargs="?", const="sans_timer", metavar="NAME",
+                        help="accept commands from control_api.py over a local socket "
+                             "(optionally named, for several instances)")
+    parser.add_argument("--control-http", type=int, metavar="PORT",
+                        help="also accept commands POSTed to /control on this port")
+    parser.add_argument("--metrics", type=int, metavar="PORT",
+                        help="serve tick and repaint timings in the Prometheus text "
+                             "format at /metrics on this port")
+    parser.add_argument("--tray", action="store_true",
+                        help="show the minutes left in a system tray icon; its menu hides the windows")
+    parser.add_argument("--frame-output", nargs="?", const="", metavar="FILE",
+                        help="also render the countdown into a shared-memory frame for capture "
+                             "(see frame_output.py; default: a per-user file in /dev/shm)")
+    parser.add_argument("--frame-transparent", action="store_true",
+                        help="give the shared-memory frame a transparent background")
+    parser.add_argument("--hooks", metavar="FILE",
+                        help="run the commands and webhooks in FILE (JSON) when the countdown "
+                             "enters caution or warning, ends, and every overtime minute")
+    # Leave any Qt options (e.g. -platform) for QApplication
+    args, _ = parser.parse_known_args()
+    startup = StartupTimer(args.startup_timing)
+    
+    # Reuse an existing application object (e.g. when driven by the benchmarks)
+    app = QApplication.instance() or QApplication(sys.argv)
+    startup.mark("application created")
+    
+    # Resume a countdown that was running when the app last stopped, before building any UI
+    store = StateStore(args.state)
+    saved = {} if args.no_restore else store.load()
+    engine = engine_from_args(args)
+    if isinstance(saved.get("timer"), dict):
+        engine.resume(saved["timer"])
+    startup.mark("state restored")
     
     # Set application icon if available
     icon_path = "timer_icon.ico"
@@ -748,18 +1803,122 @@ def main():
         except Exception as e:
             print(f"Warning: Could not set taskbar icon: {e}")
     
-    # Create the timer display window
-    timer_display = TimerDisplay()
+    schedule = None
+    if args.schedule:
+        # Only load dateutil when a schedule is used
+        from course_schedule import CourseSchedule, ScheduleError
+        try:
+            schedule = CourseSchedule.load(args.schedule)
+            startup.mark(f"schedule loaded ({len(schedule)} events)")
+        except ScheduleError as e:
+            print(f"Warning: {e}")
     
-    # Create the control panel window
-    control_panel = ControlPanel(timer_display)
+    # Keep references so the windows live as long as the event loop
+    timer_display, control_panel = create_windows(startup, args.mirror, schedule, engine)
+    if args.fit:
+        timer_display.set_fit(True)
+    control_panel.restore_state(saved)
+    control_panel.attach_state_store(store)
+    startup.report_on_first_paint(control_panel)
     
-    # Show only the control panel initially
-    control_panel.show()
+    # Followers only mirror the leader, which keeps the history
+    if not args.no_history and not args.sync_follow:
+        from session_history import SessionHistory
+        history = SessionHistory(args.history)
+        history.attach(control_panel.engine)
+        app.aboutToQuit.connect(history.close)
     
-    # Force proper positioning after windows are shown
-    timer_display.move_to_secondary_monitor()
-    control_panel.move_to_primary_monitor()
+    if args.sync_lead is not None:
+        from lan_sync import SyncLeader, leader_publisher
+        leader = SyncLeader(port=args.sync_lead)
+        try:
+            leader.start()
+            control_panel.engine.add_listener(leader_publisher(leader))
+            leader.publish(control_panel.engine.snapshot())
+            print(f"Leading other instances on UDP port {leader.port}")
+        except OSError as e:
+            print(f"Warning: Could not start leading: {e}")
+    elif args.sync_follow:
+        from lan_sync import SyncFollower, parse_address
+        try:
+            follower = SyncFollower(*parse_address(args.sync_follow))
+        except ValueError as e:
+            print(f"Warning: Invalid leader address {args.sync_follow}: {e}")
+        else:
+            control_panel.follow_leader(follower)
+            follower.start()
+    
+    if args.tray:
+        from tray_icon import TimerTray
+        from PyQt5.QtWidgets import QSystemTrayIcon
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            control_panel.attach_tray(TimerTray(control_panel))
+        else:
+            print("Warning: No system tray is available")
+    
+    if args.frame_output is not None:
+        from frame_output import SharedFrameOutput
+        try:
+            frame_output = SharedFrameOutput(args.frame_output or None, transparent=args.frame_transparent)
+        except OSError as e:
+            print(f"Warning: Could not create the frame output: {e}")
+        else:
+            timer_display.add_output(frame_output)
+            app.aboutToQuit.connect(frame_output.close)
+            print(f"Sharing frames in {frame_output.path}")
+    
+    if args.hooks:
+        from action_hooks import HookRunner, HookError, load_hooks
+        try:
+            hook_runner = HookRunner(load_hooks(args.hooks), metrics=control_panel.metrics)
+        except HookError as e:
+            print(f"Warning: {e}")
+        else:
+            hook_runner.attach(control_panel.engine)
+            app.aboutToQuit.connect(hook_runner.stop)
+    
+    # HTTP options given the same port share one server
+    http_servers = {}
+    
+    def http_server(port):
+        if port not in http_servers:
+            # Imported here so the server costs nothing unless it is asked for
+            from broadcast import BroadcastServer
+            server = BroadcastServer(args.serve_host, port)
+            server.start()
+            http_servers[port] = server
+        return http_servers[port]
+    
+    if args.serve is not None:
+        from broadcast import engine_publisher
+        try:
+            server = http_server(args.serve)
+            control_panel.engine.add_listener(engine_publisher(server))
+            server.publish(control_panel.engine.snapshot())
+            print(f"Broadcasting the countdown on http://{args.serve_host}:{server.port}/")
+        except OSError as e:
+            print(f"Warning: Could not start the broadcast server: {e}")
+    
+    if args.metrics is not None:
+        try:
+            server = http_server(args.metrics)
+            server.add_text_route("/metrics", "text/plain; version=0.0.4",
+                                  control_panel.metrics.render_prometheus)
+            print(f"Serving metrics on http://{args.serve_host}:{server.port}/metrics")
+        except OSError as e:
+            print(f"Warning: Could not start the metrics server: {e}")
+    
+    if args.control is not None or args.control_http is not None:
+        control_server = ControlServer(control_panel, control_panel)
+        if args.control is not None:
+            control_server.listen(args.control)
+        if args.control_http is not None:
+            try:
+                server = http_server(args.control_http)
+                server.add_post_route("/control", control_server.handle_http)
+                print(f"Accepting commands on http://{args.serve_host}:{server.port}/control")
+            except OSError as e:
+                print(f"Warning: Could not start the control server: {e}")
     
     sys.exit(app.exec_())
 
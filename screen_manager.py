@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Cached screen topology for SANS Timer
+
+Placement code asks the shared ScreenManager for screen geometry instead of
+creating a QDesktopWidget on every call. The manager reads every QScreen once,
+then refreshes its cache and emits screens_changed only when a screen is
+added or removed, the primary screen changes, or a screen's geometry or
+pixel ratio changes (e.g. a projector plugged in mid-session).
+"""
+
+from collections import namedtuple
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+# Cached facts about one screen; index 0 is the primary screen
+ScreenInfo = namedtuple('ScreenInfo', ['name', 'geometry', 'available_geometry', 'pixel_ratio', 'logical_dpi'])
+
+_manager = None
+
+
+class ScreenManager(QObject):
+    """Keeps the geometry and pixel ratio of every screen up to date"""
+
+    screens_changed = pyqtSignal()
+
+    def __init__(self, app=None):
+        super().__init__()
+        self.app = app or QApplication.instance()
+        self.screens = []
+        self.app.screenAdded.connect(self.on_screen_added)
+        self.app.screenRemoved.connect(self.refresh)
+        self.app.primaryScreenChanged.connect(self.refresh)
+        for screen in self.app.screens():
+            self.watch(screen)
+        self.refresh(notify=False)
+
+    def watch(self, screen):
+        screen.geometryChanged.connect(self.refresh)
+        screen.availableGeometryChanged.connect(self.refresh)
+        screen.physicalDotsPerInchChanged.connect(self.refresh)
+        screen.logicalDotsPerInchChanged.connect(self.refresh)
+
+    def on_screen_added(self, screen):
+        self.watch(screen)
+        self.refresh()
+
+    def refresh(self, *args, notify=True):
+        """Re-read every screen, notifying listeners if anything changed"""
+        primary = self.app.primaryScreen()
+        screens = self.app.screens()
+        if primary in screens:
+            screens.remove(primary)
+            screens.insert(0, primary)
+        cached = [ScreenInfo(screen.name(), screen.geometry(), screen.availableGeometry(),
+                             screen.devicePixelRatio(), screen.logicalDotsPerInchY()) for screen in screens]
+        if cached != self.screens:
+            self.screens = cached
+            if notify:
+                self.screens_changed.emit()
+
+    def count(self):
+        return len(self.screens)
+
+    def screen(self, index):
+        """Return the ScreenInfo for index, falling back to the primary screen"""
+        if 0 <= index < len(self.screens):
+            return self.screens[index]
+        return self.screens[0]
+
+    def secondary_index(self):
+        """Return the screen the timer display belongs on: the second one if there is one"""
+        return 1 if len(self.screens) > 1 else 0
+
+    def contains(self, point):
+        """Return True if point lies on any screen"""
+        return any(info.geometry.contains(point) for info in self.screens)
+
+
+def screen_manager():
+    """Return the shared ScreenManager, creating it on first use"""
+    global _manager
+    if _manager is None:
+        _manager = ScreenManager()
+    return _manager
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+History of every countdown run with SANS Timer
+
+Each session (one start of the countdown) is kept in a local SQLite database
+with its actual start, planned end, the moment it reached zero, when it was
+stopped and reset, its mode and label, and its overrun: how long past the
+planned end it was stopped (negative when stopped early). The timer only
+queues changes; a background thread writes whatever has queued up in one
+transaction, so the GUI thread never waits on the disk.
+
+Sessions are indexed by start time, so a report over weeks of history reads
+only the rows in range:
+
+    python session_history.py --weeks 4
+    python session_history.py --weeks 12 --by label
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+
+from state_store import default_state_path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at REAL NOT NULL,
+    planned_end REAL NOT NULL,
+    ended_at REAL,
+    stopped_at REAL,
+    reset_at REAL,
+    mode TEXT NOT NULL,
+    label TEXT NOT NULL,
+    overrun REAL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_start ON sessions (started_at, mode, label, overrun, ended_at);
+CREATE INDEX IF NOT EXISTS open_sessions ON sessions (planned_end) WHERE stopped_at IS NULL;
+"""
+
+# A restored or re-sent countdown with the same deadline continues its open session
+OPEN_SESSION = "INSERT INTO sessions (started_at, planned_end, mode, label) SELECT ?, ?, ?, ? " \
+               "WHERE NOT EXISTS (SELECT 1 FROM sessions WHERE planned_end = ? AND stopped_at IS NULL)"
+# Starting again without stopping closes the previous session
+CLOSE_OTHERS = "UPDATE sessions SET stopped_at = ?, overrun = ? - planned_end " \
+               "WHERE stopped_at IS NULL AND planned_end != ?"
+MARK_ENDED = "UPDATE sessions SET ended_at = ? WHERE planned_end = ? AND stopped_at IS NULL"
+CLOSE_SESSION = "UPDATE sessions SET stopped_at = ?, overrun = ? - planned_end " \
+                "WHERE planned_end = ? AND stopped_at IS NULL"
+MARK_RESET = "UPDATE sessions SET reset_at = ? WHERE id = " \
+             "(SELECT max(id) FROM sessions WHERE planned_end = ? AND reset_at IS NULL)"
+
+REPORT = "SELECT {column}, count(*), count(ended_at), avg(CASE WHEN ended_at IS NOT NULL THEN overrun END), " \
+         "max(overrun), sum(overrun < 0) FROM sessions WHERE started_at >= ? GROUP BY {column} ORDER BY 2 DESC"
+
+REPORT_COLUMNS = ("mode", "label")
+
+
+def default_history_path():
+    """Return the per-user location of the history database, next to the state file"""
+    return os.path.join(os.path.dirname(default_state_path()), "sessions.db")
+
+
+def connect(path):
+    """Open the history database, creating it if needed"""
+    import sqlite3
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+class SessionHistory:
+    """Logs the sessions of a timer engine through a background writer"""
+
+    def __init__(self, path=None):
+        self.path = path or default_history_path()
+        self.batches = 0
+        self.writes = 0
+        self._queue = queue.Queue()
+        self._last_deadline = None  # Of the session a later reset belongs to
+        self._thread = threading.Thread(target=self._run, name="session-history", daemon=True)
+        self._thread.start()
+
+    def attach(self, engine):
+        """Log every session of engine, including one already running"""
+        engine.add_listener(self.on_engine_event)
+        if engine.running:
+            self.on_engine_event("start", engine)
+
+    def on_engine_event(self, event, engine):
+        now = engine.clock().timestamp()
+        if event == "reset":
+            if self._last_deadline is not None:
+                self._queue.put(((MARK_RESET, (now, self._last_deadline)),))
+            return
+        if engine.end_time is None:
+            return
+        deadline = engine.end_time.timestamp()
+        self._last_deadline = deadline
+        if event == "start":
+            self._queue.put(((CLOSE_OTHERS, (now, now, deadline)),
+                             (OPEN_SESSION, (now, deadline, engine.mode, engine.label, deadline))))
+        elif event == "end":
+            self._queue.put(((MARK_ENDED, (now, deadline)),))
+        elif event == "stop":
+            self._queue.put(((CLOSE_SESSION, (now, now, deadline)),))
+
+    def flush(self):
+        """Wait until everything queued so far is on disk"""
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer"""
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        try:
+            connection = connect(self.path)
+        except Exception as e:
+            print(f"Warning: Could not open session history {self.path}: {e}")
+            connection = None
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Everything that queued up while the last batch was written goes in one transaction
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in batch:
+                running = False
+            statements = [statement for item in batch if item is not None for statement in item]
+            if connection is not None and statements:
+                try:
+                    with connection:
+                        for sql, parameters in statements:
+                            connection.execute(sql, parameters)
+                    self.batches += 1
+                    self.writes += len(statements)
+                except Exception as e:
+                    print(f"Warning: Could not write session history: {e}")
+            for _ in batch:
+                self._queue.task_done()
+        if connection is not None:
+            connection.close()
+
+
+def report(path, weeks=4, column="mode", now=None):
+    """Return (name, sessions, reached zero, mean overrun, max overrun, stopped early) per mode or label"""
+    if column not in REPORT_COLUMNS:
+        raise ValueError(f"Cannot group sessions by {column!r}")
+    import sqlite3
+    from pathlib import Path
+    since = (now or time.time()) - weeks * 7 * 86400
+    # Read-only: a report never creates the database or changes its journal mode
+    connection = sqlite3.connect(f"{Path(path).absolute().as_uri()}?mode=ro", uri=True)
+    try:
+        return connection.execute(REPORT.format(column=column), (since,)).fetchall()
+    finally:
+        connection.close()
+
+
+def format_seconds(seconds):
+    """Format a signed number of seconds as [-]M:SS"""
+    if seconds is None:
+        return "-"
+    sign = "-" if seconds < 0 else ""
+    minutes, seconds = divmod(int(round(abs(seconds))), 60)
+    return f"{sign}{minutes}:{seconds:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report on SANS Timer session history")
+    parser.add_argument("--db", default=default_history_path(), help="history database")
+    parser.add_argument("--weeks", type=float, default=4, help="how many weeks back to report")
+    parser.add_argument("--by", choices=REPORT_COLUMNS, default="mode", help="group sessions by")
+    parser.add_argument("--timing", action="store_true", help="print how long the query took")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"Error: No session history at {args.db}")
+        sys.exit(1)
+    started = time.perf_counter()
+    rows = report(args.db, args.weeks, args.by)
+    elapsed = time.perf_counter() - started
+
+    since = datetime.fromtimestamp(time.time() - args.weeks * 7 * 86400)
+    print(f"Sessions since {since:%Y-%m-%d %H:%M}")
+    width = max([len(args.by)] + [len(row[0]) for row in rows])
+    print(f"{args.by.capitalize():<{width}}  Sessions  Reached 0  Mean overrun  Max overrun  Stopped early")
+    for name, count, ended, mean, longest, early in rows:
+        print(f"{name:<{width}}  {count:>8}  {ended:>9}  {format_seconds(mean):>12}  "
+              f"{format_seconds(longest):>11}  {early or 0:>13}")
+    if args.timing:
+        print(f"Query: {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Crash-safe persistence of the SANS Timer state
+
+The running countdown (as an absolute deadline), the colors and the window
+positions are kept in one small JSON file. It is rewritten only when its
+contents change, by writing a temporary file next to it and renaming it over
+the old one, so a crash or power loss leaves either the old or the new state.
+"""
+
+import json
+import os
+import sys
+import tempfile
+
+
+def default_state_path():
+    """Return the per-user location of the state file"""
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "sans_timer", "state.json")
+
+
+class StateStore:
+    """Reads and atomically rewrites the state file"""
+
+    def __init__(self, path=None):
+        self.path = path or default_state_path()
+        self.writes = 0
+        self._last = None  # Bytes last read or written, to skip unchanged saves
+
+    def load(self):
+        """Return the saved state, or an empty dict if there is none"""
+        try:
+            with open(self.path, "rb") as state_file:
+                data = state_file.read()
+            state = json.loads(data)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read saved state {self.path}: {e}")
+            return {}
+        if not isinstance(state, dict):
+            return {}
+        self._last = data
+        return state
+
+    def save(self, state):
+        """Write the state if it changed; return True if the file was written"""
+        data = json.dumps(state, sort_keys=True, separators=(",", ":")).encode()
+        if data == self._last:
+            return False
+        directory = os.path.dirname(self.path) or "."
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".state-", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "wb") as temp_file:
+                    temp_file.write(data)
+                    temp_file.flush()
+                    os.fsync(temp_file.fileno())
+                os.replace(temp_path, self.path)
+            except OSError:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            print(f"Warning: Could not save state to {self.path}: {e}")
+            return False
+        self._last = data
+        self.writes += 1
+        return True
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Terminal front end for SANS Timer
+
+Shows the countdown in big block digits with curses, for SSH sessions,
+headless lab servers and serial-console signage. It runs the same TimerEngine
+and modes as the control panel but never imports PyQt5:
+
+    python terminal_timer.py --for 45m
+    python terminal_timer.py --until 13:30
+    python terminal_timer.py --schedule course.json
+
+Only the digits that changed are redrawn each second. Press q to quit.
+"""
+
+import argparse
+import curses
+import locale
+import sys
+
+from timer_engine import add_engine_arguments, engine_from_args, STAGE_NORMAL, STAGE_CAUTION, STAGE_WARNING, STAGE_ENDED
+from control_api import CommandError, parse_duration, parse_mode, start_mode
+
+
+# 3x5 block font; each column is drawn two characters wide
+BIG_GLYPHS = {
+    "0": ("###", "# #", "# #", "# #", "###"),
+    "1": (" # ", "## ", " # ", " # ", "###"),
+    "2": ("###", "  #", "###", "#  ", "###"),
+    "3": ("###", "  #", "###", "  #", "###"),
+    "4": ("# #", "# #", "###", "  #", "  #"),
+    "5": ("###", "#  ", "###", "  #", "###"),
+    "6": ("###", "#  ", "###", "# #", "###"),
+    "7": ("###", "  #", "  #", "  #", "  #"),
+    "8": ("###", "# #", "###", "# #", "###"),
+    "9": ("###", "# #", "###", "  #", "###"),
+    ":": (" ", "#", " ", "#", " "),
+    "-": ("   ", "   ", "###", "   ", "   "),
+    ".": (" ", " ", " ", " ", "#"),
+}
+GLYPH_ROWS = 5
+
+NORMAL_PAIR = 1
+CAUTION_PAIR = 2
+WARNING_PAIR = 3
+
+
+class BigDigits:
+    """Draws HH:MM:SS in block digits, redrawing only the characters that changed"""
+
+    def __init__(self, window):
+        self.window = window
+        self.text = None
+        self.attribute = None
+        self.block = "█"
+        try:
+            self.block.encode(locale.getpreferredencoding() or "ascii")
+        except (UnicodeEncodeError, LookupError):
+            self.block = "#"
+        self.layout("00:00:00")
+
+    def layout(self, text):
+        """Pick the largest scale at which text fits the window and center it"""
+        rows, cols = self.window.getmaxyx()
+        # Width in font columns: glyph widths plus one column between characters
+        units = sum(len(BIG_GLYPHS[char][0]) for char in text) + len(text) - 1
+        self.scale = max(1, min(cols // (units * 2), (rows - 2) // GLYPH_ROWS))
+        self.fits = units * 2 * self.scale < cols and GLYPH_ROWS * self.scale + 2 <= rows
+        self.top = max(0, (rows - GLYPH_ROWS * self.scale - 2) // 2)
+        self.left = max(0, (cols - units * 2 * self.scale) // 2)
+        self.label_row = min(rows - 1, self.top + GLYPH_ROWS * self.scale + 1)
+        self.text = None  # Everything needs drawing again
+
+    def cells(self, text):
+        """Yield (x, char) for each character of text"""
+        x = self.left
+        for char in text:
+            yield x, char
+            x += (len(BIG_GLYPHS[char][0]) + 1) * 2 * self.scale
+
+    def draw_char(self, x, char, attribute):
+        scale = self.scale
+        for row, line in enumerate(BIG_GLYPHS[char]):
+            pixels = "".join((self.block if pixel == "#" else " ") * 2 * scale for pixel in line)
+            for repeat in range(scale):
+                try:
+                    self.window.addstr(self.top + row * scale + repeat, x, pixels, attribute)
+                except curses.error:
+                    pass  # Writing the bottom-right cell raises after succeeding
+
+    def draw(self, text, attribute):
+        """Draw text, returning True if the screen was cleared and laid out again"""
+        if not self.fits:
+            # Too small for block digits; fall back to plain text, clearing what a longer one left
+            self.window.move(0, 0)
+            self.window.clrtoeol()
+            try:
+                self.window.addstr(0, 0, text, attribute | curses.A_BOLD)
+            except curses.error:
+                pass
+            self.text, self.attribute = text, attribute
+            return False
+        relaid = self.text is not None and len(text) != len(self.text)
+        if relaid:
+            self.window.erase()
+            self.layout(text)
+        redraw_all = self.text is None or attribute != self.attribute
+        for index, (x, char) in enumerate(self.cells(text)):
+            if redraw_all or self.text[index] != char:
+                self.draw_char(x, char, attribute)
+        self.text, self.attribute = text, attribute
+        return relaid
+
+    def draw_label(self, label):
+        rows, cols = self.window.getmaxyx()
+        row = self.label_row if self.fits else 1
+        if row >= rows:
+            return
+        self.window.move(row, 0)
+        self.window.clrtoeol()
+        label = label[:cols - 1]
+        try:
+            self.window.addstr(row, max(0, (cols - len(label)) // 2), label)
+        except curses.error:
+            pass
+
+
+def run(screen, engine, mode, schedule):
+    curses.curs_set(0)
+    if curses.has_colors():
+        curses.use_default_colors()
+        curses.init_pair(NORMAL_PAIR, curses.COLOR_WHITE, -1)
+        curses.init_pair(CAUTION_PAIR, curses.COLOR_YELLOW, -1)
+        curses.init_pair(WARNING_PAIR, curses.COLOR_RED, -1)
+    # Attribute for each (stage, blink); an ended countdown flashes in reverse video
+    attributes = {}
+    for stage, pair in ((STAGE_NORMAL, NORMAL_PAIR), (STAGE_CAUTION, CAUTION_PAIR),
+                        (STAGE_WARNING, WARNING_PAIR), (STAGE_ENDED, WARNING_PAIR)):
+        attributes[stage, False] = attributes[stage, True] = curses.color_pair(pair)
+    attributes[STAGE_ENDED, True] = curses.color_pair(WARNING_PAIR) | curses.A_REVERSE
+    digits = BigDigits(screen)
+    label = None
+
+    while True:
+        state = engine.state()
+        if state.ended and schedule is not None and start_mode(engine, mode, schedule):
+            continue  # Chained on to the next scheduled event
+        if digits.draw(state.text, attributes[state.stage, state.blink]):
+            label = None  # Erased with the old layout
+        current_label = "Timer Ended!" if state.ended else engine.label
+        if current_label != label:
+            label = current_label
+            digits.draw_label(label)
+        screen.refresh()
+
+        # Sleep until the next second boundary unless a key arrives first
+        ticking = engine.running or state.ended  # Ended countdowns keep flashing
+        screen.timeout(int(engine.until_next_tick() * 1000) + 2 if ticking else -1)
+        key = screen.getch()
+        if key in (ord("q"), ord("Q"), 27):
+            return
+        if key == curses.KEY_RESIZE:
+            screen.erase()
+            digits.layout(state.text)
+            label = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SANS Timer in the terminal")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--for", dest="duration", metavar="DURATION",
+                      help="count down for a duration: 45m, 1h30m, 90s or H:MM:SS (default: 30m)")
+    mode.add_argument("--until", metavar="HH:MM", help="count down to a time of day")
+    mode.add_argument("--schedule", metavar="FILE", help="follow a course schedule (JSON)")
+    add_engine_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        if args.schedule:
+            mode = ("schedule",)
+        elif args.until:
+            mode = parse_mode(["until", args.until])
+        else:
+            mode = ("for",) + parse_duration(args.duration or "30m")
+    except CommandError as e:
+        print(f"Error: {e}")
+        sys.exit(2)
+
+    schedule = None
+    if args.schedule:
+        from course_schedule import CourseSchedule, ScheduleError
+        try:
+            schedule = CourseSchedule.load(args.schedule)
+        except ScheduleError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    engine = engine_from_args(args)
+    if not start_mode(engine, mode, schedule):
+        print("No more scheduled events")
+        return
+
+    locale.setlocale(locale.LC_ALL, "")
+    try:
+        curses.wrapper(run, engine, mode, schedule)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
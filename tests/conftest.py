@@ -0,0 +1,33 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# The modules live at the top of the repository; the display tests run without a screen
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+
+class FakeClock:
+    """Clock for TimerEngine and DeadlineScheduler that only moves when told to"""
+
+    def __init__(self, start=datetime(2026, 3, 2, 9, 0, 0)):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(scope="session")
+def app():
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
@@ -0,0 +1,137 @@
+import json
+import queue
+import sys
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from action_hooks import HookRunner, HookError, load_hooks
+from timer_engine import TimerEngine
+
+
+@pytest.fixture
+def receiver():
+    """A localhost stand-in for a room controller; yields its URL and a queue of cues"""
+    cues = queue.Queue()
+
+    class CueHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            cues.put((self.path, json.loads(body), time.time()))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), CueHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", cues
+    server.shutdown()
+    server.server_close()
+
+
+def write_hooks(tmp_path, hooks):
+    path = tmp_path / "hooks.json"
+    path.write_text(json.dumps(hooks))
+    return load_hooks(str(path))
+
+
+def test_hooks_fire_at_their_deadlines(tmp_path, receiver):
+    url, cues = receiver
+    marker = tmp_path / "caution.txt"
+    write_env = "import os, sys; open(sys.argv[1], 'w').write(os.environ['SANS_TIMER_EVENT'] + ' ' + " \
+                "os.environ['SANS_TIMER_LABEL'])"
+    hooks = write_hooks(tmp_path, {
+        "caution": [{"command": [sys.executable, "-c", write_env, str(marker)]}],
+        "warning": [{"webhook": url + "/warning", "timeout": 2}],
+        "end": {"webhook": url + "/end"},
+    })
+    runner = HookRunner(hooks)
+    engine = TimerEngine(warning_seconds=2, caution_seconds=2.5)
+    runner.attach(engine)
+    try:
+        engine.start_for(seconds=3, label="Lab 1")
+        deadline = engine.end_time.timestamp()
+        received = [cues.get(timeout=5) for _ in range(2)]
+        assert [path for path, _, _ in received] == ["/warning", "/end"]
+        for path, cue, arrived in received:
+            assert cue["label"] == "Lab 1"
+            assert cue["overtime_minutes"] == 0
+            assert 0 <= arrived - cue["deadline"] < 0.5
+        assert received[1][1]["deadline"] == pytest.approx(deadline)
+        assert marker.read_text() == "caution Lab 1"
+        assert sorted(event for event, _ in runner.fired) == ["caution", "end", "warning"]
+    finally:
+        runner.stop()
+
+
+def test_stopping_the_countdown_cancels_its_hooks(tmp_path, receiver):
+    url, cues = receiver
+    runner = HookRunner(write_hooks(tmp_path, {"end": [{"webhook": url + "/end"}]}))
+    engine = TimerEngine()
+    runner.attach(engine)
+    try:
+        engine.start_for(seconds=1)
+        engine.stop()
+        with pytest.raises(queue.Empty):
+            cues.get(timeout=1.5)
+    finally:
+        runner.stop()
+
+
+class OverdueEngine:
+    """Just enough of a TimerEngine whose deadline passed almost a minute ago"""
+
+    def __init__(self, seconds_ago):
+        self.end_time = datetime.fromtimestamp(time.time() - seconds_ago)
+        self.label = "Lab 2"
+
+    def stage_times(self):
+        return []
+
+
+def test_overtime_fires_a_minute_past_the_deadline(tmp_path, receiver):
+    url, cues = receiver
+    runner = HookRunner(write_hooks(tmp_path, {"overtime": [{"webhook": url + "/overtime"}]}))
+    engine = OverdueEngine(59.7)
+    try:
+        runner.arm(engine)
+        path, cue, arrived = cues.get(timeout=5)
+        assert path == "/overtime"
+        assert cue["overtime_minutes"] == 1
+        assert cue["deadline"] == pytest.approx(engine.end_time.timestamp() + 60)
+        assert 0 <= arrived - cue["deadline"] < 0.5
+    finally:
+        runner.stop()
+
+
+def test_hung_command_does_not_hold_up_other_hooks(tmp_path, receiver):
+    url, cues = receiver
+    hang = {"command": [sys.executable, "-c", "import time; time.sleep(30)"], "timeout": 1}
+    runner = HookRunner(write_hooks(tmp_path, {"end": [hang, {"webhook": url + "/end"}]}), workers=2)
+    engine = TimerEngine()
+    runner.attach(engine)
+    try:
+        engine.start_for(seconds=1)
+        path, cue, arrived = cues.get(timeout=5)
+        assert path == "/end"
+        assert arrived - cue["deadline"] < 0.5
+        # The hung command is cut off at its timeout
+        give_up = time.monotonic() + 5
+        while runner.pending and time.monotonic() < give_up:
+            time.sleep(0.05)
+        assert runner.pending == 0
+    finally:
+        runner.stop()
+
+
+def test_invalid_hooks_are_rejected(tmp_path):
+    with pytest.raises(HookError):
+        write_hooks(tmp_path, {"halfway": [{"command": "true"}]})
+    with pytest.raises(HookError):
+        write_hooks(tmp_path, {"end": [{"webhook": "ftp://example.com/"}]})
@@ -0,0 +1,130 @@
+import http.client
+import json
+import socket
+import time
+
+import pytest
+
+from broadcast import BroadcastServer, POST_HEADER
+from control_api import send_http
+from timer_engine import TimerEngine
+
+
+@pytest.fixture
+def server():
+    server = BroadcastServer("127.0.0.1", 0)
+    server.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def commands(server):
+    received = []
+
+    def handle(body):
+        received.append(body)
+        return "200 OK", "text/plain; charset=utf-8", b"ok\n"
+    server.add_post_route("/control", handle)
+    return received
+
+
+def open_stream(server):
+    """Subscribe to /events and return the socket and a reader of its events"""
+    viewer = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+    viewer.sendall(b"GET /events HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n")
+    stream = viewer.makefile("rb")
+    while stream.readline() not in (b"\r\n", b""):
+        pass  # Response headers
+
+    def next_event():
+        while True:
+            line = stream.readline()
+            if line.startswith(b"data: "):
+                stream.readline()  # Blank line ending the event
+                return json.loads(line[6:])
+    return viewer, next_event
+
+
+def post(server, body, headers):
+    connection = http.client.HTTPConnection("127.0.0.1", server.port, timeout=5)
+    try:
+        connection.request("POST", "/control", body=body, headers=headers)
+        response = connection.getresponse()
+        return response.status, response.read().decode()
+    finally:
+        connection.close()
+
+
+def test_state_fans_out_to_every_viewer(server):
+    viewers = [open_stream(server) for _ in range(20)]
+    try:
+        for _, next_event in viewers:
+            assert next_event()["label"] == "Timer not started"
+        deadline = time.time() + 600
+        server.publish({"mode": "For 10m", "label": "Lab 1", "end_time": deadline, "running": True,
+                        "warning": False, "stage": "normal", "warning_seconds": 300,
+                        "caution_seconds": 600, "remaining": 600})
+        for _, next_event in viewers:
+            event = next_event()
+            assert (event["label"], event["end_time"], event["running"]) == ("Lab 1", deadline, True)
+            assert abs(event["server_time"] - time.time()) < 5
+        assert len(server.clients) == len(viewers)
+    finally:
+        for viewer, _ in viewers:
+            viewer.close()
+
+
+def test_control_client_is_accepted(server, commands):
+    assert send_http("reset", f"127.0.0.1:{server.port}") == "ok"
+    assert commands == [b"reset"]
+
+
+def test_post_from_same_origin_is_accepted(server, commands):
+    origin = f"http://127.0.0.1:{server.port}"
+    status, _ = post(server, b"stop", {POST_HEADER: "1", "Origin": origin})
+    assert status == 200
+    assert commands == [b"stop"]
+
+
+def test_cross_origin_post_is_refused(server, commands):
+    # What a page on another site can send without a preflight
+    status, reply = post(server, b"reset", {"Origin": "http://attacker.example",
+                                            "Content-Type": "text/plain"})
+    assert status == 403
+    assert reply.startswith("error")
+    status, _ = post(server, b"reset", {POST_HEADER: "1", "Origin": "null"})
+    assert status == 403
+    assert commands == []
+
+
+def test_post_without_header_is_refused(server, commands):
+    status, reply = post(server, b"reset", {"Content-Type": "text/plain"})
+    assert status == 403
+    assert POST_HEADER in reply
+    assert commands == []
+
+
+@pytest.mark.parametrize("path", ["/", "/state", "/events", "/missing"])
+def test_head_answers_without_a_body(server, path):
+    viewer = socket.create_connection(("127.0.0.1", server.port), timeout=5)
+    try:
+        viewer.sendall(f"HEAD {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode())
+        response = b""
+        while chunk := viewer.recv(4096):
+            response += chunk
+        headers, _, body = response.partition(b"\r\n\r\n")
+        assert headers.startswith(b"HTTP/1.1 ") and body == b""
+    finally:
+        viewer.close()
+
+
+def test_engine_snapshot_carries_overtime(clock):
+    engine = TimerEngine(clock, overtime=True)
+    engine.start_for(seconds=5)
+    clock.advance(7)
+    engine.state()
+    snapshot = engine.snapshot()
+    assert (snapshot["overtime"], snapshot["overdue"], snapshot["running"]) == (True, True, False)
+    engine.stop()
+    assert engine.snapshot()["overdue"] is False
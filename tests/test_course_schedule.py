@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from course_schedule import CourseSchedule, ScheduleError
+
+
+def load(tmp_path, contents):
+    path = tmp_path / "schedule.json"
+    path.write_text(json.dumps(contents))
+    return CourseSchedule.load(str(path))
+
+
+@pytest.mark.parametrize("contents", [[1, 2], "events", {"events": [1, 2]}, {"events": {"name": "Lab"}},
+                                      {"events": [{"name": "Lab", "time": "9:00"}]}])
+def test_malformed_schedules_raise_schedule_error(tmp_path, contents):
+    with pytest.raises(ScheduleError):
+        load(tmp_path, contents)
+
+
+def test_bounded_rules_run_past_the_horizon(tmp_path):
+    schedule = load(tmp_path, {"start": "2026-01-05", "horizon_days": 30, "events": [
+        {"name": "Weekly review", "time": "09:00", "rrule": "FREQ=WEEKLY;COUNT=10"},
+        {"name": "Monthly lab", "time": "13:00", "rrule": "FREQ=MONTHLY;UNTIL=20260605T235959"},
+        {"name": "Stand-up", "time": "08:30", "rrule": "FREQ=DAILY"},
+    ]})
+    names = [name for _, name in schedule.events()]
+    assert names.count("Weekly review") == 10
+    assert names.count("Monthly lab") == 6
+    # Unbounded rules still stop at the horizon
+    assert names.count("Stand-up") == 31  # Both ends included
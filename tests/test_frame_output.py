@@ -0,0 +1,71 @@
+import pytest
+
+from PyQt5.QtGui import QColor, QFont, QImage
+
+from frame_output import (SharedFrameOutput, FrameReader, MAGIC, VERSION, HEADER_SIZE,
+                          FORMAT_ARGB32_PREMULTIPLIED)
+from timer_engine import STAGE_NORMAL, STAGE_CAUTION, STAGE_WARNING
+
+
+@pytest.fixture
+def output(app, tmp_path):
+    output = SharedFrameOutput(str(tmp_path / "frame"), QFont('Arial', 24, QFont.Bold))
+    output.set_colors(QColor(255, 255, 255), QColor(255, 0, 0), QColor(0, 0, 0), QColor(255, 191, 0))
+    yield output
+    output.close()
+
+
+def frame_bytes(output):
+    """Return the pixels the output should have shared"""
+    image = output.frame.pixmap.toImage().convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    return image.constBits().asstring(image.sizeInBytes())
+
+
+def test_reader_sees_the_rendered_frame(output):
+    output.update_display("00:45:00", stage=STAGE_NORMAL)
+    reader = FrameReader(output.path)
+    try:
+        header, pixels = reader.read()
+        size = output.frame.pixmap.size()
+        assert header["magic"] == MAGIC
+        assert header["version"] == VERSION
+        assert header["header_size"] == HEADER_SIZE == 64
+        assert header["format"] == FORMAT_ARGB32_PREMULTIPLIED
+        assert header["sequence"] % 2 == 0
+        assert header["sequence"] == 2 * output.frames
+        assert (header["width"], header["height"]) == (size.width(), size.height())
+        assert header["stride"] == header["width"] * 4
+        assert header["capacity"] >= header["stride"] * header["height"]
+        assert pixels == frame_bytes(output)
+
+        # A changed digit and a new stage are new complete frames
+        output.update_display("00:44:59", stage=STAGE_WARNING)
+        changed, pixels = reader.read()
+        assert changed["sequence"] > header["sequence"]
+        assert changed["sequence"] % 2 == 0
+        assert pixels == frame_bytes(output)
+    finally:
+        reader.close()
+
+
+def test_caution_stage_uses_the_caution_color(output):
+    # The first set_colors already carries the display's caution color
+    assert output.stage_styles[STAGE_CAUTION, False][0] == QColor(255, 191, 0)
+    output.update_display("00:09:59", stage=STAGE_CAUTION)
+    assert output.style_key == (STAGE_CAUTION, False)
+
+
+def test_reader_remaps_when_the_frame_outgrows_the_file(output):
+    output.update_display("00:45:00")
+    reader = FrameReader(output.path)
+    try:
+        header, _ = reader.read()
+        output.frame.setFont(QFont('Arial', 96, QFont.Bold))
+        grown, pixels = reader.read()
+        assert grown["capacity"] > header["capacity"]
+        assert grown["width"] > header["width"] and grown["height"] > header["height"]
+        assert grown["stride"] * grown["height"] > header["capacity"]
+        assert len(pixels) == grown["stride"] * grown["height"]
+        assert pixels == frame_bytes(output)
+    finally:
+        reader.close()
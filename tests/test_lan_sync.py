@@ -0,0 +1,63 @@
+import json
+import queue
+import socket
+import time
+
+from lan_sync import SyncLeader, SyncFollower
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_follower_tracks_leader_on_loopback():
+    leader = SyncLeader("127.0.0.1", 0)
+    leader.start()
+    states = queue.Queue()
+    follower = SyncFollower("127.0.0.1", leader.port, on_state=states.put)
+    follower.start()
+    try:
+        end_time = time.time() + 300
+        assert wait_for(lambda: leader.followers)
+        leader.publish({"running": True, "end_time": end_time, "remaining": 300})
+        state = states.get(timeout=5)
+        # Both ends share a clock, so the translated deadline barely moves
+        assert state["running"] is True
+        assert abs(state["end_time"] - end_time) < 0.05
+        assert follower.seq == leader.seq
+        assert abs(follower.offset) < 0.05
+    finally:
+        follower.stop()
+        leader.stop()
+
+
+def test_state_pushed_before_first_offset_is_applied():
+    # A hand-driven leader pushes its state before answering the first ping
+    leader = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    leader.bind(("127.0.0.1", 0))
+    leader.settimeout(5)
+    states = queue.Queue()
+    follower = SyncFollower("127.0.0.1", leader.getsockname()[1], on_state=states.put)
+    follower.start()
+    try:
+        data, address = leader.recvfrom(4096)
+        t1 = time.time()
+        ping = json.loads(data)
+        end_time = time.time() + 60
+        state = {"running": True, "end_time": end_time, "remaining": 60}
+        leader.sendto(json.dumps({"type": "state", "seq": 1, "state": state}).encode(), address)
+        assert wait_for(lambda: follower.state is not None)
+        assert follower.offset is None
+        assert states.empty()
+        reply = {"type": "sync", "t0": ping["t0"], "t1": t1, "t2": time.time(), "seq": 1}
+        leader.sendto(json.dumps(reply).encode(), address)
+        applied = states.get(timeout=5)
+        assert abs(applied["end_time"] - end_time) < 0.05
+    finally:
+        follower.stop()
+        leader.close()
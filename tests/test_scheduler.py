@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+import pytest
+
+from sans_timer import DeadlineScheduler
+from timer_engine import TimerEngine
+
+
+@pytest.fixture
+def scheduler(app, clock):
+    scheduler = DeadlineScheduler(clock)
+    scheduler.ticks = []
+    scheduler.ticked.connect(lambda name, lateness: scheduler.ticks.append(name))
+    yield scheduler
+    scheduler._timer.stop()
+
+
+def engine_until(clock, seconds, **kwargs):
+    engine = TimerEngine(clock, **kwargs)
+    engine.start_at(clock.now + timedelta(seconds=seconds), "Lab")
+    return engine
+
+
+def fire(scheduler, clock, late_ms=DeadlineScheduler.MARGIN_MS):
+    """Move the clock to just past the armed boundary and deliver the timer"""
+    clock.now = scheduler._target + timedelta(milliseconds=late_ms)
+    scheduler._on_timeout()
+    ticks, scheduler.ticks = scheduler.ticks, []
+    return ticks
+
+
+def test_ticks_on_each_second_boundary(scheduler, clock):
+    start = clock.now
+    scheduler.add("main", engine_until(clock, 600.25))
+    assert scheduler._target == start + timedelta(seconds=0.25)
+    assert fire(scheduler, clock) == ["main"]
+    assert scheduler._target == start + timedelta(seconds=1.25)
+    assert fire(scheduler, clock) == ["main"]
+    assert scheduler.wakeups == 2
+
+
+def test_late_delivery_is_subtracted_from_the_next_delay(scheduler, clock):
+    scheduler.add("main", engine_until(clock, 600))
+    fire(scheduler, clock)
+    on_time = scheduler._timer.interval()
+    fire(scheduler, clock, late_ms=12)
+    assert scheduler._latency_ms > 0
+    assert scheduler._timer.interval() < on_time
+
+
+def test_early_delivery_waits_out_the_rest(scheduler, clock):
+    scheduler.add("main", engine_until(clock, 600))
+    target = scheduler._target
+    clock.now = target - timedelta(milliseconds=3)
+    scheduler._on_timeout()
+    assert scheduler.ticks == [] and scheduler.wakeups == 0
+    assert scheduler._target == target and scheduler._timer.isActive()
+
+
+def test_close_boundaries_share_a_wakeup(scheduler, clock):
+    # Boundaries at 10 and 15 ms past each second, and at half past
+    scheduler.add("a", engine_until(clock, 600.010))
+    scheduler.add("b", engine_until(clock, 600.015))
+    scheduler.add("c", engine_until(clock, 600.5))
+    # The batch armed when "a" was added stays as it is; from then on they share wakeups
+    assert fire(scheduler, clock) == ["a"]
+    assert fire(scheduler, clock) == ["b"]
+    assert fire(scheduler, clock) == ["c"]
+    assert sorted(fire(scheduler, clock)) == ["a", "b"]
+    assert fire(scheduler, clock) == ["c"]
+    assert scheduler.wakeups == 5
+
+
+def test_boundaries_that_fell_due_meanwhile_are_served_too(scheduler, clock):
+    scheduler.add("a", engine_until(clock, 600.05))
+    scheduler.add("b", engine_until(clock, 600.1))
+    # The event loop was blocked past both boundaries
+    assert sorted(fire(scheduler, clock, late_ms=150)) == ["a", "b"]
+    assert scheduler.wakeups == 1
+
+
+def test_removed_timer_stops_ticking(scheduler, clock):
+    scheduler.add("a", engine_until(clock, 600))
+    scheduler.add("b", engine_until(clock, 600.005))
+    scheduler.remove("b")
+    assert fire(scheduler, clock) == ["a"]
+    scheduler.remove("a")
+    assert not scheduler.isActive()
+
+
+def test_precision_window_ticks_every_tenth(scheduler, clock):
+    start = clock.now
+    scheduler.add("main", engine_until(clock, 5, precision_seconds=10))
+    for tenth in range(1, 4):
+        assert scheduler._target == start + timedelta(seconds=tenth / 10)
+        assert fire(scheduler, clock) == ["main"]
+
+
+def test_hidden_countdown_only_wakes_at_stage_changes(scheduler, clock):
+    start = clock.now
+    engine = engine_until(clock, 3600, warning_seconds=300, caution_seconds=600)
+    scheduler.add("main", engine)
+    scheduler.set_visible(False)
+    assert scheduler._target == start + timedelta(seconds=3001)  # Caution shows at 00:09:59
+    assert fire(scheduler, clock) == ["main"]
+    assert scheduler._target == start + timedelta(seconds=3301)
+    fire(scheduler, clock)
+    assert scheduler._target == start + timedelta(seconds=3600)
+    fire(scheduler, clock)
+    # Ended: nothing to wake for until shown again
+    assert scheduler._target is None
+    scheduler.set_visible(True)
+    assert scheduler._target is not None
+
+
+def test_minutes_view_adds_a_wakeup_per_minute(scheduler, clock):
+    start = clock.now
+    scheduler.add("main", engine_until(clock, 3600))
+    scheduler.set_visible(False, minutes_visible=True)
+    assert scheduler._target == start + timedelta(seconds=1)  # 60:00 becomes 59:59
+    fire(scheduler, clock)
+    assert scheduler._target == start + timedelta(seconds=61)
+
+
+def test_showing_again_resumes_second_ticks(scheduler, clock):
+    start = clock.now
+    scheduler.add("main", engine_until(clock, 3600.5))
+    scheduler.set_visible(False)
+    scheduler.set_visible(True)
+    assert scheduler._target == start + timedelta(seconds=0.5)
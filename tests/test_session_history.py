@@ -0,0 +1,34 @@
+import sqlite3
+
+import pytest
+
+from session_history import SessionHistory, report
+from timer_engine import TimerEngine
+
+
+def test_report_over_logged_sessions(tmp_path, clock):
+    path = str(tmp_path / "history" / "sessions.db")
+    history = SessionHistory(path)
+    engine = TimerEngine(clock)
+    history.attach(engine)
+    engine.start_for(minutes=15, label="Lab 1")
+    clock.advance(60)
+    engine.stop()
+    engine.start_for(minutes=15, label="Lab 1")
+    history.flush()
+    history.close()
+
+    with open(path, "rb") as database:
+        before = database.read()
+    rows = report(path, column="label", now=clock.now.timestamp())
+    assert [(name, count) for name, count, *_ in rows] == [("Lab 1", 2)]
+    # The report only reads
+    with open(path, "rb") as database:
+        assert database.read() == before
+
+
+def test_report_does_not_create_a_missing_database(tmp_path):
+    path = tmp_path / "missing" / "sessions.db"
+    with pytest.raises(sqlite3.OperationalError):
+        report(str(path))
+    assert not (tmp_path / "missing").exists()
@@ -0,0 +1,246 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from timer_engine import TimerEngine, TimerQueue, STAGE_NORMAL, STAGE_CAUTION, STAGE_WARNING, STAGE_ENDED
+
+
+def recording_engine(clock, **kwargs):
+    engine = TimerEngine(clock, **kwargs)
+    events = []
+    engine.add_listener(lambda event, engine: events.append(event))
+    return engine, events
+
+
+def test_resume_only_adjusts_a_corrected_deadline(clock):
+    engine, events = recording_engine(clock)
+    leader = TimerEngine(clock)
+    leader.start_for(minutes=10)
+    state = leader.snapshot()
+    engine.resume(state)
+    assert events == ["start"]
+
+    # A follower's offset estimate moving by a few milliseconds is not a new countdown
+    for shift in (0.003, -0.004, 0.0):
+        engine.resume(dict(state, end_time=state["end_time"] + shift))
+        assert engine.end_time == datetime.fromtimestamp(state["end_time"] + shift)
+    assert events == ["start"]
+
+    # A different deadline is
+    engine.resume(dict(state, end_time=state["end_time"] + 60))
+    assert events == ["start", "start"]
+
+
+def test_resume_takes_the_leaders_thresholds(clock):
+    leader = TimerEngine(clock, warning_seconds=120, caution_seconds=240)
+    follower = TimerEngine(clock)
+    leader.start_for(minutes=10)
+    follower.resume(leader.snapshot())
+    assert (follower.warning_seconds, follower.caution_seconds) == (120, 240)
+    assert follower.stage_times() == leader.stage_times()
+    # A restart's saved_state() carries no thresholds and keeps the engine's own
+    follower.resume(dict(leader.saved_state(), end_time=leader.snapshot()["end_time"] + 30))
+    assert (follower.warning_seconds, follower.caution_seconds) == (120, 240)
+
+
+def test_adjusted_deadline_keeps_the_stage_and_notifies_later_changes(clock):
+    engine, events = recording_engine(clock, warning_seconds=60, caution_seconds=0)
+    engine.start_for(minutes=2)
+    clock.advance(61.5)
+    assert engine.state().stage == STAGE_WARNING
+    # Moving the deadline later never steps the stage back
+    engine.adjust_deadline(engine.end_time + timedelta(seconds=0.6))
+    assert engine.state().stage == STAGE_WARNING
+    assert events == ["start", "warning"]
+
+    engine.start_for(minutes=2)
+    clock.advance(60.9)
+    assert engine.state().stage == STAGE_NORMAL
+    engine.adjust_deadline(engine.end_time - timedelta(seconds=0.2))
+    assert events[-1] == "start"
+    # The earlier deadline brings the warning forward, announced by the next state()
+    assert engine.state().stage == STAGE_WARNING
+    assert events[-1] == "warning"
+
+
+@pytest.mark.parametrize("digits", [1, 2])
+def test_next_tick_is_exactly_when_the_text_changes(clock, digits):
+    engine = TimerEngine(clock, precision_seconds=2, precision_digits=digits, overtime=True)
+    engine.start_for(seconds=3)
+    # Walk forward in odd steps: the text must change exactly at each predicted boundary
+    previous = clock.now
+    text, boundary = engine.state(previous).text, None
+    for step in range(97, 5000000, 97):
+        now = clock.now + timedelta(microseconds=step)
+        if boundary is None:
+            boundary = previous + timedelta(seconds=engine.until_next_tick(previous))
+            assert boundary - previous >= timedelta(microseconds=1)
+        changed = engine.state(now).text != text
+        assert changed == (now >= boundary), (previous, now, boundary)
+        if changed:
+            text, boundary = engine.state(now).text, None
+        previous = now
+
+
+def test_seconds_round_up_to_reach_zero_at_the_deadline(clock):
+    engine, events = recording_engine(clock)
+    engine.start_for(seconds=10)
+    deadline = engine.end_time
+    assert engine.state().text == "00:00:10"
+    for elapsed, text in ((0.001, "00:00:10"), (0.999, "00:00:10"), (1.0, "00:00:09"),
+                          (9.0, "00:00:01"), (9.999999, "00:00:01")):
+        assert engine.state(clock.now + timedelta(seconds=elapsed)).text == text
+    state = engine.state(deadline)
+    assert (state.text, state.ended, state.stage) == ("00:00:00", True, STAGE_ENDED)
+    # Ten seconds starts inside the warning stage, so only the end is announced
+    assert events == ["start", "end"]
+    assert engine.overdue and not engine.running
+    # Stopping silences the ended countdown once
+    engine.stop()
+    engine.stop()
+    assert events[-1] == "stop" and events.count("stop") == 1
+
+
+def test_stage_times_follow_the_rounded_display(clock):
+    engine, events = recording_engine(clock, warning_seconds=300, caution_seconds=600)
+    engine.start_for(minutes=20)
+    end = engine.end_time
+    assert engine.stage_times() == [(end - timedelta(seconds=599), STAGE_CAUTION),
+                                    (end - timedelta(seconds=299), STAGE_WARNING),
+                                    (end, STAGE_ENDED)]
+    # The stage changes with the text: 00:10:00 is still normal, 00:09:59 caution
+    state = engine.state(end - timedelta(seconds=599.5))
+    assert (state.text, state.stage) == ("00:10:00", STAGE_NORMAL)
+    state = engine.state(end - timedelta(seconds=599))
+    assert (state.text, state.stage, state.is_warning) == ("00:09:59", STAGE_CAUTION, False)
+    assert engine.until_next_transition(end - timedelta(seconds=599)) == 300
+    state = engine.state(end - timedelta(seconds=299))
+    assert (state.text, state.stage, state.is_warning) == ("00:04:59", STAGE_WARNING, True)
+    assert events == ["start", "warning", "warning"]
+    engine.state(end)
+    assert engine.until_next_transition(end) is None
+
+
+def test_caution_below_warning_never_steps_back(clock):
+    engine, events = recording_engine(clock, warning_seconds=300, caution_seconds=60)
+    engine.start_for(minutes=10)
+    end = engine.end_time
+    assert engine.state(end - timedelta(seconds=299)).stage == STAGE_WARNING
+    assert engine.state(end - timedelta(seconds=59)).stage == STAGE_WARNING
+    assert events == ["start", "warning"]
+
+
+def test_zero_threshold_turns_its_stage_off(clock):
+    engine = TimerEngine(clock, warning_seconds=300, caution_seconds=0)
+    engine.start_for(minutes=10)
+    assert [stage for _, stage in engine.stage_times()] == [STAGE_WARNING, STAGE_ENDED]
+
+
+def test_starting_inside_a_stage_starts_in_it(clock):
+    engine = TimerEngine(clock, warning_seconds=300, caution_seconds=600)
+    engine.start_for(minutes=2)
+    assert engine.stage == STAGE_WARNING and engine.is_warning
+
+
+def test_precision_window_shows_fractions(clock):
+    engine = TimerEngine(clock, precision_seconds=10, precision_digits=1)
+    engine.start_for(seconds=20)
+    end = engine.end_time
+    for remaining, text, period in ((12.3, "00:00:13", 1.0), (10.0, "00:00:10.0", 0.1),
+                                    (9.95, "00:00:10.0", 0.1), (9.9, "00:00:09.9", 0.1),
+                                    (0.01, "00:00:00.1", 0.1)):
+        now = end - timedelta(seconds=remaining)
+        assert engine.state(now).text == text
+        assert engine.tick_period(now) == period
+    # Without overtime the fraction stays so the text does not change width
+    assert engine.state(end).text == "00:00:00.0"
+
+
+def test_hundredths(clock):
+    engine = TimerEngine(clock, precision_seconds=5, precision_digits=2)
+    engine.start_for(seconds=20)
+    now = engine.end_time - timedelta(seconds=1.234)
+    assert engine.state(now).text == "00:00:01.24"
+    assert engine.until_next_tick(now) == pytest.approx(0.004)
+
+
+def test_next_tick_waits_for_the_second_boundary(clock):
+    engine = TimerEngine(clock)
+    engine.start_for(seconds=90)
+    end = engine.end_time
+    assert engine.until_next_tick() == 1.0
+    assert engine.until_next_tick(end - timedelta(seconds=30.25)) == 0.25
+    # Past the deadline the boundaries keep the same phase
+    assert engine.until_next_tick(end + timedelta(seconds=2.75)) == 0.25
+    engine.reset()
+    assert engine.until_next_tick() == 1.0
+
+
+def test_minutes_view_wakes_when_its_text_changes(clock):
+    engine = TimerEngine(clock)
+    engine.start_for(minutes=45)
+    end = engine.end_time
+    # 45:00 shows 45 minutes; 44:59 shows 44
+    assert engine.until_minutes_change() == 1.0
+    assert engine.until_minutes_change(end - timedelta(seconds=2699.5)) == 0.5
+    assert engine.until_minutes_change(end - timedelta(seconds=2699)) == 60.0
+    # The final minute counts seconds
+    assert engine.until_minutes_change(end - timedelta(seconds=59.5)) == 0.5
+    # Ended without overtime: nothing changes any more
+    assert engine.until_minutes_change(end) is None
+    engine.overtime = True
+    assert engine.until_minutes_change(end + timedelta(seconds=30.25)) == 0.75
+    assert engine.until_minutes_change(end + timedelta(seconds=90.25)) == 29.75
+
+
+def test_overtime_counts_up_and_blinks(clock):
+    engine, events = recording_engine(clock, overtime=True)
+    engine.start_for(seconds=5)
+    end = engine.end_time
+    state = engine.state(end + timedelta(seconds=0.5))
+    assert (state.text, state.ended, state.blink) == ("00:00:00", True, False)
+    state = engine.state(end + timedelta(seconds=1.5))
+    assert (state.text, state.blink) == ("-00:00:01", True)
+    state = engine.state(end + timedelta(seconds=62))
+    assert (state.text, state.blink) == ("-00:01:02", False)
+    assert events.count("end") == 1
+
+
+def test_without_overtime_the_display_holds_at_zero(clock):
+    engine = TimerEngine(clock)
+    engine.start_for(seconds=5)
+    state = engine.state(engine.end_time + timedelta(seconds=3.5))
+    assert (state.text, state.blink) == ("00:00:00", True)
+
+
+def test_start_until_a_passed_time_counts_to_tomorrow(clock):
+    engine = TimerEngine(clock)
+    engine.start_until(8, 30)
+    assert engine.end_time == datetime(2026, 3, 3, 8, 30)
+    engine.start_until(13, 30)
+    assert engine.end_time == datetime(2026, 3, 2, 13, 30)
+    assert engine.state().text == "04:30:00"
+
+
+def test_timer_queue_replaces_and_cancels_entries(clock):
+    queue = TimerQueue()
+    now = clock.now
+    queue.schedule("a", now + timedelta(seconds=3))
+    queue.schedule("b", now + timedelta(seconds=1))
+    queue.schedule("a", now + timedelta(seconds=2))  # Replaces the first entry
+    queue.schedule("c", now + timedelta(seconds=1.01))
+    queue.cancel("c")
+    assert len(queue) == 2 and "c" not in queue
+    assert queue.peek() == now + timedelta(seconds=1)
+    assert queue.take_batch(timedelta(milliseconds=15)) == [(now + timedelta(seconds=1), "b")]
+    assert queue.take_until(now + timedelta(seconds=5)) == [(now + timedelta(seconds=2), "a")]
+    assert queue.peek() is None and len(queue) == 0
+
+
+def test_timer_queue_batches_close_deadlines(clock):
+    queue = TimerQueue()
+    now = clock.now
+    for name, offset in (("a", 1.0), ("b", 1.005), ("c", 1.014), ("d", 1.02)):
+        queue.schedule(name, now + timedelta(seconds=offset))
+    assert [name for _, name in queue.take_batch(timedelta(milliseconds=15))] == ["a", "b", "c"]
+    assert [name for _, name in queue.take_batch(timedelta(milliseconds=15))] == ["d"]
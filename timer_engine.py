@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Timer logic for SANS Timer, independent of any user interface
+
+Nothing in this module imports Qt, so the countdown can be driven from tests,
+benchmarks and non-GUI front ends. Time comes from an injectable clock, a
+callable returning a naive local datetime (datetime.now by default).
+"""
+
+import heapq
+import itertools
+import math
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+
+# Remaining time below which the display switches to the caution and warning colors
+CAUTION_SECONDS = 600
+WARNING_SECONDS = 300
+
+# Moves of a running countdown's deadline below this are clock corrections, not a new countdown
+DEADLINE_CORRECTION = 1.0
+
+# Stages a countdown passes through, in order; ended covers the overtime too
+STAGE_NORMAL, STAGE_CAUTION, STAGE_WARNING, STAGE_ENDED = range(4)
+STAGE_NAMES = ("normal", "caution", "warning", "ended")
+
+# "Time until" presets as (hour, minute) and fixed countdowns in minutes
+PRESET_TIMES = ((8, 30), (9, 0), (10, 50), (13, 30), (15, 20))
+PRESET_DURATIONS = (20, 30, 45)
+DEFAULT_DURATION = 30  # Preset selected at startup
+
+# Snapshot of what the views should show; blink alternates every second once ended
+TimerState = namedtuple('TimerState', ['text', 'is_warning', 'ended', 'remaining', 'stage', 'blink'])
+
+IDLE_STATE = TimerState("00:00:00", False, False, 0.0, STAGE_NORMAL, False)
+
+
+def stage_colors(normal, caution, warning, background):
+    """Map each (stage, blink) of a countdown to its (text, background) colors"""
+    colors = {}
+    for stage, color in ((STAGE_NORMAL, normal), (STAGE_CAUTION, caution),
+                         (STAGE_WARNING, warning), (STAGE_ENDED, warning)):
+        colors[stage, False] = colors[stage, True] = (color, background)
+    # An ended countdown flashes between the warning color and its inverse
+    colors[STAGE_ENDED, True] = (background, warning)
+    return colors
+
+
+def format_time(total_seconds):
+    """Format a whole number of seconds as HH:MM:SS"""
+    hours, remainder = divmod(int(total_seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def format_clock(hour, minute):
+    """Format a time of day as e.g. 8:30 AM or 1:30 PM"""
+    suffix = "AM" if hour < 12 else "PM"
+    return f"{(hour - 1) % 12 + 1}:{minute:02d} {suffix}"
+
+
+def describe_duration(hours, minutes, seconds):
+    """Describe a duration as e.g. "1 hour 5 minutes" """
+    time_parts = []
+    if hours > 0:
+        time_parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
+    if minutes > 0:
+        time_parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
+    if seconds > 0:
+        time_parts.append(f"{seconds} second{'s' if seconds > 1 else ''}")
+    return " ".join(time_parts)
+
+
+class TimerEngine:
+    """Owns the deadline, mode and stage thresholds of one countdown
+
+    The moment each stage starts is worked out once when the countdown starts,
+    so every tick only compares the time against the next transition. A
+    threshold of 0 turns its stage off. With overtime the display counts up
+    past the deadline (-00:00:01, ...) instead of holding at 00:00:00.
+
+    With precision_seconds the last part of the countdown shows tenths
+    (precision_digits=1) or hundredths (2) of a second, and the ticks speed up
+    to match only inside that window.
+    """
+
+    def __init__(self, clock=None, warning_seconds=WARNING_SECONDS, caution_seconds=CAUTION_SECONDS,
+                 overtime=False, precision_seconds=0, precision_digits=1):
+        self.clock = clock or datetime.now
+        self.warning_seconds = warning_seconds
+        self.caution_seconds = caution_seconds
+        self.overtime = overtime
+        self.precision_seconds = precision_seconds
+        self.precision_digits = precision_digits
+        self.end_time = None
+        self.mode = "Not started"
+        self.label = "Timer not started"
+        self.running = False
+        self.overdue = False  # Past the deadline and not yet stopped, reset or restarted
+        self.is_warning = False
+        self.stage = STAGE_NORMAL
+        # (time, stage) of every stage change of the current countdown, and the next one due
+        self._transitions = []
+        self._next_transition = 0
+        # Callables invoked as listener(event, engine) on state changes
+        self.listeners = []
+        # The formatted text only changes once a tick, so remember the last one
+        self._cached_key = None
+        self._cached_text = None
+
+    def sibling(self):
+        """Return an idle engine with the same clock, thresholds, overtime and precision settings"""
+        return TimerEngine(self.clock, self.warning_seconds, self.caution_seconds, self.overtime,
+                           self.precision_seconds, self.precision_digits)
+
+    def add_listener(self, listener):
+        """Call listener(event, engine) on start, stop, reset, end and stage changes ("warning")"""
+        self.listeners.append(listener)
+
+    def _notify(self, event):
+        for listener in self.listeners:
+            try:
+                listener(event, self)
+            except Exception as e:
+                print(f"Error in timer listener: {e}")
+
+    def start_until(self, hour, minute, label=None):
+        """Count down to the next occurrence of the given time of day"""
+        now = self.clock()
+        target_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if target_time < now:
+            # If the time has already passed today, use tomorrow
+            target_time = target_time + timedelta(days=1)
+        time_str = label or format_clock(hour, minute)
+        self._start(target_time, f"Until {time_str}", f"Timer until {time_str}")
+
+    def start_at(self, end_time, label):
+        """Count down to an absolute deadline, e.g. the next event of a course schedule"""
+        self._start(end_time, f"Until {label}", f"Timer until {label}")
+
+    def start_for(self, hours=0, minutes=0, seconds=0, label=None):
+        """Count down for a fixed duration"""
+        if hours == 0 and minutes == 0 and seconds == 0:
+            # Default to 1 minute if no time is specified
+            minutes = 1
+            label = label or "1 Minute Timer"
+        label = label or f"{describe_duration(hours, minutes, seconds)} Timer"
+        end_time = self.clock() + timedelta(hours=hours, minutes=minutes, seconds=seconds)
+        self._start(end_time, label, label)
+
+    def _start(self, end_time, mode, label):
+        self.end_time = end_time
+        self.mode = mode
+        self.label = label
+        self.running = True
+        self.overdue = False
+        self._plan_transitions()
+        self._advance(self.clock())
+        self.is_warning = self.stage >= STAGE_WARNING
+        self._notify("start")
+
+    def _plan_transitions(self):
+        """Work out when each stage of the new countdown starts"""
+        transitions = []
+        for stage, seconds in ((STAGE_CAUTION, self.caution_seconds),
+                               (STAGE_WARNING, self.warning_seconds)):
+            if seconds > 0:
+                # A stage shows once the rounded-up seconds drop below its threshold
+                transitions.append((self.end_time - timedelta(seconds=seconds - 1), stage))
+        transitions.append((self.end_time, STAGE_ENDED))
+        transitions.sort()
+        self._transitions = transitions
+        self._next_transition = 0
+        self.stage = STAGE_NORMAL
+
+    def stage_times(self):
+        """Return (time, stage) for every stage change of the current countdown"""
+        return list(self._transitions)
+
+    def _advance(self, now):
+        """Move to the stage due at now; usually a single comparison"""
+        transitions = self._transitions
+        while self._next_transition < len(transitions) and now >= transitions[self._next_transition][0]:
+            # Never step back, even if the caution threshold is below the warning one
+            self.stage = max(self.stage, transitions[self._next_transition][1])
+            self._next_transition += 1
+
+    def stop(self):
+        """Stop the countdown (or silence an ended one), keeping the deadline and mode"""
+        if self.running or self.overdue:
+            self.running = False
+            self.overdue = False
+            self._notify("stop")
+
+    def reset(self):
+        """Clear the countdown"""
+        self.end_time = None
+        self.mode = "Not started"
+        self.label = "Timer not started"
+        self.running = False
+        self.overdue = False
+        self.is_warning = False
+        self.stage = STAGE_NORMAL
+        self._transitions = []
+        self._next_transition = 0
+        self._notify("reset")
+
+    def remaining(self, now=None):
+        """Return the seconds left until the deadline (negative once passed)"""
+        if self.end_time is None:
+            return 0.0
+        if now is None:
+            now = self.clock()
+        return (self.end_time - now).total_seconds()
+
+    def state(self, now=None):
+        """Return the text and flags the views should show at the given time"""
+        if self.end_time is None:
+            return IDLE_STATE
+        if now is None:
+            now = self.clock()
+        remaining = self.remaining(now)
+        previous_stage = self.stage
+        self._advance(now)
+        if self.stage == STAGE_ENDED:
+            if self.running:
+                self.running = False
+                self.overdue = True
+                self.is_warning = True
+                self._notify("end")
+            overtime = int(-remaining)
+            if self.overtime:
+                text = self._text(-overtime)
+            else:
+                # Keep the fraction so the display does not change width at the deadline
+                text = self._text(0, 0 if self.precision_seconds > 0 else None)
+            return TimerState(text, True, True, remaining, STAGE_ENDED, overtime % 2 == 1)
+
+        if remaining <= self.precision_seconds:
+            # Whole microseconds, so the fraction boundaries never drift
+            units = 10 ** self.precision_digits
+            step = 1000000 // units
+            total = -(-((self.end_time - now) // timedelta(microseconds=1)) // step)
+            text = self._text(total // units, total % units)
+        else:
+            # Round up so the display reaches 00:00:00 exactly at the deadline
+            text = self._text(math.ceil(remaining))
+        if self.stage != previous_stage:
+            self.is_warning = self.stage >= STAGE_WARNING
+            self._notify("warning")
+        return TimerState(text, self.is_warning, False, remaining, self.stage, False)
+
+    def _text(self, total_seconds, fraction=None):
+        """Format whole seconds (negative for overtime) plus an optional fraction"""
+        key = (total_seconds, fraction)
+        if key != self._cached_key:
+            self._cached_key = key
+            if total_seconds < 0:
+                text = "-" + format_time(-total_seconds)
+            else:
+                text = format_time(total_seconds)
+            if fraction is not None:
+                text += f".{fraction:0{self.precision_digits}d}"
+            self._cached_text = text
+        return self._cached_text
+
+    def snapshot(self):
+        """Return the current state as plain data for publishing to other processes"""
+        return {
+            "mode": self.mode,
+            "label": self.label,
+            # Absolute deadline, so receivers can count down by themselves
+            "end_time": self.end_time.timestamp() if self.end_time else None,
+            "running": self.running,
+            "warning": self.is_warning,
+            "stage": STAGE_NAMES[self.stage],
+            "warning_seconds": self.warning_seconds,
+            "caution_seconds": self.caution_seconds,
+            # Past the deadline; with overtime, receivers count up like the display
+            "overdue": self.overdue,
+            "overtime": self.overtime,
+            # Whole seconds left, so stopped countdowns can show where they stopped
+            "remaining": max(0, math.ceil(self.remaining())),
+        }
+
+    def saved_state(self):
+        """Return what is needed to resume the countdown after a restart"""
+        return {
+            "end_time": self.end_time.timestamp() if self.end_time else None,
+            "mode": self.mode,
+            "label": self.label,
+            "running": self.running,
+        }
+
+    def resume(self, saved):
+        """Resume a countdown from saved_state() against its absolute deadline
+
+        Returns True if a running countdown was restored. Stage thresholds in
+        saved (as in a sync leader's snapshot()) replace this engine's. If the
+        same countdown is already running and its deadline only moves by less
+        than DEADLINE_CORRECTION (e.g. a sync follower's clock offset estimate
+        improving), the deadline is adjusted without notifying listeners.
+        """
+        if not saved.get("running") or saved.get("end_time") is None:
+            return False
+        try:
+            end_time = datetime.fromtimestamp(saved["end_time"])
+            thresholds = (float(saved.get("warning_seconds", self.warning_seconds)),
+                          float(saved.get("caution_seconds", self.caution_seconds)))
+        except (TypeError, ValueError, OverflowError, OSError):
+            return False
+        same_thresholds = thresholds == (self.warning_seconds, self.caution_seconds)
+        self.warning_seconds, self.caution_seconds = thresholds
+        mode, label = str(saved.get("mode", "")), str(saved.get("label", ""))
+        if self.running and same_thresholds and (mode, label) == (self.mode, self.label) and \
+                abs((end_time - self.end_time).total_seconds()) < DEADLINE_CORRECTION:
+            self.adjust_deadline(end_time)
+        else:
+            self._start(end_time, mode, label)
+        return True
+
+    def adjust_deadline(self, end_time):
+        """Move the running countdown's deadline without notifying listeners
+
+        The stage never steps back; the next state() moves on to any stage the
+        new deadline makes due and notifies as usual.
+        """
+        if end_time == self.end_time:
+            return
+        stage = self.stage
+        self.end_time = end_time
+        self._plan_transitions()
+        self.stage = stage
+
+    def tick_period(self, now=None):
+        """Return the seconds between display changes at the given time"""
+        remaining = self.remaining(now)
+        if 0 < remaining <= self.precision_seconds:
+            return 1.0 / 10 ** self.precision_digits
+        return 1.0
+
+    def until_next_tick(self, now=None):
+        """Return the seconds until the displayed value next changes"""
+        if now is None:
+            now = self.clock()
+        period = round(self.tick_period(now) * 1000000)
+        # Past the deadline the boundaries continue at the same phase; whole microseconds so
+        # landing exactly on a boundary waits a full period instead of a rounding error
+        return (self._remaining_us(now) % period or period) / 1000000
+
+    def until_minutes_change(self, now=None):
+        """Return the seconds until a minutes-only view of the countdown next changes
+
+        Such a view (e.g. a tray icon) shows whole minutes, and seconds during
+        the final minute and the first minute of overtime. Returns None once
+        ended, unless counting overtime.
+        """
+        if now is None:
+            now = self.clock()
+        remaining = self._remaining_us(now)
+        if remaining <= 0 and not self.overtime:
+            return None
+        second, minute = 1000000, 60000000
+        if remaining > minute:
+            # Seconds are rounded up, so the minutes drop when 60k - 1 seconds are left
+            return ((remaining + second) % minute or minute) / second
+        if remaining <= -minute:
+            return (remaining % minute or minute) / second
+        return (remaining % second or second) / second
+
+    def _remaining_us(self, now):
+        """Return the whole microseconds left until the deadline (negative once passed)"""
+        if self.end_time is None:
+            return 0
+        return (self.end_time - now) // timedelta(microseconds=1)
+
+    def until_next_transition(self, now=None):
+        """Return the seconds until the next stage starts, or None once ended"""
+        if now is None:
+            now = self.clock()
+        for at, stage in self._transitions[self._next_transition:]:
+            if at > now:
+                return (at - now).total_seconds()
+        return None
+
+
+def add_engine_arguments(parser):
+    """Add the options for stages, overtime and the sub-second final countdown to parser"""
+    parser.add_argument("--caution-minutes", type=float, default=CAUTION_SECONDS / 60, metavar="MINUTES",
+                        help="show the caution color below this much time; 0 turns it off "
+                             "(default: %(default)g)")
+    parser.add_argument("--warning-minutes", type=float, default=WARNING_SECONDS / 60, metavar="MINUTES",
+                        help="show the warning color below this much time (default: %(default)g)")
+    parser.add_argument("--overtime", action="store_true",
+                        help="count up past the deadline instead of holding at 00:00:00")
+    parser.add_argument("--precision", type=float, default=0, metavar="SECONDS",
+                        help="show fractions of a second during the last SECONDS, e.g. 30")
+    parser.add_argument("--precision-digits", type=int, choices=(1, 2), default=1,
+                        help="1 for tenths, 2 for hundredths of a second (default: 1)")
+
+
+def engine_from_args(args, clock=None):
+    """Return a TimerEngine configured from the options of add_engine_arguments"""
+    return TimerEngine(clock, warning_seconds=round(args.warning_minutes * 60),
+                       caution_seconds=round(args.caution_minutes * 60), overtime=args.overtime,
+                       precision_seconds=max(0.0, args.precision),
+                       precision_digits=args.precision_digits)
+
+
+class TimerQueue:
+    """Priority queue holding the next due time of each named timer
+
+    Rescheduling or cancelling a timer leaves its old heap entry in place; stale
+    entries are recognised by their sequence number and skipped when reached.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}  # name -> sequence number of its current entry
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, name):
+        return name in self._live
+
+    def schedule(self, name, due):
+        """Set (or replace) the time at which the named timer is next due"""
+        sequence = next(self._counter)
+        self._live[name] = sequence
+        heapq.heappush(self._heap, (due, sequence, name))
+
+    def cancel(self, name):
+        """Forget the named timer's pending due time"""
+        self._live.pop(name, None)
+
+    def _discard_stale(self):
+        heap = self._heap
+        while heap and self._live.get(heap[0][2]) != heap[0][1]:
+            heapq.heappop(heap)
+
+    def peek(self):
+        """Return the earliest due time, or None if nothing is scheduled"""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def take_until(self, limit):
+        """Remove and return (due, name) for every timer due at or before limit"""
+        batch = []
+        heap = self._heap
+        while True:
+            self._discard_stale()
+            if not heap or heap[0][0] > limit:
+                return batch
+            due, _, name = heapq.heappop(heap)
+            del self._live[name]
+            batch.append((due, name))
+
+    def take_batch(self, window):
+        """Remove and return the earliest due timer plus any due within window of it
+
+        Handling these together means one wakeup serves timers whose second
+        boundaries fall within a few milliseconds of each other.
+        """
+        first = self.peek()
+        if first is None:
+            return []
+        return self.take_until(first + window)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+System tray icon showing the time left on the SANS Timer countdown
+
+The icon shows the minutes left, or the seconds during the final minute, in
+the colors of the countdown's stage. It is also used as the control panel's
+window (and taskbar) icon. Icons come from an in-process LRU cache keyed by
+text, colors and size, so each distinct icon is drawn once; a whole countdown
+needs about a hundred of them. While both windows are hidden the scheduler
+only wakes when the icon's text or stage changes.
+"""
+
+from functools import lru_cache
+
+from PyQt5.QtWidgets import QSystemTrayIcon, QMenu, QAction
+from PyQt5.QtCore import Qt, QObject, QRect
+from PyQt5.QtGui import QColor, QFont, QIcon, QPainter, QPixmap
+
+from timer_engine import STAGE_NORMAL, STAGE_CAUTION, STAGE_WARNING
+
+
+# Pixels per side of the rendered icons; platforms scale them to fit
+ICON_SIZE = 64
+
+# A countdown uses about 60 seconds plus its minutes per stage; keep a few countdowns' worth
+ICON_CACHE_SIZE = 512
+
+
+def icon_text(time_str):
+    """Return the minutes left in a H:MM:SS countdown, or the seconds in its final minute
+
+    Overtime ("-H:MM:SS") is shown the same way with a minus sign; 100 minutes
+    or more are shown as whole hours ("2h").
+    """
+    sign = "-" if time_str.startswith("-") else ""
+    hours, minutes, seconds = time_str.lstrip("-").split(":")
+    # The seconds may carry a fraction in the sub-second final countdown
+    total = int(hours) * 3600 + int(minutes) * 60 + int(seconds.split(".")[0])
+    if total < 60:
+        return f"{sign}{total}"
+    if total < 6000:
+        return f"{sign}{total // 60}"
+    return f"{sign}{total // 3600}h"
+
+
+@lru_cache(maxsize=ICON_CACHE_SIZE)
+def render_icon(text, color, background, size=ICON_SIZE):
+    """Return an icon with text in the color on a rounded background (colors as ARGB ints)"""
+    pixmap = QPixmap(size, size)
+    pixmap.fill(Qt.transparent)
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setRenderHint(QPainter.TextAntialiasing)
+    painter.setPen(Qt.NoPen)
+    painter.setBrush(QColor.fromRgba(background))
+    painter.drawRoundedRect(0, 0, size, size, size // 6, size // 6)
+    font = QFont('Arial')
+    font.setBold(True)
+    # Shrink the digits as the text gets longer so "-59" still fits
+    font.setPixelSize(int(size * (0.72, 0.72, 0.56, 0.42, 0.34)[min(len(text), 4)]))
+    painter.setFont(font)
+    painter.setPen(QColor.fromRgba(color))
+    painter.drawText(QRect(0, 0, size, size), Qt.AlignCenter, text)
+    painter.end()
+    return QIcon(pixmap)
+
+
+class TimerTray(QObject):
+    """Tray icon that follows a timer display, added with its add_output"""
+
+    def __init__(self, control_panel):
+        super().__init__(control_panel)
+        self.control_panel = control_panel
+        self.current_time_str = None
+        self.stage = STAGE_NORMAL
+        self.key = None  # (text, color, background) of the icon shown
+        self.stage_styles = {}
+        self.tray = QSystemTrayIcon(self)
+        self.tray.setToolTip("SANS Timer")
+        self.tray.activated.connect(self.on_activated)
+        self.menu = QMenu()
+        self.toggle_action = QAction("Hide Windows", self.menu)
+        self.toggle_action.triggered.connect(self.toggle_windows)
+        self.menu.addAction(self.toggle_action)
+        quit_action = QAction("Quit", self.menu)
+        quit_action.triggered.connect(control_panel.quit_application)
+        self.menu.addAction(quit_action)
+        self.menu.aboutToShow.connect(self.update_menu)
+        self.tray.setContextMenu(self.menu)
+
+    def show(self):
+        self.tray.show()
+
+    def isVisible(self):
+        return self.tray.isVisible()
+
+    def set_colors(self, normal_color, warning_color, background_color, caution_color):
+        """Take the colors of the display this icon follows (add_output passes all four)"""
+        self.stage_styles = {STAGE_NORMAL: (normal_color.rgba(), background_color.rgba()),
+                             STAGE_CAUTION: (caution_color.rgba(), background_color.rgba()),
+                             STAGE_WARNING: (warning_color.rgba(), background_color.rgba())}
+        if self.current_time_str is not None:
+            self.refresh()
+
+    def update_display(self, time_str, is_warning=False, stage=None, blink=False):
+        # The icon is never flashed: it may only be redrawn once a minute
+        if stage is None:
+            stage = STAGE_WARNING if is_warning else STAGE_NORMAL
+        self.current_time_str = time_str
+        self.stage = min(stage, STAGE_WARNING)
+        self.refresh()
+
+    def refresh(self):
+        """Show the icon for the current text and stage, if it changed"""
+        key = (icon_text(self.current_time_str),) + self.stage_styles[self.stage]
+        if key == self.key:
+            return
+        self.key = key
+        icon = render_icon(*key)
+        self.tray.setIcon(icon)
+        self.control_panel.setWindowIcon(icon)
+
+    def windows_visible(self):
+        panel = self.control_panel
+        return panel.isVisible() or any(window.isVisible() for window in panel.timer_display.top_level_windows())
+
+    def update_menu(self):
+        self.toggle_action.setText("Hide Windows" if self.windows_visible() else "Show Windows")
+
+    def toggle_windows(self):
+        """Hide every window to run from the tray alone, or bring the control panel back"""
+        panel = self.control_panel
+        if self.windows_visible():
+            panel.hide()
+            if panel.timer_window_visible:
+                panel.toggle_timer_window()
+        else:
+            panel.showNormal()
+            panel.activateWindow()
+
+    def on_activated(self, reason):
+        if reason == QSystemTrayIcon.Trigger:
+            self.toggle_windows()